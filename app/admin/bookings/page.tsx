@@ -54,27 +54,41 @@ async function getMe(): Promise<MeUser | null> {
   return res.json();
 }
 
-async function getBookings(): Promise<Booking[]> {
+type BookingsPage = {
+  bookings: Booking[];
+  nextCursor: string | null;
+};
+
+async function getBookings(cursor?: string): Promise<BookingsPage> {
   const apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
   const cookie = (await headers()).get("cookie") ?? "";
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
 
-  const res = await fetch(`${apiUrl}/api/admin/bookings`, {
+  const res = await fetch(`${apiUrl}/api/admin/bookings${query}`, {
     headers: { Cookie: cookie },
     cache: "no-store",
   });
 
-  if (!res.ok) return [];
-  return res.json();
+  if (!res.ok) return { bookings: [], nextCursor: null };
+  return {
+    bookings: await res.json(),
+    nextCursor: res.headers.get("X-Next-Cursor"),
+  };
 }
 
-export default async function AdminBookingsPage() {
+export default async function AdminBookingsPage({
+  searchParams,
+}: {
+  searchParams: Promise<{ cursor?: string }>;
+}) {
   // ── Auth guard ───────────────────────────────
   const me = await getMe();
   if (!me) redirect("/auth/login");
   if (me.role !== "admin" && me.role !== "superadmin") redirect("/dashboard");
 
   // ── Data ─────────────────────────────────────
-  const bookings = await getBookings();
+  const { cursor } = await searchParams;
+  const { bookings, nextCursor } = await getBookings(cursor);
 
   return (
     <div className="min-h-screen bg-background">
@@ -175,6 +189,27 @@ export default async function AdminBookingsPage() {
               </CardContent>
             </Card>
           )}
+
+          {(cursor || nextCursor) && (
+            <div className="flex justify-between">
+              {cursor ? (
+                <Button asChild variant="outline">
+                  <Link href="/admin/bookings">First page</Link>
+                </Button>
+              ) : (
+                <span />
+              )}
+              {nextCursor && (
+                <Button asChild variant="outline">
+                  <Link
+                    href={`/admin/bookings?cursor=${encodeURIComponent(nextCursor)}`}
+                  >
+                    Next page
+                  </Link>
+                </Button>
+              )}
+            </div>
+          )}
         </div>
       </div>
     </div>
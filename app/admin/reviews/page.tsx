@@ -1,5 +1,6 @@
 import { redirect } from "next/navigation";
 import { headers } from "next/headers";
+import Link from "next/link";
 import { DashboardLayout } from "@/components/dashboard/dashboard-layout";
 import { Card, CardHeader } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
@@ -38,31 +39,45 @@ async function getMe(): Promise<MeUser | null> {
   return (await res.json()) as MeUser;
 }
 
-async function getReviews(): Promise<ReviewRow[]> {
+type ReviewsPage = {
+  reviews: ReviewRow[];
+  nextCursor: string | null;
+};
+
+async function getReviews(cursor?: string): Promise<ReviewsPage> {
   const apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
   const cookie = (await headers()).get("cookie") ?? "";
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
 
   // Backend endpoint you should create:
   // GET /api/admin/reviews
   try {
-    const res = await fetch(`${apiUrl}/api/admin/reviews`, {
+    const res = await fetch(`${apiUrl}/api/admin/reviews${query}`, {
       method: "GET",
       headers: { Cookie: cookie },
       cache: "no-store",
     });
-    if (!res.ok) return [];
-    return (await res.json()) as ReviewRow[];
+    if (!res.ok) return { reviews: [], nextCursor: null };
+    return {
+      reviews: (await res.json()) as ReviewRow[],
+      nextCursor: res.headers.get("X-Next-Cursor"),
+    };
   } catch {
-    return [];
+    return { reviews: [], nextCursor: null };
   }
 }
 
-export default async function AdminReviewsPage() {
+export default async function AdminReviewsPage({
+  searchParams,
+}: {
+  searchParams: Promise<{ cursor?: string }>;
+}) {
   const me = await getMe();
   if (!me) redirect("/auth/login");
   if (me.role !== "admin" && me.role !== "superadmin") redirect("/dashboard");
 
-  const reviews = await getReviews();
+  const { cursor } = await searchParams;
+  const { reviews, nextCursor } = await getReviews(cursor);
 
   return (
     <DashboardLayout>
@@ -135,6 +150,25 @@ export default async function AdminReviewsPage() {
           description="Customer reviews will appear here once they're submitted."
         />
       )}
+
+      {(cursor || nextCursor) && (
+        <div className="mt-6 flex justify-between">
+          {cursor ? (
+            <Button asChild variant="outline">
+              <Link href="/admin/reviews">First page</Link>
+            </Button>
+          ) : (
+            <span />
+          )}
+          {nextCursor && (
+            <Button asChild variant="outline">
+              <Link href={`/admin/reviews?cursor=${encodeURIComponent(nextCursor)}`}>
+                Next page
+              </Link>
+            </Button>
+          )}
+        </div>
+      )}
     </DashboardLayout>
   );
 }
@@ -17,6 +17,9 @@ export async function POST(request: NextRequest) {
     headers: {
       ...(authHeader ? { Authorization: authHeader } : {}),
       ...(cookieHeader ? { Cookie: cookieHeader } : {}),
+      ...(request.headers.get("idempotency-key")
+        ? { "Idempotency-Key": request.headers.get("idempotency-key") as string }
+        : {}),
       ...(request.headers.get("content-type")
         ? { "Content-Type": request.headers.get("content-type") as string }
         : {}),
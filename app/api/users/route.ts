@@ -23,7 +23,11 @@ export async function GET(request: NextRequest) {
   });
 
   const data = await res.json().catch(() => ({}));
-  return NextResponse.json(data, { status: res.status });
+  const nextCursor = res.headers.get("X-Next-Cursor");
+  return NextResponse.json(data, {
+    status: res.status,
+    headers: nextCursor ? { "X-Next-Cursor": nextCursor } : undefined,
+  });
 }
 
 export async function POST(request: NextRequest) {
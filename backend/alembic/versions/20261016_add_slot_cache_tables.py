@@ -0,0 +1,59 @@
+"""add shared slot cache tables
+
+Revision ID: 20261016addslotcache
+Revises: 20260209addcore
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261016addslotcache"
+down_revision: Union[str, Sequence[str], None] = "20260209addcore"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    # UNLOGGED: cached slots are disposable, so skip WAL and replication.
+    if "slot_cache_entries" not in table_names:
+        op.execute(
+            """
+            CREATE UNLOGGED TABLE slot_cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+            """
+        )
+        op.create_index(
+            "idx_slot_cache_entries_expires",
+            "slot_cache_entries",
+            ["expires_at"],
+            unique=False,
+        )
+
+    if "slot_cache_counters" not in table_names:
+        op.execute(
+            """
+            CREATE UNLOGGED TABLE slot_cache_counters (
+                name TEXT PRIMARY KEY,
+                value BIGINT NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS slot_cache_counters")
+    op.execute("DROP TABLE IF EXISTS slot_cache_entries")
@@ -0,0 +1,182 @@
+"""add booking period ranges and overlap exclusion
+
+Revision ID: 20261017addperiods
+Revises: 20261016addslotcache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017addperiods"
+down_revision: Union[str, Sequence[str], None] = "20261016addslotcache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _period_expression(inspector, table: str, start_column: str, end_column: str) -> str:
+    columns = {column["name"]: column for column in inspector.get_columns(table)}
+    if getattr(columns[start_column]["type"], "timezone", False):
+        return f"tstzrange({start_column}, {end_column})"
+    # Naive columns hold UTC; AT TIME ZONE with a literal zone keeps the
+    # generated expression immutable.
+    return (
+        f"tstzrange({start_column} AT TIME ZONE 'UTC', {end_column} AT TIME ZONE 'UTC')"
+    )
+
+
+def _release_overlapping_exclusive_bookings(bind) -> List[str]:
+    """Clear is_exclusive on the later of each overlapping active exclusive pair.
+
+    The constraint cannot be added NOT VALID, so double-bookings that already
+    exist would abort it. The earliest-created booking of each clash keeps the
+    slot; the ids of the others are returned for follow-up.
+    """
+    rows = bind.execute(
+        sa.text(
+            """
+            SELECT DISTINCT b.id, b.staff_id, b.start_time_utc, b.end_time_utc, b.created_at
+            FROM bookings b
+            JOIN bookings other
+              ON other.staff_id = b.staff_id
+             AND other.id <> b.id
+             AND other.period && b.period
+             AND other.is_exclusive
+             AND other.status NOT IN ('cancelled', 'no-show')
+            WHERE b.is_exclusive AND b.status NOT IN ('cancelled', 'no-show')
+            ORDER BY b.created_at NULLS LAST, b.id
+            """
+        )
+    ).fetchall()
+
+    kept: Dict[object, List[Tuple[object, object]]] = {}
+    released = []
+    for booking_id, staff_id, start_time, end_time, _ in rows:
+        staff_kept = kept.setdefault(staff_id, [])
+        if any(start_time < kept_end and kept_start < end_time for kept_start, kept_end in staff_kept):
+            released.append(str(booking_id))
+        else:
+            staff_kept.append((start_time, end_time))
+
+    if released:
+        bind.execute(
+            sa.text("UPDATE bookings SET is_exclusive = FALSE WHERE id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": released},
+        )
+    return released
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Needed to combine the uuid staff_id with the range in one GiST index.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    booking_columns = {column["name"] for column in inspector.get_columns("bookings")}
+    if "period" not in booking_columns:
+        op.execute(
+            f"""
+            ALTER TABLE bookings
+            ADD COLUMN period tstzrange
+            GENERATED ALWAYS AS ({_period_expression(inspector, "bookings", "start_time_utc", "end_time_utc")}) STORED
+            """
+        )
+    if "is_exclusive" not in booking_columns:
+        op.add_column(
+            "bookings",
+            sa.Column(
+                "is_exclusive",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.text("false"),
+            ),
+        )
+        op.execute(
+            """
+            UPDATE bookings b
+            SET is_exclusive = COALESCE(
+                (
+                    SELECT ss.capacity_override
+                    FROM staff_services ss
+                    WHERE ss.service_id = b.service_id AND ss.staff_id = b.staff_id
+                ),
+                s.max_capacity,
+                1
+            ) <= 1
+            FROM services s
+            WHERE s.id = b.service_id
+            """
+        )
+
+    hold_columns = {column["name"] for column in inspector.get_columns("booking_holds")}
+    if "period" not in hold_columns:
+        op.execute(
+            f"""
+            ALTER TABLE booking_holds
+            ADD COLUMN period tstzrange
+            GENERATED ALWAYS AS ({_period_expression(inspector, "booking_holds", "start_utc", "end_utc")}) STORED
+            """
+        )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_bookings_staff_period ON bookings USING gist (staff_id, period)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_bookings_period ON bookings USING gist (period)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_booking_holds_staff_period "
+        "ON booking_holds USING gist (staff_id, period)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_booking_holds_period ON booking_holds USING gist (period)"
+    )
+
+    constraint_names = {
+        constraint["name"]
+        for constraint in bind.execute(
+            sa.text(
+                "SELECT conname AS name FROM pg_constraint WHERE conrelid = 'bookings'::regclass"
+            )
+        ).mappings()
+    }
+    if "bookings_exclusive_no_overlap" not in constraint_names:
+        released = _release_overlapping_exclusive_bookings(bind)
+        if released:
+            logger.warning(
+                "%d overlapping booking(s) are no longer exclusive and need manual review: %s",
+                len(released),
+                ", ".join(released),
+            )
+        op.execute(
+            """
+            ALTER TABLE bookings
+            ADD CONSTRAINT bookings_exclusive_no_overlap
+            EXCLUDE USING gist (staff_id WITH =, period WITH &&)
+            WHERE (is_exclusive AND status NOT IN ('cancelled', 'no-show'))
+            """
+        )
+
+    # The (staff_id, period) GiST index serves the range queries this btree was for.
+    op.execute("DROP INDEX IF EXISTS idx_bookings_start_time")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE INDEX IF NOT EXISTS idx_bookings_start_time ON bookings (start_time_utc)")
+    op.execute("ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_exclusive_no_overlap")
+    op.execute("DROP INDEX IF EXISTS idx_booking_holds_period")
+    op.execute("DROP INDEX IF EXISTS idx_booking_holds_staff_period")
+    op.execute("DROP INDEX IF EXISTS idx_bookings_period")
+    op.execute("DROP INDEX IF EXISTS idx_bookings_staff_period")
+    op.execute("ALTER TABLE booking_holds DROP COLUMN IF EXISTS period")
+    op.execute("ALTER TABLE bookings DROP COLUMN IF EXISTS is_exclusive")
+    op.execute("ALTER TABLE bookings DROP COLUMN IF EXISTS period")
@@ -0,0 +1,56 @@
+"""add idempotency keys
+
+Revision ID: 20261018addidempotency
+Revises: 20261017addperiods
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018addidempotency"
+down_revision: Union[str, Sequence[str], None] = "20261017addperiods"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    if "idempotency_keys" not in table_names:
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("user_id", sa.UUID(), nullable=False),
+            sa.Column("key", sa.String(length=255), nullable=False),
+            sa.Column("scope", sa.String(length=50), nullable=False),
+            sa.Column("request_hash", sa.String(length=64), nullable=False),
+            sa.Column("response", postgresql.JSONB(), nullable=True),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("now()"),
+            ),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("user_id", "key"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        )
+        op.create_index(
+            "idx_idempotency_keys_expires",
+            "idempotency_keys",
+            ["expires_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS idempotency_keys")
@@ -0,0 +1,41 @@
+"""add booking series id
+
+Revision ID: 20261019addseries
+Revises: 20261018addidempotency
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261019addseries"
+down_revision: Union[str, Sequence[str], None] = "20261018addidempotency"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    booking_columns = {column["name"] for column in inspector.get_columns("bookings")}
+
+    if "series_id" not in booking_columns:
+        op.add_column("bookings", sa.Column("series_id", sa.UUID(), nullable=True))
+        op.create_index(
+            "idx_bookings_series",
+            "bookings",
+            ["series_id"],
+            unique=False,
+            postgresql_where=sa.text("series_id IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_bookings_series")
+    op.execute("ALTER TABLE bookings DROP COLUMN IF EXISTS series_id")
@@ -0,0 +1,68 @@
+"""add outbox events
+
+Revision ID: 20261020addoutbox
+Revises: 20261019addseries
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261020addoutbox"
+down_revision: Union[str, Sequence[str], None] = "20261019addseries"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    if "outbox_events" not in table_names:
+        op.create_table(
+            "outbox_events",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column("event_type", sa.String(length=50), nullable=False),
+            sa.Column("payload", postgresql.JSONB(), nullable=False),
+            sa.Column(
+                "status",
+                sa.String(length=20),
+                nullable=False,
+                server_default=sa.text("'pending'"),
+            ),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column(
+                "available_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("now()"),
+            ),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("now()"),
+            ),
+            sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "idx_outbox_events_pending",
+            "outbox_events",
+            ["available_at"],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS outbox_events")
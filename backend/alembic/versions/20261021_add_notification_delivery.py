@@ -0,0 +1,79 @@
+"""add notification delivery state
+
+Revision ID: 20261021addnotifydelivery
+Revises: 20261020addoutbox
+Create Date: 2026-10-21 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261021addnotifydelivery"
+down_revision: Union[str, Sequence[str], None] = "20261020addoutbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("notifications")}
+
+    if "subject" not in columns:
+        op.add_column("notifications", sa.Column("subject", sa.Text(), nullable=True))
+    if "body" not in columns:
+        op.add_column("notifications", sa.Column("body", sa.Text(), nullable=True))
+    if "attempts" not in columns:
+        op.add_column(
+            "notifications",
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        )
+    if "next_attempt_at" not in columns:
+        op.add_column(
+            "notifications",
+            sa.Column(
+                "next_attempt_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("now()"),
+            ),
+        )
+    if "last_error" not in columns:
+        op.add_column("notifications", sa.Column("last_error", sa.Text(), nullable=True))
+
+    op.execute("ALTER TABLE notifications DROP CONSTRAINT IF EXISTS notifications_status_check")
+    op.execute(
+        """
+        ALTER TABLE notifications
+        ADD CONSTRAINT notifications_status_check
+        CHECK (status IN ('pending', 'sent', 'failed', 'dead'))
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notifications_due "
+        "ON notifications (next_attempt_at) WHERE status IN ('pending', 'failed')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_notifications_due")
+    op.execute("ALTER TABLE notifications DROP CONSTRAINT IF EXISTS notifications_status_check")
+    op.execute("UPDATE notifications SET status = 'failed' WHERE status = 'dead'")
+    op.execute(
+        """
+        ALTER TABLE notifications
+        ADD CONSTRAINT notifications_status_check
+        CHECK (status IN ('pending', 'sent', 'failed'))
+        """
+    )
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS last_error")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS next_attempt_at")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS attempts")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS body")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS subject")
@@ -0,0 +1,70 @@
+"""add reminder lead times and claim index
+
+Revision ID: 20261022addreminderclaims
+Revises: 20261021addnotifydelivery
+Create Date: 2026-10-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261022addreminderclaims"
+down_revision: Union[str, Sequence[str], None] = "20261021addnotifydelivery"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_LEGACY_REMINDER_LEAD_MINUTES = 60
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("notifications")}
+
+    if "lead_minutes" not in columns:
+        op.add_column("notifications", sa.Column("lead_minutes", sa.Integer(), nullable=True))
+
+    # Reminders queued before lead times existed were all sent at the old
+    # single REMINDER_LEAD_MINUTES default; without a lead they would not
+    # match the anti-join and every booking in the window would be reminded
+    # again. One row per booking and recipient is enough to claim it, and
+    # tagging only that one keeps legacy duplicates out of the unique index.
+    op.execute(
+        f"""
+        UPDATE notifications n
+        SET lead_minutes = {_LEGACY_REMINDER_LEAD_MINUTES}
+        FROM (
+            SELECT DISTINCT ON (booking_id, recipient) id
+            FROM notifications
+            WHERE type = 'reminder'
+            ORDER BY booking_id, recipient, created_at, id
+        ) first_reminder
+        WHERE n.id = first_reminder.id
+          AND n.lead_minutes IS NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM notifications claimed
+              WHERE claimed.booking_id = n.booking_id
+                AND claimed.type = 'reminder'
+                AND claimed.recipient = n.recipient
+                AND claimed.lead_minutes = {_LEGACY_REMINDER_LEAD_MINUTES}
+          )
+        """
+    )
+
+    # Only lead-time reminders are unique; confirmations and the like can repeat.
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_reminder_claim "
+        "ON notifications (booking_id, type, recipient, lead_minutes) "
+        "WHERE lead_minutes IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS uq_notifications_reminder_claim")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS lead_minutes")
@@ -0,0 +1,43 @@
+"""add expiry indexes for scheduled purges
+
+Revision ID: 20261023addexpiryindexes
+Revises: 20261022addreminderclaims
+Create Date: 2026-10-23 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261023addexpiryindexes"
+down_revision: Union[str, Sequence[str], None] = "20261022addreminderclaims"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_EXPIRY_INDEXES = (
+    ("idx_sessions_expires", "sessions"),
+    ("idx_password_reset_tokens_expires", "password_reset_tokens"),
+    ("idx_email_verification_tokens_expires", "email_verification_tokens"),
+    ("idx_magic_link_tokens_expires", "magic_link_tokens"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    for index_name, table in _EXPIRY_INDEXES:
+        if table in table_names:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} (expires_at)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, _ in _EXPIRY_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
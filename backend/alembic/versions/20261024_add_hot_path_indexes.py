@@ -0,0 +1,69 @@
+"""add composite and partial indexes for hot query paths
+
+Revision ID: 20261024addhotpathindexes
+Revises: 20261023addexpiryindexes
+Create Date: 2026-10-24 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261024addhotpathindexes"
+down_revision: Union[str, Sequence[str], None] = "20261023addexpiryindexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_HOT_PATH_INDEXES = (
+    (
+        "idx_bookings_staff_active_time",
+        "bookings",
+        "(staff_id, start_time_utc, end_time_utc) WHERE status NOT IN ('cancelled', 'no-show')",
+    ),
+    # NOW() cannot appear in an index predicate, so the expiry is a key column instead.
+    ("idx_booking_holds_staff_expires", "booking_holds", "(staff_id, expires_at_utc)"),
+    ("idx_staff_exceptions_staff_time", "staff_exceptions", "(staff_id, start_utc, end_utc)"),
+    ("idx_staff_work_blocks_schedule_weekday", "staff_work_blocks", "(schedule_id, weekday)"),
+    ("idx_notifications_recipient_created", "notifications", "(recipient, created_at)"),
+    ("idx_notifications_booking_type_recipient", "notifications", "(booking_id, type, recipient)"),
+    ("idx_customers_user", "customers", "(user_id)"),
+    ("idx_waitlist_service_status", "waitlist", "(service_id, status)"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a
+    # transaction; a failed build leaves an invalid index behind, which is
+    # dropped here so a rerun builds it again instead of skipping it.
+    with op.get_context().autocommit_block():
+        for index_name, table, definition in _HOT_PATH_INDEXES:
+            if table not in table_names:
+                continue
+            invalid = bind.execute(
+                sa.text(
+                    """
+                    SELECT 1 FROM pg_index
+                    WHERE indexrelid = to_regclass(:index_name) AND NOT indisvalid
+                    """
+                ),
+                {"index_name": index_name},
+            ).scalar()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, _, _ in _HOT_PATH_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
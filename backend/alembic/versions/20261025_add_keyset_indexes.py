@@ -0,0 +1,58 @@
+"""add (sort key, id) indexes for keyset pagination
+
+Revision ID: 20261025addkeysetindexes
+Revises: 20261024addhotpathindexes
+Create Date: 2026-10-25 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261025addkeysetindexes"
+down_revision: Union[str, Sequence[str], None] = "20261024addhotpathindexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_KEYSET_INDEXES = (
+    ("idx_bookings_start_time_id", "bookings", "(start_time_utc, id)"),
+    ("idx_users_created_id", "users", "(created_at, id)"),
+    ("idx_services_created_id", "services", "(created_at, id)"),
+    ("idx_reviews_created_id", "reviews", "(created_at, id)"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = set(inspector.get_table_names())
+
+    # Built concurrently like the hot-path indexes; invalid leftovers are rebuilt.
+    with op.get_context().autocommit_block():
+        for index_name, table, definition in _KEYSET_INDEXES:
+            if table not in table_names:
+                continue
+            invalid = bind.execute(
+                sa.text(
+                    """
+                    SELECT 1 FROM pg_index
+                    WHERE indexrelid = to_regclass(:index_name) AND NOT indisvalid
+                    """
+                ),
+                {"index_name": index_name},
+            ).scalar()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, _, _ in _KEYSET_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
@@ -2,15 +2,18 @@ import csv
 import io
 
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional
 from sqlalchemy import text
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from app.core.auth import require_roles
 from app.core.audit import log_audit
-from app.core.database import get_db
+from app.core.database import get_db, pool_stats
+from app.core.pagination import keyset_page, paginate, reject_offset
 from app.core.config import settings
+from app.core.session_cache import session_cache_stats
+from app.core.slot_cache import slot_cache_stats
 from app.models.schemas import LocationCreate, LocationUpdate, LocationResponse
 import uuid
 
@@ -204,15 +207,43 @@ def list_services(
     return services
 
 
+@router.get("/cache/slots")
+def get_slot_cache_stats(
+    current_user: dict = Depends(require_roles("admin", "superadmin")),
+):
+    return slot_cache_stats()
+
+
+@router.get("/cache/sessions")
+def get_session_cache_stats(
+    current_user: dict = Depends(require_roles("admin", "superadmin")),
+):
+    return session_cache_stats()
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(
+    current_user: dict = Depends(require_roles("admin", "superadmin")),
+):
+    return pool_stats()
+
+
 @router.get("/bookings")
 def list_bookings(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: Optional[int] = None,
     current_user: dict = Depends(require_roles("admin", "superadmin")),
     db: Session = Depends(get_db),
 ):
     if settings.FEATURE_SET != "full":
         raise HTTPException(status_code=404, detail="Not available in core mode")
+    reject_offset(skip)
+    params = {}
+    after_cursor, order = keyset_page("b.start_time_utc", "b.id", cursor, limit, params)
     result = db.execute(
-        """
+        f"""
         SELECT b.id, b.start_time_utc, b.status, b.payment_status,
                s.id as service_id, s.name as service_name, s.price, s.duration_minutes,
                u.id as staff_id, u.full_name as staff_name,
@@ -221,10 +252,12 @@ def list_bookings(
         LEFT JOIN services s ON b.service_id = s.id
         LEFT JOIN users u ON b.staff_id = u.id
         LEFT JOIN customers c ON b.customer_id = c.id
-        ORDER BY b.start_time_utc DESC
-        """
+        WHERE {after_cursor}
+        {order}
+        """,
+        params,
     )
-    rows = result.fetchall()
+    rows = paginate(response, result.fetchall(), limit, "start_time_utc")
 
     return [
         {
@@ -292,23 +325,32 @@ def list_payments(
 
 @router.get("/reviews")
 def list_reviews(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: Optional[int] = None,
     current_user: dict = Depends(require_roles("admin", "superadmin")),
     db: Session = Depends(get_db),
 ):
     if settings.FEATURE_SET != "full":
         raise HTTPException(status_code=404, detail="Not available in core mode")
+    reject_offset(skip)
+    params = {}
+    after_cursor, order = keyset_page("r.created_at", "r.id", cursor, limit, params)
     result = db.execute(
-        """
+        f"""
         SELECT r.id, r.rating, r.comment, r.is_approved, r.created_at,
                c.full_name as customer_name, s.name as service_name
         FROM reviews r
         LEFT JOIN bookings b ON r.booking_id = b.id
         LEFT JOIN customers c ON b.customer_id = c.id
         LEFT JOIN services s ON b.service_id = s.id
-        ORDER BY r.created_at DESC
-        """
+        WHERE {after_cursor}
+        {order}
+        """,
+        params,
     )
-    rows = result.fetchall()
+    rows = paginate(response, result.fetchall(), limit, "created_at")
 
     return [
         {
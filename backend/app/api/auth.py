@@ -20,6 +20,7 @@ import httpx
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, resolve_token
+from app.core.session_cache import invalidate_session_token, invalidate_user_sessions
 from app.core.config import settings
 from app.core.email import send_email
 
@@ -465,6 +466,7 @@ def confirm_magic_link(
         },
     )
     db.commit()
+    invalidate_user_sessions(user.id)
 
     response.set_cookie(
         key="auth_token",
@@ -568,6 +570,7 @@ def google_login(
         },
     )
     db.commit()
+    invalidate_user_sessions(user.id)
 
     response.set_cookie(
         key="auth_token",
@@ -626,6 +629,7 @@ def update_me(
     """
     updated = db.execute(text(query), params).fetchone()
     db.commit()
+    invalidate_user_sessions(current_user["id"])
 
     return dict(updated._mapping)
 
@@ -677,6 +681,7 @@ def change_password(
         )
 
     db.commit()
+    invalidate_user_sessions(current_user["id"])
 
     response.delete_cookie("auth_token", path="/")
     response.set_cookie(
@@ -770,6 +775,7 @@ def confirm_password_reset(
         {"user_id": record.user_id},
     )
     db.commit()
+    invalidate_user_sessions(record.user_id)
 
     return {"message": "Password updated"}
 
@@ -848,6 +854,7 @@ def confirm_email_verification(
         {"used_at": utc_now(), "id": record.id},
     )
     db.commit()
+    invalidate_user_sessions(record.user_id)
 
     return {"message": "Email verified"}
 
@@ -865,8 +872,14 @@ def logout(
 ):
     token = resolve_token(authorization, auth_token)
     if token:
-        db.execute(text("DELETE FROM sessions WHERE token = :token"), {"token": token})
+        deleted = db.execute(
+            text("DELETE FROM sessions WHERE token = :token RETURNING user_id"),
+            {"token": token},
+        ).fetchone()
         db.commit()
+        invalidate_session_token(token)
+        if deleted:
+            invalidate_user_sessions(deleted[0])
 
     response.delete_cookie("auth_token", path="/")
     return {"success": True}
@@ -883,5 +896,6 @@ def logout_all(
         {"user_id": current_user["id"]},
     )
     db.commit()
+    invalidate_user_sessions(current_user["id"])
     response.delete_cookie("auth_token", path="/")
     return {"success": True}
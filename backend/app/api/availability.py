@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
@@ -6,12 +7,31 @@ from typing import List, Optional, Dict, Tuple
 from datetime import datetime, date, time, timedelta, timezone as dt_timezone
 import calendar
 import json
-from time import time as now_ts
 from zoneinfo import ZoneInfo
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.auth import require_roles, is_admin
 from app.core.audit import log_audit
 from app.core.config import settings
+from app.core.idempotency import run_idempotent
+from app.core.intervals import (
+    clip_interval,
+    intersect_intervals,
+    merge_intervals,
+    subtract_intervals,
+)
+from app.core.occupancy import DayOccupancy
+from app.core.schedule_templates import load_staff_schedule_templates
+from app.core.service_calendar import load_service_calendar
+from app.core.slot_bitmap import bitmap_slot_starts
+from app.core.slot_cache import (
+    bump_staff_generation,
+    bump_staff_schedule_generation,
+    get_cached_slots,
+    live_hold_expiries,
+    set_cached_slots,
+    slot_cache_key,
+    slot_cache_keys,
+)
 from app.models.schemas import (
     AvailabilityRuleCreate, AvailabilityRuleResponse,
     AvailabilityExceptionCreate, AvailabilityExceptionResponse,
@@ -30,8 +50,7 @@ import uuid
 
 router = APIRouter()
 
-_SLOT_CACHE: Dict[str, Dict[str, object]] = {}
-_SLOT_CACHE_TTL_SECONDS = 60
+_RANGE_CHUNK_DAYS = 14
 BOOKINGS_ENABLED = settings.FEATURE_SET == "full"
 NOTIFICATIONS_ENABLED = settings.FEATURE_SET == "full"
 
@@ -62,254 +81,378 @@ def _resolve_staff_id(current_user: dict, staff_id: Optional[str]) -> str:
         return current_user.get("id")
     return staff_id
 
-def _merge_intervals(intervals: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
-    if not intervals:
-        return []
-    intervals = sorted(intervals, key=lambda x: x[0])
-    merged = [intervals[0]]
-    for start, end in intervals[1:]:
-        last_start, last_end = merged[-1]
-        if start <= last_end:
-            merged[-1] = (last_start, max(last_end, end))
-        else:
-            merged.append((start, end))
-    return merged
+def _round_up_to_granularity(value: datetime, granularity_minutes: int) -> datetime:
+    midnight = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    delta_minutes = int((value - midnight).total_seconds() // 60)
+    remainder = delta_minutes % granularity_minutes
+    if remainder == 0 and value.second == 0 and value.microsecond == 0:
+        return value.replace(second=0, microsecond=0)
+    increment = granularity_minutes - remainder
+    return midnight + timedelta(minutes=delta_minutes + increment)
 
-def _subtract_intervals(
-    source: List[Tuple[datetime, datetime]],
-    remove: List[Tuple[datetime, datetime]]
-) -> List[Tuple[datetime, datetime]]:
-    if not source:
-        return []
-    if not remove:
-        return source
-    remove = _merge_intervals(remove)
-    result: List[Tuple[datetime, datetime]] = []
-    for start, end in source:
-        cursor = start
-        for r_start, r_end in remove:
-            if r_end <= cursor or r_start >= end:
-                continue
-            if r_start > cursor:
-                result.append((cursor, r_start))
-            cursor = max(cursor, r_end)
-            if cursor >= end:
-                break
-        if cursor < end:
-            result.append((cursor, end))
-    return result
-
-def _clip_interval(
-    start: datetime,
-    end: datetime,
-    day_start: datetime,
-    day_end: datetime
-) -> Optional[Tuple[datetime, datetime]]:
-    clipped_start = max(start, day_start)
-    clipped_end = min(end, day_end)
-    if clipped_start >= clipped_end:
+def _validate_uuid_param(value: Optional[str], field_name: str) -> Optional[str]:
+    if value in (None, ""):
         return None
-    return (clipped_start, clipped_end)
+    try:
+        uuid.UUID(str(value))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid {field_name}")
+    return value
 
-def _intersect_intervals(
-    left: List[Tuple[datetime, datetime]],
-    right: List[Tuple[datetime, datetime]],
-) -> List[Tuple[datetime, datetime]]:
-    if not left or not right:
-        return []
-    left = _merge_intervals(left)
-    right = _merge_intervals(right)
-    result: List[Tuple[datetime, datetime]] = []
-    for l_start, l_end in left:
-        for r_start, r_end in right:
-            start = max(l_start, r_start)
-            end = min(l_end, r_end)
-            if start < end:
-                result.append((start, end))
-    return _merge_intervals(result)
-
-def _is_nth_weekday_in_month(target_date: date, weekday: int, nth: int) -> bool:
-    if target_date.weekday() != weekday:
-        return False
-    first_day = target_date.replace(day=1)
-    offset = (weekday - first_day.weekday()) % 7
-    first_occurrence = 1 + offset
-    occurrence = ((target_date.day - first_occurrence) // 7) + 1
-    if nth == -1:
-        last_day = calendar.monthrange(target_date.year, target_date.month)[1]
-        last_date = target_date.replace(day=last_day)
-        last_offset = (last_date.weekday() - weekday) % 7
-        last_occurrence_day = last_day - last_offset
-        return target_date.day == last_occurrence_day
-    return occurrence == nth
-
-def _get_service_operating_intervals(
+def _load_bookable_staff(
     db: Session,
     service_id: str,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+) -> list:
+    staff_query = """
+        SELECT ss.staff_id, u.full_name,
+               ss.duration_override, ss.buffer_override, ss.capacity_override
+        FROM staff_services ss
+        JOIN users u ON u.id = ss.staff_id
+        WHERE ss.service_id = :service_id
+          AND ss.is_bookable = TRUE
+          AND ss.is_temporarily_unavailable = FALSE
+          AND ss.admin_only = FALSE
+    """
+    params: Dict[str, object] = {"service_id": service_id}
+    if staff_id:
+        staff_query += " AND ss.staff_id = :staff_id"
+        params["staff_id"] = staff_id
+    if location_id:
+        staff_query += " AND u.location_id = :location_id"
+        params["location_id"] = location_id
+
+    return db.execute(staff_query, params).fetchall()
+
+def _select_staff_schedule(candidates: List[dict], target_date: date) -> Optional[dict]:
+    for schedule in candidates:
+        effective_from = schedule.get("effective_from")
+        effective_to = schedule.get("effective_to")
+        if effective_from is not None and effective_from > target_date:
+            continue
+        if effective_to is not None and effective_to < target_date:
+            continue
+        return schedule
+    return None
+
+def _prefetch_staff_occupancy(
+    db: Session,
+    staff_ids: List[object],
+    range_start_utc: datetime,
+    range_end_utc: datetime,
+    exclude_booking_id: Optional[str] = None,
+    exclude_hold_by: Optional[str] = None,
+    exclude_booking_ids: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, list]]:
+    params: Dict[str, object] = {
+        "staff_ids": staff_ids,
+        "range_start": range_start_utc,
+        "range_end": range_end_utc,
+    }
+    occupancy: Dict[str, Dict[str, list]] = {
+        "exceptions": {},
+        "bookings": {},
+        "holds": {},
+    }
+
+    exception_rows = db.execute(
+        """
+        SELECT staff_id, type, start_utc, end_utc, is_all_day
+        FROM staff_exceptions
+        WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+          AND start_utc < :range_end
+          AND end_utc > :range_start
+        """,
+        params,
+    ).fetchall()
+    for row in exception_rows:
+        occupancy["exceptions"].setdefault(str(row[0]), []).append(tuple(row[1:]))
+
+    if BOOKINGS_ENABLED:
+        booking_query = """
+            SELECT staff_id, service_id, start_time_utc, end_time_utc
+            FROM bookings
+            WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+              AND period && tstzrange(:range_start, :range_end)
+              AND status NOT IN ('cancelled', 'no-show')
+        """
+        booking_params = dict(params)
+        if exclude_booking_id:
+            booking_query += " AND id <> :exclude_booking_id"
+            booking_params["exclude_booking_id"] = exclude_booking_id
+        if exclude_booking_ids:
+            booking_query += " AND NOT (id = ANY(CAST(:exclude_booking_ids AS uuid[])))"
+            booking_params["exclude_booking_ids"] = exclude_booking_ids
+        booking_rows = db.execute(booking_query, booking_params).fetchall()
+        for row in booking_rows:
+            occupancy["bookings"].setdefault(str(row[0]), []).append(tuple(row[1:]))
+
+    hold_query = """
+        SELECT staff_id, service_id, start_utc, end_utc
+        FROM booking_holds
+        WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+          AND expires_at_utc > NOW()
+          AND period && tstzrange(:range_start, :range_end)
+    """
+    hold_params = dict(params)
+    if exclude_hold_by:
+        hold_query += " AND (created_by IS NULL OR created_by <> :exclude_hold_by)"
+        hold_params["exclude_hold_by"] = exclude_hold_by
+    hold_rows = db.execute(hold_query, hold_params).fetchall()
+    for row in hold_rows:
+        occupancy["holds"].setdefault(str(row[0]), []).append(tuple(row[1:]))
+
+    return occupancy
+
+def _overlapping(
+    intervals: List[tuple],
+    range_start: datetime,
+    range_end: datetime,
+    start_index: int = 1,
+) -> List[tuple]:
+    end_index = start_index + 1
+    return [
+        item for item in intervals
+        if item[start_index] < range_end and item[end_index] > range_start
+    ]
+
+def _staff_day_frame(
+    schedule: dict,
     target_date: date,
-) -> List[Tuple[datetime, datetime]]:
-    schedule = db.execute(
-        text(
-            """
-            SELECT * FROM service_operating_schedules
-            WHERE service_id = :service_id
-              AND is_active = TRUE
-              AND (effective_from IS NULL OR effective_from <= :date)
-              AND (effective_to IS NULL OR effective_to >= :date)
-            ORDER BY created_at DESC
-            LIMIT 1
-            """
-        ),
-        {"service_id": service_id, "date": target_date},
-    ).fetchone()
+    min_notice_minutes: int,
+    max_booking_days: int,
+) -> dict:
+    schedule_tz = ZoneInfo(schedule["timezone"])
+    day_start = datetime.combine(target_date, time(0, 0), tzinfo=schedule_tz)
+    day_end = day_start + timedelta(days=1)
+    now_local = datetime.now(schedule_tz)
+    return {
+        "tz": schedule_tz,
+        "day_start": day_start,
+        "day_end": day_end,
+        "day_start_utc": day_start.astimezone(dt_timezone.utc),
+        "day_end_utc": day_end.astimezone(dt_timezone.utc),
+        "min_notice_cutoff": now_local + timedelta(minutes=min_notice_minutes),
+        "max_booking_cutoff": now_local + timedelta(days=max_booking_days),
+    }
 
+def _staff_service_terms(
+    staff_row,
+    base_duration: int,
+    base_buffer: int,
+    base_capacity: int,
+) -> Tuple[int, int, int]:
+    # Same precedence as the booking write path. A zero buffer override means
+    # no buffer, and a zero capacity override means capacity 1; before, the
+    # listing fell back to the service's base value for both.
+    duration = int(staff_row[2] or base_duration)
+    buffer_minutes = int(base_buffer if staff_row[3] is None else staff_row[3])
+    capacity = base_capacity if staff_row[4] is None else staff_row[4]
+    return duration, buffer_minutes, max(int(capacity or 1), 1)
+
+def _staff_day_intervals(
+    frame: dict,
+    template_day: dict,
+    exceptions: List[tuple],
+    service_intervals_utc: List[Tuple[datetime, datetime]],
+    target_date: date,
+    window_start: Optional[time],
+    window_end: Optional[time],
+) -> List[Tuple[datetime, datetime]]:
     utc = dt_timezone.utc
-    service_tz = ZoneInfo("UTC")
+    schedule_tz = frame["tz"]
+    day_start = frame["day_start"]
+    day_end = frame["day_end"]
+
+    # Offsets are added as wall-clock time, the same as combining the block
+    # times with the date, so DST days resolve the way they always have.
+    intervals: List[Tuple[datetime, datetime]] = [
+        (day_start + timedelta(seconds=start), day_start + timedelta(seconds=end))
+        for start, end in template_day["open"]
+    ]
 
-    if schedule:
-        schedule_map = schedule._mapping
-        service_tz = ZoneInfo(schedule_map.get("timezone") or "UTC")
+    if window_start and window_end:
+        window_start_dt = datetime.combine(target_date, window_start, tzinfo=schedule_tz)
+        window_end_dt = datetime.combine(target_date, window_end, tzinfo=schedule_tz)
+        window_interval = clip_interval(window_start_dt, window_end_dt, day_start, day_end)
+        if window_interval:
+            intervals = subtract_intervals(
+                intervals,
+                subtract_intervals([(day_start, day_end)], [window_interval])
+            )
+        else:
+            intervals = []
+
+    override_intervals: List[Tuple[datetime, datetime]] = []
+    time_off_intervals: List[Tuple[datetime, datetime]] = []
+    blocked_intervals: List[Tuple[datetime, datetime]] = []
+    extra_intervals: List[Tuple[datetime, datetime]] = []
+
+    for ex in exceptions:
+        ex_type = ex[0]
+        ex_start = ex[1].astimezone(schedule_tz)
+        ex_end = ex[2].astimezone(schedule_tz)
+        clipped = clip_interval(ex_start, ex_end, day_start, day_end)
+        if not clipped:
+            continue
+        if ex_type == "override_day":
+            override_intervals.append(clipped)
+        elif ex_type == "time_off":
+            if ex[3]:
+                time_off_intervals.append((day_start, day_end))
+            else:
+                time_off_intervals.append(clipped)
+        elif ex_type == "blocked_time":
+            blocked_intervals.append(clipped)
+        elif ex_type == "extra_availability":
+            extra_intervals.append(clipped)
 
-    service_day_start = datetime.combine(target_date, time(0, 0), tzinfo=service_tz)
-    service_day_end = service_day_start + timedelta(days=1)
-    service_weekday = (service_day_start.weekday() + 1) % 7
+    if override_intervals:
+        intervals = merge_intervals(override_intervals)
 
-    if not schedule:
-        return [(service_day_start.astimezone(utc), service_day_end.astimezone(utc))]
+    if time_off_intervals:
+        intervals = subtract_intervals(intervals, merge_intervals(time_off_intervals))
 
-    exceptions = db.execute(
-        text(
-            """
-            SELECT is_open, start_time, end_time
-            FROM service_operating_exceptions
-            WHERE service_id = :service_id AND date = :date
-            """
-        ),
-        {"service_id": service_id, "date": target_date},
-    ).fetchall()
+    if blocked_intervals:
+        intervals = subtract_intervals(intervals, merge_intervals(blocked_intervals))
 
-    override_exceptions = [ex for ex in exceptions if ex[0] and ex[1] and ex[2]]
-    closed_exceptions = [ex for ex in exceptions if not ex[0]]
-    extra_open_exceptions = [ex for ex in exceptions if ex[0] and not (ex[1] and ex[2])]
+    if extra_intervals:
+        intervals = merge_intervals(intervals + extra_intervals)
 
-    intervals: List[Tuple[datetime, datetime]] = []
+    staff_intervals_utc = [
+        (start.astimezone(utc), end.astimezone(utc))
+        for start, end in intervals
+    ]
+    intersected_utc = intersect_intervals(
+        staff_intervals_utc,
+        service_intervals_utc,
+    )
+    return [
+        (start.astimezone(schedule_tz), end.astimezone(schedule_tz))
+        for start, end in intersected_utc
+    ]
 
-    if override_exceptions:
-        for ex in override_exceptions:
-            start_dt = datetime.combine(target_date, ex[1], tzinfo=service_tz)
-            end_dt = datetime.combine(target_date, ex[2], tzinfo=service_tz)
-            intervals.append((start_dt, end_dt))
-    elif closed_exceptions:
-        return []
-    elif extra_open_exceptions:
-        intervals.append((service_day_start, service_day_end))
-    else:
-        schedule_map = schedule._mapping
-        rule_type = schedule_map.get("rule_type")
-
-        if rule_type == "daily":
-            open_time = schedule_map.get("open_time")
-            close_time = schedule_map.get("close_time")
-            if open_time and close_time:
-                intervals.append(
-                    (
-                        datetime.combine(target_date, open_time, tzinfo=service_tz),
-                        datetime.combine(target_date, close_time, tzinfo=service_tz),
-                    )
-                )
-            else:
-                intervals.append((service_day_start, service_day_end))
-        else:
-            rules = db.execute(
-                text(
-                    """
-                    SELECT rule_type, weekday, month_day, nth, start_time, end_time
-                    FROM service_operating_rules
-                    WHERE schedule_id = :schedule_id
-                    """
-                ),
-                {"schedule_id": schedule_map.get("id")},
-            ).fetchall()
-
-            for rule in rules:
-                rule_type_value = rule[0]
-                weekday = rule[1]
-                month_day = rule[2]
-                nth = rule[3]
-                start_time = rule[4]
-                end_time = rule[5]
-
-                is_match = False
-                if rule_type == "weekly" and rule_type_value == "weekly":
-                    is_match = weekday == service_weekday
-                elif rule_type == "monthly" and rule_type_value == "monthly_day":
-                    is_match = month_day == target_date.day
-                elif rule_type == "monthly" and rule_type_value == "monthly_nth_weekday":
-                    if weekday is not None and nth is not None:
-                        is_match = _is_nth_weekday_in_month(target_date, weekday, nth)
-
-                if not is_match:
-                    continue
+def _build_staff_day_slots(
+    staff_row,
+    schedule: dict,
+    frame: dict,
+    template_day: dict,
+    exceptions: List[tuple],
+    bookings: List[tuple],
+    holds: List[tuple],
+    service_id: str,
+    service_intervals_utc: List[Tuple[datetime, datetime]],
+    target_date: date,
+    customer_tz: ZoneInfo,
+    base_duration: int,
+    base_buffer: int,
+    base_capacity: int,
+    granularity_minutes: int,
+    window_start: Optional[time],
+    window_end: Optional[time],
+    ignore_booking_limits: bool,
+) -> List[dict]:
+    utc = dt_timezone.utc
+    staff_id_str = str(staff_row[0])
+    staff_name = staff_row[1]
+    duration, buffer_minutes, capacity = _staff_service_terms(
+        staff_row, base_duration, base_buffer, base_capacity
+    )
+    total_minutes = duration + buffer_minutes
+
+    day_start = frame["day_start"]
+    day_end = frame["day_end"]
+    min_notice_cutoff = frame["min_notice_cutoff"]
+    max_booking_cutoff = frame["max_booking_cutoff"]
+    max_slots_per_day = schedule.get("max_slots_per_day")
+    max_bookings_per_day = schedule.get("max_bookings_per_day")
 
-                if start_time and end_time:
-                    intervals.append(
-                        (
-                            datetime.combine(target_date, start_time, tzinfo=service_tz),
-                            datetime.combine(target_date, end_time, tzinfo=service_tz),
-                        )
-                    )
-                elif schedule_map.get("open_time") and schedule_map.get("close_time"):
-                    intervals.append(
-                        (
-                            datetime.combine(target_date, schedule_map["open_time"], tzinfo=service_tz),
-                            datetime.combine(target_date, schedule_map["close_time"], tzinfo=service_tz),
-                        )
-                    )
-                else:
-                    intervals.append((service_day_start, service_day_end))
-
-        if not intervals:
+    if BOOKINGS_ENABLED and max_bookings_per_day is not None and not ignore_booking_limits:
+        if len(bookings) >= int(max_bookings_per_day):
             return []
 
-    converted = [
-        (start.astimezone(utc), end.astimezone(utc)) for start, end in intervals
-    ]
-    return _merge_intervals(converted)
+    intervals = _staff_day_intervals(
+        frame=frame,
+        template_day=template_day,
+        exceptions=exceptions,
+        service_intervals_utc=service_intervals_utc,
+        target_date=target_date,
+        window_start=window_start,
+        window_end=window_end,
+    )
+    if not intervals:
+        return []
 
-def _round_up_to_granularity(value: datetime, granularity_minutes: int) -> datetime:
-    midnight = value.replace(hour=0, minute=0, second=0, microsecond=0)
-    delta_minutes = int((value - midnight).total_seconds() // 60)
-    remainder = delta_minutes % granularity_minutes
-    if remainder == 0 and value.second == 0 and value.microsecond == 0:
-        return value.replace(second=0, microsecond=0)
-    increment = granularity_minutes - remainder
-    return midnight + timedelta(minutes=delta_minutes + increment)
+    if max_slots_per_day is not None and int(max_slots_per_day) <= 0:
+        return []
 
-def _get_cached_slots(cache_key: str) -> Optional[List[dict]]:
-    entry = _SLOT_CACHE.get(cache_key)
-    if not entry:
-        return None
-    if now_ts() - float(entry["ts"]) > _SLOT_CACHE_TTL_SECONDS:
-        _SLOT_CACHE.pop(cache_key, None)
-        return None
-    return entry.get("data")  # type: ignore
+    available_slots: List[dict] = []
+    slot_limit = int(max_slots_per_day) if max_slots_per_day is not None else None
+
+    if settings.SLOT_ENGINE == "numpy":
+        slot_seats = bitmap_slot_starts(
+            intervals=intervals,
+            day_start=day_start,
+            day_end=day_end,
+            day_start_utc=frame["day_start_utc"],
+            bookings=bookings,
+            holds=holds,
+            service_id=service_id,
+            total_minutes=total_minutes,
+            granularity_minutes=granularity_minutes,
+            min_notice_cutoff=min_notice_cutoff,
+            max_booking_cutoff=max_booking_cutoff,
+            capacity=capacity,
+            slot_limit=slot_limit,
+        )
+        if slot_seats is not None:
+            for minute, remaining in slot_seats:
+                cursor = day_start + timedelta(minutes=minute)
+                available_slots.append({
+                    "start_time": cursor.astimezone(customer_tz),
+                    "end_time": (cursor + timedelta(minutes=duration)).astimezone(customer_tz),
+                    "staff_id": staff_id_str,
+                    "staff_name": staff_name,
+                    "capacity": capacity,
+                    "remaining_capacity": remaining,
+                })
+            return available_slots
+
+    occupancy = DayOccupancy(bookings + holds, service_id)
+    for start_dt, end_dt in intervals:
+        cursor = _round_up_to_granularity(start_dt, granularity_minutes)
+        while cursor + timedelta(minutes=total_minutes) <= end_dt:
+            if cursor < min_notice_cutoff:
+                cursor += timedelta(minutes=granularity_minutes)
+                continue
+            if cursor > max_booking_cutoff:
+                break
 
-def _set_cached_slots(cache_key: str, data: List[dict]) -> None:
-    _SLOT_CACHE[cache_key] = {"ts": now_ts(), "data": data}
+            slot_start_utc = cursor.astimezone(utc)
+            slot_end_utc = (cursor + timedelta(minutes=total_minutes)).astimezone(utc)
+            remaining = occupancy.remaining(slot_start_utc, slot_end_utc, capacity)
+            if remaining > 0:
+                available_slots.append({
+                    "start_time": cursor.astimezone(customer_tz),
+                    "end_time": (cursor + timedelta(minutes=duration)).astimezone(customer_tz),
+                    "staff_id": staff_id_str,
+                    "staff_name": staff_name,
+                    "capacity": capacity,
+                    "remaining_capacity": remaining,
+                })
+                if slot_limit is not None and len(available_slots) >= slot_limit:
+                    return available_slots
+
+            cursor += timedelta(minutes=granularity_minutes)
 
-def _validate_uuid_param(value: Optional[str], field_name: str) -> Optional[str]:
-    if value in (None, ""):
-        return None
-    try:
-        uuid.UUID(str(value))
-    except (ValueError, TypeError):
-        raise HTTPException(status_code=400, detail=f"Invalid {field_name}")
-    return value
+    return available_slots
 
-def _compute_slots_for_date(
+def compute_slots_for_range(
     db: Session,
     service_id: str,
-    target_date: date,
+    start_date: date,
+    end_date: date,
     timezone: str,
     staff_id: Optional[str],
     location_id: Optional[str],
@@ -319,7 +462,9 @@ def _compute_slots_for_date(
     min_notice_minutes: int,
     max_booking_days: int,
     ignore_booking_limits: bool = False,
-) -> List[dict]:
+    only_dates: Optional[List[date]] = None,
+    exclude_booking_ids: Optional[List[str]] = None,
+) -> Dict[date, List[dict]]:
     try:
         customer_tz = ZoneInfo(timezone)
     except Exception:
@@ -337,299 +482,442 @@ def _compute_slots_for_date(
     base_buffer = int(service[1] or 0)
     base_capacity = int(service[2] or 1)
 
-    staff_query = """
-        SELECT ss.staff_id, u.full_name,
-               ss.duration_override, ss.buffer_override, ss.capacity_override
-        FROM staff_services ss
-        JOIN users u ON u.id = ss.staff_id
-        WHERE ss.service_id = :service_id
-          AND ss.is_bookable = TRUE
-          AND ss.is_temporarily_unavailable = FALSE
-          AND ss.admin_only = FALSE
-    """
-    params: Dict[str, object] = {"service_id": service_id}
-    if staff_id:
-        staff_query += " AND ss.staff_id = :staff_id"
-        params["staff_id"] = staff_id
-    if location_id:
-        staff_query += " AND u.location_id = :location_id"
-        params["location_id"] = location_id
-
-    staff_result = db.execute(staff_query, params)
-    staff_rows = staff_result.fetchall()
+    dates: List[date] = []
+    current = start_date
+    while current <= end_date:
+        dates.append(current)
+        current += timedelta(days=1)
+    if only_dates is not None:
+        wanted = set(only_dates)
+        dates = [target_date for target_date in dates if target_date in wanted]
+    results: Dict[date, List[dict]] = {target_date: [] for target_date in dates}
+    if not dates:
+        return results
+
+    staff_rows = _load_bookable_staff(db, service_id, staff_id, location_id)
     if not staff_rows:
-        return []
-
-    utc = dt_timezone.utc
-
-    available_slots: List[dict] = []
-
-    for row in staff_rows:
-        staff_id = row[0]
-        staff_id_str = str(staff_id)
-        staff_name = row[1]
-        duration = int(row[2] or base_duration)
-        buffer_minutes = int(row[3] or base_buffer)
-        capacity = int(row[4] or base_capacity or 1)
-        total_minutes = duration + buffer_minutes
+        return results
 
-        schedule_query = """
-            SELECT * FROM staff_weekly_schedules
-            WHERE staff_id = :staff_id
-              AND (effective_from IS NULL OR effective_from <= :date)
-              AND (effective_to IS NULL OR effective_to >= :date)
-        """
-        schedule_params: Dict[str, object] = {"staff_id": staff_id, "date": target_date}
-        if location_id:
-            schedule_query += " AND (location_id = :location_id OR location_id IS NULL)"
-            schedule_params["location_id"] = location_id
-        schedule_query += " ORDER BY (location_id IS NULL) ASC, is_default DESC, effective_from DESC NULLS LAST"
+    service_calendar = load_service_calendar(db, service_id)
+    templates = load_staff_schedule_templates(
+        db,
+        [row[0] for row in staff_rows],
+        location_id,
+    )
 
-        schedule = db.execute(schedule_query, schedule_params).fetchone()
-        if not schedule:
+    # Weekday is derived from the local calendar date, so it is the same for
+    # every schedule regardless of timezone.
+    working_plans = []
+    working_staff: Dict[str, object] = {}
+    for target_date in dates:
+        service_intervals_utc = service_calendar.intervals_for(target_date)
+        if not service_intervals_utc:
             continue
 
-        schedule_map = schedule._mapping
-        schedule_tz = ZoneInfo(schedule_map["timezone"])
-        max_slots_per_day = schedule_map.get("max_slots_per_day")
-        max_bookings_per_day = schedule_map.get("max_bookings_per_day")
-        day_start = datetime.combine(target_date, time(0, 0), tzinfo=schedule_tz)
-        day_end = day_start + timedelta(days=1)
-
-        now_local = datetime.now(schedule_tz)
-        min_notice_cutoff = now_local + timedelta(minutes=min_notice_minutes)
-        max_booking_cutoff = now_local + timedelta(days=max_booking_days)
-        if day_start.date() > max_booking_cutoff.date():
-            continue
+        weekday = (target_date.weekday() + 1) % 7
+        working_days = []
+        for row in staff_rows:
+            schedule = _select_staff_schedule(templates.get(str(row[0]), []), target_date)
+            if not schedule:
+                continue
+            template_day = schedule["days"].get(weekday)
+            if template_day is None:
+                continue
+            frame = _staff_day_frame(schedule, target_date, min_notice_minutes, max_booking_days)
+            if frame["day_start"].date() > frame["max_booking_cutoff"].date():
+                continue
+            working_days.append((row, schedule, frame, template_day))
+            working_staff[str(row[0])] = row[0]
+        if working_days:
+            working_plans.append((target_date, service_intervals_utc, working_days))
+    if not working_plans:
+        return results
+
+    working_frames = [
+        frame for _, _, working_days in working_plans for _, _, frame, _ in working_days
+    ]
+    occupancy = _prefetch_staff_occupancy(
+        db,
+        list(working_staff.values()),
+        min(frame["day_start_utc"] for frame in working_frames),
+        max(frame["day_end_utc"] for frame in working_frames),
+        exclude_booking_ids=exclude_booking_ids,
+    )
 
-        weekday = (day_start.weekday() + 1) % 7
+    for target_date, service_intervals_utc, working_days in working_plans:
+        available_slots = results[target_date]
+        for row, schedule, frame, template_day in working_days:
+            key = str(row[0])
+            day_start_utc = frame["day_start_utc"]
+            day_end_utc = frame["day_end_utc"]
+
+            available_slots.extend(
+                _build_staff_day_slots(
+                    staff_row=row,
+                    schedule=schedule,
+                    frame=frame,
+                    template_day=template_day,
+                    exceptions=_overlapping(
+                        occupancy["exceptions"].get(key, []), day_start_utc, day_end_utc
+                    ),
+                    bookings=_overlapping(
+                        occupancy["bookings"].get(key, []), day_start_utc, day_end_utc
+                    ),
+                    holds=_overlapping(
+                        occupancy["holds"].get(key, []), day_start_utc, day_end_utc
+                    ),
+                    service_id=service_id,
+                    service_intervals_utc=service_intervals_utc,
+                    target_date=target_date,
+                    customer_tz=customer_tz,
+                    base_duration=base_duration,
+                    base_buffer=base_buffer,
+                    base_capacity=base_capacity,
+                    granularity_minutes=granularity_minutes,
+                    window_start=window_start,
+                    window_end=window_end,
+                    ignore_booking_limits=ignore_booking_limits,
+                )
+            )
 
-        work_blocks = db.execute(
-            """
-            SELECT start_time_local, end_time_local
-            FROM staff_work_blocks
-            WHERE schedule_id = :schedule_id AND weekday = :weekday
-            """,
-            {"schedule_id": schedule._mapping["id"], "weekday": weekday},
-        ).fetchall()
+    return results
 
-        if not work_blocks:
-            continue
+def _compute_slots_for_date(
+    db: Session,
+    service_id: str,
+    target_date: date,
+    timezone: str,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+    granularity_minutes: int,
+    window_start: Optional[time],
+    window_end: Optional[time],
+    min_notice_minutes: int,
+    max_booking_days: int,
+    ignore_booking_limits: bool = False,
+) -> List[dict]:
+    return compute_slots_for_range(
+        db=db,
+        service_id=service_id,
+        start_date=target_date,
+        end_date=target_date,
+        timezone=timezone,
+        staff_id=staff_id,
+        location_id=location_id,
+        granularity_minutes=granularity_minutes,
+        window_start=window_start,
+        window_end=window_end,
+        min_notice_minutes=min_notice_minutes,
+        max_booking_days=max_booking_days,
+        ignore_booking_limits=ignore_booking_limits,
+    )[target_date]
 
-        intervals: List[Tuple[datetime, datetime]] = []
-        for block in work_blocks:
-            start_dt = datetime.combine(target_date, block[0], tzinfo=schedule_tz)
-            end_dt = datetime.combine(target_date, block[1], tzinfo=schedule_tz)
-            if end_dt <= start_dt:
-                continue
-            intervals.append((start_dt, end_dt))
+def is_slot_bookable(
+    db: Session,
+    service_id: str,
+    staff_id: str,
+    start_utc: datetime,
+    customer_id: Optional[str] = None,
+    exclude_booking_id: Optional[str] = None,
+    exclude_hold_by: Optional[str] = None,
+    granularity_minutes: int = settings.SLOT_GRANULARITY_MINUTES,
+    min_notice_minutes: int = settings.MIN_NOTICE_MINUTES,
+    max_booking_days: int = settings.MAX_BOOKING_DAYS,
+) -> Tuple[bool, Optional[str]]:
+    """Check a single start time against the rules the slot listing applies."""
+    utc = dt_timezone.utc
+    terms = db.execute(
+        """
+        SELECT ss.staff_id, ss.duration_override, ss.buffer_override, ss.capacity_override,
+               s.duration_minutes, s.buffer_minutes, s.max_capacity
+        FROM services s
+        JOIN staff_services ss ON ss.service_id = s.id AND ss.staff_id = :staff_id
+        WHERE s.id = :service_id
+        """,
+        {"staff_id": staff_id, "service_id": service_id},
+    ).fetchone()
+    if not terms:
+        return False, "Staff is not assigned to this service"
+
+    staff_row = (terms[0], None, terms[1], terms[2], terms[3])
+    base_duration = int(terms[4])
+    base_buffer = int(terms[5] or 0)
+    base_capacity = int(terms[6] or 1)
+    duration, buffer_minutes, capacity = _staff_service_terms(
+        staff_row, base_duration, base_buffer, base_capacity
+    )
 
-        break_blocks = db.execute(
-            """
-            SELECT start_time_local, end_time_local
-            FROM staff_break_blocks
-            WHERE schedule_id = :schedule_id AND weekday = :weekday
-            """,
-            {"schedule_id": schedule._mapping["id"], "weekday": weekday},
-        ).fetchall()
+    utc_date = start_utc.astimezone(utc).date()
+    candidates = load_staff_schedule_templates(db, [staff_id]).get(str(staff_id), [])
+    schedule = _select_staff_schedule(candidates, utc_date)
+    if not schedule:
+        return False, "Staff schedule is not configured"
 
-        break_intervals: List[Tuple[datetime, datetime]] = []
-        for block in break_blocks:
-            start_dt = datetime.combine(target_date, block[0], tzinfo=schedule_tz)
-            end_dt = datetime.combine(target_date, block[1], tzinfo=schedule_tz)
-            clipped = _clip_interval(start_dt, end_dt, day_start, day_end)
-            if clipped:
-                break_intervals.append(clipped)
-
-        intervals = _subtract_intervals(_merge_intervals(intervals), break_intervals)
-
-        if window_start and window_end:
-            window_start_dt = datetime.combine(target_date, window_start, tzinfo=schedule_tz)
-            window_end_dt = datetime.combine(target_date, window_end, tzinfo=schedule_tz)
-            window_interval = _clip_interval(window_start_dt, window_end_dt, day_start, day_end)
-            if window_interval:
-                intervals = _subtract_intervals(
-                    intervals,
-                    _subtract_intervals([(day_start, day_end)], [window_interval])
-                )
-            else:
-                intervals = []
+    # The schedule's timezone decides the local day, which can in turn select
+    # a different schedule.
+    local_date = start_utc.astimezone(ZoneInfo(schedule["timezone"])).date()
+    schedule = _select_staff_schedule(candidates, local_date)
+    if not schedule:
+        return False, "Staff schedule is not configured"
 
-        day_start_utc = day_start.astimezone(utc)
-        day_end_utc = day_end.astimezone(utc)
+    frame = _staff_day_frame(schedule, local_date, min_notice_minutes, max_booking_days)
+    schedule_tz = frame["tz"]
+    slot_start_utc = start_utc.astimezone(utc)
+    slot_end_utc = slot_start_utc + timedelta(minutes=duration + buffer_minutes)
+    slot_start = slot_start_utc.astimezone(schedule_tz)
+    slot_end = slot_end_utc.astimezone(schedule_tz)
 
-        if BOOKINGS_ENABLED and max_bookings_per_day is not None and not ignore_booking_limits:
-            booking_count = db.execute(
-                """
-                SELECT COUNT(*)
-                FROM bookings
-                WHERE staff_id = :staff_id
-                  AND start_time_utc < :day_end
-                  AND end_time_utc > :day_start
-                  AND status NOT IN ('cancelled', 'no-show')
-                """,
-                {"staff_id": staff_id, "day_start": day_start_utc, "day_end": day_end_utc},
-            ).scalar()
-            if booking_count is not None and int(booking_count) >= int(max_bookings_per_day):
-                continue
+    if slot_start < frame["min_notice_cutoff"]:
+        return False, "Booking does not meet minimum notice"
+    if slot_start > frame["max_booking_cutoff"]:
+        return False, "Booking exceeds maximum window"
 
-        exceptions = db.execute(
-            """
-            SELECT type, start_utc, end_utc, is_all_day
-            FROM staff_exceptions
+    occupancy = _prefetch_staff_occupancy(
+        db,
+        [staff_id],
+        frame["day_start_utc"],
+        frame["day_end_utc"],
+        exclude_booking_id=exclude_booking_id,
+        exclude_hold_by=exclude_hold_by,
+    )
+    key = str(staff_id)
+    exceptions = occupancy["exceptions"].get(key, [])
+    bookings = occupancy["bookings"].get(key, [])
+    holds = occupancy["holds"].get(key, [])
+
+    max_bookings_per_day = schedule.get("max_bookings_per_day")
+    if BOOKINGS_ENABLED and max_bookings_per_day is not None:
+        if len(bookings) >= int(max_bookings_per_day):
+            return False, "Staff daily booking limit reached"
+
+    max_bookings_per_customer = schedule.get("max_bookings_per_customer")
+    if customer_id and max_bookings_per_customer is not None:
+        customer_query = """
+            SELECT COUNT(*)
+            FROM bookings
             WHERE staff_id = :staff_id
-              AND start_utc < :day_end
-              AND end_utc > :day_start
-            """,
-            {"staff_id": staff_id, "day_start": day_start_utc, "day_end": day_end_utc},
-        ).fetchall()
-
-        override_intervals: List[Tuple[datetime, datetime]] = []
-        time_off_intervals: List[Tuple[datetime, datetime]] = []
-        blocked_intervals: List[Tuple[datetime, datetime]] = []
-        extra_intervals: List[Tuple[datetime, datetime]] = []
-
-        for ex in exceptions:
-            ex_type = ex[0]
-            ex_start = ex[1].astimezone(schedule_tz)
-            ex_end = ex[2].astimezone(schedule_tz)
-            clipped = _clip_interval(ex_start, ex_end, day_start, day_end)
-            if not clipped:
+              AND customer_id = :customer_id
+              AND status NOT IN ('cancelled', 'no-show', 'completed')
+              AND end_time_utc > NOW()
+        """
+        customer_params: Dict[str, object] = {
+            "staff_id": staff_id,
+            "customer_id": customer_id,
+        }
+        if exclude_booking_id:
+            customer_query += " AND id <> :exclude_booking_id"
+            customer_params["exclude_booking_id"] = exclude_booking_id
+        count = db.execute(customer_query, customer_params).scalar()
+        if int(count or 0) >= int(max_bookings_per_customer):
+            return False, "Customer booking limit reached for this staff member"
+
+    template_day = schedule["days"].get((local_date.weekday() + 1) % 7)
+    if template_day is None:
+        return False, "Staff is not available on this day"
+
+    service_intervals_utc = load_service_calendar(db, service_id).intervals_for(local_date)
+    intervals = _staff_day_intervals(
+        frame=frame,
+        template_day=template_day,
+        exceptions=exceptions,
+        service_intervals_utc=service_intervals_utc,
+        target_date=local_date,
+        window_start=None,
+        window_end=None,
+    )
+    if not any(start <= slot_start and slot_end <= end for start, end in intervals):
+        if not any(
+            start <= slot_start_utc and slot_end_utc <= end
+            for start, end in service_intervals_utc
+        ):
+            return False, "Service is not available at this time"
+        for ex_type, ex_start, ex_end, is_all_day in exceptions:
+            if ex_type not in ("time_off", "blocked_time"):
                 continue
-            if ex_type == "override_day":
-                override_intervals.append(clipped)
-            elif ex_type == "time_off":
-                if ex[3]:
-                    time_off_intervals.append((day_start, day_end))
-                else:
-                    time_off_intervals.append(clipped)
-            elif ex_type == "blocked_time":
-                blocked_intervals.append(clipped)
-            elif ex_type == "extra_availability":
-                extra_intervals.append(clipped)
-
-        if override_intervals:
-            intervals = _merge_intervals(override_intervals)
-
-        if time_off_intervals:
-            intervals = _subtract_intervals(intervals, _merge_intervals(time_off_intervals))
-
-        if blocked_intervals:
-            intervals = _subtract_intervals(intervals, _merge_intervals(blocked_intervals))
-
-        if extra_intervals:
-            intervals = _merge_intervals(intervals + extra_intervals)
-
-        service_intervals_utc = _get_service_operating_intervals(
-            db=db,
+            if is_all_day or (ex_start < slot_end_utc and ex_end > slot_start_utc):
+                return False, "Staff is unavailable for this time"
+        day_start = frame["day_start"]
+        for break_start_offset, break_end_offset in template_day["breaks"]:
+            break_start = day_start + timedelta(seconds=break_start_offset)
+            break_end = day_start + timedelta(seconds=break_end_offset)
+            if slot_start < break_end and slot_end > break_start:
+                return False, "Time overlaps a staff break"
+        return False, "Time is outside staff working hours"
+
+    conflict = DayOccupancy(bookings + holds, service_id).conflict(
+        slot_start_utc, slot_end_utc, capacity
+    )
+    if conflict:
+        return False, conflict
+
+    # A daily slot cap only admits the first N listed starts, so the slot's
+    # position in the day's listing has to be reproduced.
+    if schedule.get("max_slots_per_day") is not None:
+        day_slots = _build_staff_day_slots(
+            staff_row=staff_row,
+            schedule=schedule,
+            frame=frame,
+            template_day=template_day,
+            exceptions=exceptions,
+            bookings=bookings,
+            holds=holds,
             service_id=service_id,
-            target_date=target_date,
+            service_intervals_utc=service_intervals_utc,
+            target_date=local_date,
+            customer_tz=utc,
+            base_duration=base_duration,
+            base_buffer=base_buffer,
+            base_capacity=base_capacity,
+            granularity_minutes=granularity_minutes,
+            window_start=None,
+            window_end=None,
+            ignore_booking_limits=True,
         )
-        if not service_intervals_utc:
-            continue
+        requested_start = slot_start_utc.replace(second=0, microsecond=0)
+        if not any(
+            slot["start_time"].replace(second=0, microsecond=0) == requested_start
+            for slot in day_slots
+        ):
+            return False, "Selected time is not available"
 
-        staff_intervals_utc = [
-            (start.astimezone(utc), end.astimezone(utc))
-            for start, end in intervals
-        ]
-        intersected_utc = _intersect_intervals(
-            staff_intervals_utc,
-            service_intervals_utc,
-        )
-        if not intersected_utc:
-            continue
-        intervals = [
-            (start.astimezone(schedule_tz), end.astimezone(schedule_tz))
-            for start, end in intersected_utc
-        ]
+    return True, None
+
+def check_slot_starts(
+    db: Session,
+    service_id: str,
+    staff_id: str,
+    starts_utc: List[datetime],
+    customer_id: Optional[str] = None,
+    exclude_booking_ids: Optional[List[str]] = None,
+) -> List[Optional[str]]:
+    """Check many start times for one staff member; returns an error (or None) per start.
+
+    Uses a single slot computation over just the affected days, so the starts
+    have to be on the listing grid. Starts are assumed to fall on distinct days.
+    """
+    utc = dt_timezone.utc
+    errors: List[Optional[str]] = [None] * len(starts_utc)
+    candidates = load_staff_schedule_templates(db, [staff_id]).get(str(staff_id), [])
+    local_dates: List[Tuple[Optional[date], Optional[dict]]] = []
+    for index, start_utc in enumerate(starts_utc):
+        schedule = _select_staff_schedule(candidates, start_utc.astimezone(utc).date())
+        local_date = None
+        if schedule:
+            local_date = start_utc.astimezone(ZoneInfo(schedule["timezone"])).date()
+            schedule = _select_staff_schedule(candidates, local_date)
+        if not schedule:
+            errors[index] = "Staff schedule is not configured"
+            local_date = None
+        local_dates.append((local_date, schedule))
+
+    wanted = [local_date for local_date, _ in local_dates if local_date is not None]
+    if not wanted:
+        return errors
+    range_slots = compute_slots_for_range(
+        db=db,
+        service_id=service_id,
+        start_date=min(wanted),
+        end_date=max(wanted),
+        timezone="UTC",
+        staff_id=staff_id,
+        location_id=None,
+        granularity_minutes=settings.SLOT_GRANULARITY_MINUTES,
+        window_start=None,
+        window_end=None,
+        min_notice_minutes=settings.MIN_NOTICE_MINUTES,
+        max_booking_days=settings.MAX_BOOKING_DAYS,
+        only_dates=wanted,
+        exclude_booking_ids=exclude_booking_ids,
+    )
 
-        if not intervals:
+    customer_bookings = None
+    for index, (local_date, schedule) in enumerate(local_dates):
+        if local_date is None:
+            continue
+        requested_start = starts_utc[index].astimezone(utc).replace(second=0, microsecond=0)
+        if not any(
+            slot["start_time"].astimezone(utc).replace(second=0, microsecond=0) == requested_start
+            for slot in range_slots.get(local_date, [])
+        ):
+            errors[index] = "Selected time is not available"
             continue
 
-        booked_intervals: List[Tuple[datetime, datetime]] = []
-        if BOOKINGS_ENABLED:
-            bookings = db.execute(
-                """
-                SELECT service_id, start_time_utc, end_time_utc
+        max_bookings_per_customer = schedule.get("max_bookings_per_customer")
+        if not customer_id or max_bookings_per_customer is None:
+            continue
+        if customer_bookings is None:
+            customer_query = """
+                SELECT COUNT(*)
                 FROM bookings
                 WHERE staff_id = :staff_id
-                  AND start_time_utc < :day_end
-                  AND end_time_utc > :day_start
-                  AND status NOT IN ('cancelled', 'no-show')
-                """,
-                {"staff_id": staff_id, "day_start": day_start_utc, "day_end": day_end_utc},
-            ).fetchall()
-            booked_intervals = [(b[0], b[1], b[2]) for b in bookings]
-
-        holds = db.execute(
+                  AND customer_id = :customer_id
+                  AND status NOT IN ('cancelled', 'no-show', 'completed')
+                  AND end_time_utc > NOW()
             """
-            SELECT service_id, start_utc, end_utc
-            FROM booking_holds
-            WHERE staff_id = :staff_id
-              AND expires_at_utc > NOW()
-              AND start_utc < :day_end
-              AND end_utc > :day_start
-            """,
-            {"staff_id": staff_id, "day_start": day_start_utc, "day_end": day_end_utc},
-        ).fetchall()
-        hold_intervals = [(h[0], h[1], h[2]) for h in holds]
-
-        if max_slots_per_day is not None and int(max_slots_per_day) <= 0:
+            customer_params: Dict[str, object] = {
+                "staff_id": staff_id,
+                "customer_id": customer_id,
+            }
+            if exclude_booking_ids:
+                customer_query += " AND NOT (id = ANY(CAST(:exclude_booking_ids AS uuid[])))"
+                customer_params["exclude_booking_ids"] = exclude_booking_ids
+            customer_bookings = int(db.execute(customer_query, customer_params).scalar() or 0)
+        if customer_bookings >= int(max_bookings_per_customer):
+            errors[index] = "Customer booking limit reached for this staff member"
             continue
+        customer_bookings += 1
 
-        slots_added = 0
-        slot_limit = int(max_slots_per_day) if max_slots_per_day is not None else None
-
-        for start_dt, end_dt in intervals:
-            cursor = _round_up_to_granularity(start_dt, granularity_minutes)
-            while cursor + timedelta(minutes=total_minutes) <= end_dt:
-                if cursor < min_notice_cutoff:
-                    cursor += timedelta(minutes=granularity_minutes)
-                    continue
-                if cursor > max_booking_cutoff:
-                    break
-
-                slot_start_utc = cursor.astimezone(utc)
-                slot_end_utc = (cursor + timedelta(minutes=total_minutes)).astimezone(utc)
-                conflict = False
-                same_count = 0
-                for booked_service_id, booked_start, booked_end in booked_intervals:
-                    if slot_start_utc < booked_end and slot_end_utc > booked_start:
-                        if booked_service_id != service_id:
-                            conflict = True
-                            break
-                        same_count += 1
-                if not conflict:
-                    for hold_service_id, hold_start, hold_end in hold_intervals:
-                        if slot_start_utc < hold_end and slot_end_utc > hold_start:
-                            if hold_service_id != service_id:
-                                conflict = True
-                                break
-                            same_count += 1
-
-                if not conflict:
-                    if capacity <= 1:
-                        conflict = same_count > 0
-                    else:
-                        conflict = same_count >= capacity
-
-                if not conflict:
-                    available_slots.append({
-                        "start_time": cursor.astimezone(customer_tz),
-                        "end_time": (cursor + timedelta(minutes=duration)).astimezone(customer_tz),
-                        "staff_id": staff_id_str,
-                        "staff_name": staff_name,
-                    })
-                    slots_added += 1
-                    if slot_limit is not None and slots_added >= slot_limit:
-                        break
+    return errors
 
-                cursor += timedelta(minutes=granularity_minutes)
+def _get_cached_range_slots(
+    db: Session,
+    service_id: str,
+    start_date: date,
+    end_date: date,
+    timezone: str,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+    granularity_minutes: int,
+) -> Dict[date, List[dict]]:
+    dates: List[date] = []
+    current = start_date
+    while current <= end_date:
+        dates.append(current)
+        current += timedelta(days=1)
+    cache_keys = slot_cache_keys(
+        service_id, dates, timezone, staff_id, location_id, granularity_minutes
+    )
 
-            if slot_limit is not None and slots_added >= slot_limit:
-                break
+    results: Dict[date, List[dict]] = {}
+    missing: List[date] = []
+    for target_date in dates:
+        cached = get_cached_slots(cache_keys[target_date])
+        if cached is None:
+            missing.append(target_date)
+        else:
+            results[target_date] = cached
 
-    return available_slots
+    if missing:
+        computed = compute_slots_for_range(
+            db=db,
+            service_id=service_id,
+            start_date=missing[0],
+            end_date=missing[-1],
+            timezone=timezone,
+            staff_id=staff_id,
+            location_id=location_id,
+            granularity_minutes=granularity_minutes,
+            window_start=None,
+            window_end=None,
+            min_notice_minutes=settings.MIN_NOTICE_MINUTES,
+            max_booking_days=settings.MAX_BOOKING_DAYS,
+        )
+        hold_expiries = live_hold_expiries(db, staff_id, missing)
+        for target_date in missing:
+            slots = sorted(computed[target_date], key=lambda s: s["start_time"])
+            set_cached_slots(cache_keys[target_date], slots, hold_expiries[target_date])
+            results[target_date] = slots
+    return results
 
 def _get_schedule_owner(db: Session, schedule_id: str) -> Optional[str]:
     result = db.execute(
@@ -715,6 +1003,7 @@ async def create_weekly_schedule(
         payload.model_dump(),
     )
     db.commit()
+    bump_staff_schedule_generation(db, staff_id)
 
     created = db.execute(
         text("SELECT * FROM staff_weekly_schedules WHERE id = :id"),
@@ -780,6 +1069,7 @@ async def update_weekly_schedule(
             updates,
         )
         db.commit()
+        bump_staff_schedule_generation(db, existing._mapping["staff_id"])
 
     refreshed = db.execute(
         text("SELECT * FROM staff_weekly_schedules WHERE id = :id"),
@@ -813,6 +1103,7 @@ async def delete_weekly_schedule(
         None,
     )
     db.commit()
+    bump_staff_schedule_generation(db, owner_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Schedule not found")
@@ -865,6 +1156,7 @@ async def create_work_block(
             status_code=400,
             detail="Failed to create work block. Check schedule_id and weekday/time constraints.",
         )
+    bump_staff_schedule_generation(db, owner_id)
 
     created = db.execute(
         text("SELECT * FROM staff_work_blocks WHERE id = :id"),
@@ -918,6 +1210,7 @@ async def create_break_block(
             status_code=400,
             detail="Failed to create break block. Check schedule_id and weekday/time constraints.",
         )
+    bump_staff_schedule_generation(db, owner_id)
 
     created = db.execute(
         text("SELECT * FROM staff_break_blocks WHERE id = :id"),
@@ -995,6 +1288,7 @@ async def delete_work_block(
         None,
     )
     db.commit()
+    bump_staff_schedule_generation(db, owner_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Work block not found")
@@ -1031,6 +1325,7 @@ async def delete_break_block(
         None,
     )
     db.commit()
+    bump_staff_schedule_generation(db, owner_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Break block not found")
@@ -1079,6 +1374,7 @@ async def create_staff_exception(
         payload.model_dump(),
     )
     db.commit()
+    bump_staff_generation(db, staff_id)
 
     created = db.execute(
         text("SELECT * FROM staff_exceptions WHERE id = :id"),
@@ -1147,6 +1443,8 @@ async def create_staff_exceptions_bulk(
         created_rows.append(exception_id)
 
     db.commit()
+    for staff_id in staff_ids:
+        bump_staff_generation(db, staff_id)
 
     results = db.execute(
         text("SELECT * FROM staff_exceptions WHERE id = ANY(:ids)"),
@@ -1210,6 +1508,7 @@ async def delete_staff_exception(
         None,
     )
     db.commit()
+    bump_staff_generation(db, owner[0])
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Exception not found")
@@ -1220,9 +1519,20 @@ async def delete_staff_exception(
 async def create_booking_hold(
     payload: BookingHoldCreate,
     current_user: dict = Depends(require_roles("customer", "staff", "admin", "superadmin")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """Create a temporary hold for a slot."""
+    return await run_idempotent(
+        db,
+        idempotency_key,
+        current_user.get("id"),
+        "holds.create",
+        payload,
+        lambda: db.run_sync(_create_booking_hold, payload, current_user),
+    )
+
+def _create_booking_hold(db: Session, payload: BookingHoldCreate, current_user: dict) -> dict:
     hold_id = str(uuid.uuid4())
     db.execute(
         """
@@ -1251,6 +1561,7 @@ async def create_booking_hold(
         payload.model_dump(),
     )
     db.commit()
+    bump_staff_generation(db, payload.staff_id)
 
     created = db.execute(
         "SELECT * FROM booking_holds WHERE id = :id",
@@ -1262,9 +1573,13 @@ async def create_booking_hold(
 async def list_booking_holds(
     staff_id: Optional[str] = None,
     current_user: dict = Depends(require_roles("customer", "staff", "admin", "superadmin")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List active booking holds."""
+    return await db.run_sync(_list_booking_holds, staff_id, current_user)
+
+
+def _list_booking_holds(db: Session, staff_id: Optional[str], current_user: dict):
     query = "SELECT * FROM booking_holds WHERE expires_at_utc > NOW()"
     params: Dict[str, object] = {}
 
@@ -1284,11 +1599,15 @@ async def list_booking_holds(
 async def delete_booking_hold(
     hold_id: str,
     current_user: dict = Depends(require_roles("customer", "staff", "admin", "superadmin")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a booking hold."""
+    return await db.run_sync(_delete_booking_hold, hold_id, current_user)
+
+
+def _delete_booking_hold(db: Session, hold_id: str, current_user: dict):
     hold = db.execute(
-        "SELECT created_by FROM booking_holds WHERE id = :id",
+        "SELECT created_by, staff_id FROM booking_holds WHERE id = :id",
         {"id": hold_id},
     ).fetchone()
 
@@ -1311,6 +1630,7 @@ async def delete_booking_hold(
         None,
     )
     db.commit()
+    bump_staff_generation(db, hold[1])
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Hold not found")
@@ -1461,10 +1781,13 @@ async def get_available_slots(
     service_id: str,
     date: date,
     staff_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get available time slots for a service on a specific date"""
-    # Get service details
+    return await db.run_sync(_get_available_slots, service_id, date, staff_id)
+
+
+def _get_available_slots(db: Session, service_id: str, date: date, staff_id: str):
     service_result = db.execute(
         "SELECT duration_minutes, buffer_minutes, max_capacity FROM services WHERE id = :id",
         {"id": service_id}
@@ -1512,11 +1835,7 @@ async def get_available_slots(
         day_of_week += 1
     
     available_slots = []
-    service_intervals_utc = _get_service_operating_intervals(
-        db=db,
-        service_id=service_id,
-        target_date=date,
-    )
+    service_intervals_utc = load_service_calendar(db, service_id).intervals_for(date)
     if not service_intervals_utc:
         return []
     
@@ -1594,6 +1913,7 @@ async def get_available_slots(
 
         slots_added = 0
         slot_limit = int(max_slots_per_day) if max_slots_per_day is not None else None
+        occupancy = DayOccupancy(booked_times, service_id)
         
         # Generate available slots
         for start_time, end_time, rule_timezone in time_ranges:
@@ -1616,27 +1936,15 @@ async def get_available_slots(
                     continue
                 
                 # Check if slot conflicts with existing bookings
-                conflict = False
-                same_count = 0
-                for booked_service_id, booked_start, booked_end in booked_times:
-                    if slot_start_utc < booked_end and slot_end_utc > booked_start:
-                        if booked_service_id != service_id:
-                            conflict = True
-                            break
-                        same_count += 1
-
-                if not conflict:
-                    if staff_capacity <= 1:
-                        conflict = same_count > 0
-                    else:
-                        conflict = same_count >= staff_capacity
-
-                if not conflict:
+                remaining = occupancy.remaining(slot_start_utc, slot_end_utc, staff_capacity)
+                if remaining > 0:
                     available_slots.append({
                         "start_time": current_time,
                         "end_time": slot_end,
                         "staff_id": staff_id,
-                        "staff_name": None  # Can be joined from user_profiles
+                        "staff_name": None,  # Can be joined from user_profiles
+                        "capacity": staff_capacity,
+                        "remaining_capacity": remaining,
                     })
                     slots_added += 1
                     if slot_limit is not None and slots_added >= slot_limit:
@@ -1661,9 +1969,37 @@ async def get_available_slots_v2(
     window_end: Optional[time] = None,
     limit: int = 200,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get available time slots using weekly schedules + exceptions (timezone-aware)."""
+    return await db.run_sync(
+        _get_available_slots_v2,
+        service_id,
+        date,
+        timezone,
+        staff_id,
+        location_id,
+        granularity_minutes,
+        window_start,
+        window_end,
+        limit,
+        offset,
+    )
+
+
+def _get_available_slots_v2(
+    db: Session,
+    service_id: str,
+    date: date,
+    timezone: str,
+    staff_id: str,
+    location_id: str,
+    granularity_minutes: Optional[int],
+    window_start: Optional[time],
+    window_end: Optional[time],
+    limit: int,
+    offset: int,
+):
     granularity = granularity_minutes or settings.SLOT_GRANULARITY_MINUTES
     if granularity not in (5, 10, 15, 30):
         raise HTTPException(status_code=400, detail="Invalid granularity")
@@ -1688,35 +2024,31 @@ async def get_available_slots_v2(
         if not location_exists:
             raise HTTPException(status_code=404, detail="Location not found")
 
-    cache_key = (
-        f"slots-v2:{service_id}:{date}:{timezone}:{staff_id or 'any'}:"
-        f"{location_id or 'any'}:{granularity}:{window_start}:{window_end}:{limit}:{offset}"
-    )
-    cached = _get_cached_slots(cache_key)
-    if cached is not None:
-        return cached
-
-    slots = _compute_slots_for_date(
-        db=db,
-        service_id=service_id,
-        target_date=date,
-        timezone=timezone,
-        staff_id=staff_id,
-        location_id=location_id,
-        granularity_minutes=granularity,
-        window_start=window_start,
-        window_end=window_end,
-        min_notice_minutes=settings.MIN_NOTICE_MINUTES,
-        max_booking_days=settings.MAX_BOOKING_DAYS,
+    cache_key = slot_cache_key(
+        service_id, date, timezone, staff_id, location_id, granularity, window_start, window_end
     )
+    slots = get_cached_slots(cache_key)
+    if slots is None:
+        slots = _compute_slots_for_date(
+            db=db,
+            service_id=service_id,
+            target_date=date,
+            timezone=timezone,
+            staff_id=staff_id,
+            location_id=location_id,
+            granularity_minutes=granularity,
+            window_start=window_start,
+            window_end=window_end,
+            min_notice_minutes=settings.MIN_NOTICE_MINUTES,
+            max_booking_days=settings.MAX_BOOKING_DAYS,
+        )
+        slots = sorted(slots, key=lambda s: s["start_time"])
+        set_cached_slots(cache_key, slots, live_hold_expiries(db, staff_id, [date])[date])
 
-    slots = sorted(slots, key=lambda s: s["start_time"])
     if offset:
         slots = slots[offset:]
     if limit:
         slots = slots[:limit]
-
-    _set_cached_slots(cache_key, slots)
     return slots
 
 @router.get("/slots-v2/next-available")
@@ -1727,9 +2059,29 @@ async def get_next_available_day(
     location_id: str = None,
     granularity_minutes: Optional[int] = None,
     from_date: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Return the next available date with at least one slot."""
+    return await db.run_sync(
+        _get_next_available_day,
+        service_id,
+        timezone,
+        staff_id,
+        location_id,
+        granularity_minutes,
+        from_date,
+    )
+
+
+def _get_next_available_day(
+    db: Session,
+    service_id: str,
+    timezone: str,
+    staff_id: str,
+    location_id: str,
+    granularity_minutes: Optional[int],
+    from_date: Optional[date],
+):
     granularity = granularity_minutes or settings.SLOT_GRANULARITY_MINUTES
     if granularity not in (5, 10, 15, 30):
         raise HTTPException(status_code=400, detail="Invalid granularity")
@@ -1762,32 +2114,24 @@ async def get_next_available_day(
     start_date = from_date or today
     if start_date < today:
         start_date = today
-    for day_offset in range(0, settings.MAX_BOOKING_DAYS + 1):
-        target_date = start_date + timedelta(days=day_offset)
-        cache_key = (
-            f"slots-v2:{service_id}:{target_date}:{timezone}:{staff_id or 'any'}:"
-            f"{location_id or 'any'}:{granularity}:None:None"
+    final_date = start_date + timedelta(days=settings.MAX_BOOKING_DAYS)
+    chunk_start = start_date
+    while chunk_start <= final_date:
+        chunk_end = min(chunk_start + timedelta(days=_RANGE_CHUNK_DAYS - 1), final_date)
+        range_slots = _get_cached_range_slots(
+            db=db,
+            service_id=service_id,
+            start_date=chunk_start,
+            end_date=chunk_end,
+            timezone=timezone,
+            staff_id=staff_id,
+            location_id=location_id,
+            granularity_minutes=granularity,
         )
-        cached = _get_cached_slots(cache_key)
-        if cached is None:
-            slots = _compute_slots_for_date(
-                db=db,
-                service_id=service_id,
-                target_date=target_date,
-                timezone=timezone,
-                staff_id=staff_id,
-                location_id=location_id,
-                granularity_minutes=granularity,
-                window_start=None,
-                window_end=None,
-                min_notice_minutes=settings.MIN_NOTICE_MINUTES,
-                max_booking_days=settings.MAX_BOOKING_DAYS,
-            )
-            _set_cached_slots(cache_key, slots)
-        else:
-            slots = cached
-        if slots:
-            return {"date": target_date}
+        for target_date in sorted(range_slots):
+            if range_slots[target_date]:
+                return {"date": target_date}
+        chunk_start = chunk_end + timedelta(days=1)
 
     return {"date": None}
 
@@ -1800,9 +2144,31 @@ async def get_month_availability(
     staff_id: str = None,
     location_id: str = None,
     granularity_minutes: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return availability per day for a given month (customer booking calendar)."""
+    return await db.run_sync(
+        _get_month_availability,
+        service_id,
+        year,
+        month,
+        timezone,
+        staff_id,
+        location_id,
+        granularity_minutes,
+    )
+
+
+def _get_month_availability(
+    db: Session,
+    service_id: str,
+    year: int,
+    month: int,
+    timezone: str,
+    staff_id: str,
+    location_id: str,
+    granularity_minutes: Optional[int],
+):
     if month < 1 or month > 12:
         raise HTTPException(status_code=400, detail="Invalid month")
 
@@ -1841,38 +2207,25 @@ async def get_month_availability(
     end_date = date(year, month, last_day)
     max_date = today + timedelta(days=settings.MAX_BOOKING_DAYS)
 
+    bookable_start = max(start_date, today)
+    bookable_end = min(end_date, max_date)
+    range_slots: Dict[date, List[dict]] = {}
+    if bookable_start <= bookable_end:
+        range_slots = _get_cached_range_slots(
+            db=db,
+            service_id=service_id,
+            start_date=bookable_start,
+            end_date=bookable_end,
+            timezone=timezone,
+            staff_id=staff_id,
+            location_id=location_id,
+            granularity_minutes=granularity,
+        )
+
     results = []
     current = start_date
     while current <= end_date:
-        if current < today or current > max_date:
-            results.append({"date": current, "has_slots": False})
-            current += timedelta(days=1)
-            continue
-
-        cache_key = (
-            f"slots-v2:{service_id}:{current}:{timezone}:{staff_id or 'any'}:"
-            f"{location_id or 'any'}:{granularity}:None:None"
-        )
-        cached = _get_cached_slots(cache_key)
-        if cached is None:
-            slots = _compute_slots_for_date(
-                db=db,
-                service_id=service_id,
-                target_date=current,
-                timezone=timezone,
-                staff_id=staff_id,
-                location_id=location_id,
-                granularity_minutes=granularity,
-                window_start=None,
-                window_end=None,
-                min_notice_minutes=settings.MIN_NOTICE_MINUTES,
-                max_booking_days=settings.MAX_BOOKING_DAYS,
-            )
-            _set_cached_slots(cache_key, slots)
-        else:
-            slots = cached
-
-        results.append({"date": current, "has_slots": bool(slots)})
+        results.append({"date": current, "has_slots": bool(range_slots.get(current))})
         current += timedelta(days=1)
 
     return results
@@ -1884,9 +2237,27 @@ async def get_availability_calendar(
     staff_id: Optional[str] = None,
     location_id: Optional[str] = None,
     current_user: dict = Depends(require_roles("staff", "admin", "superadmin")),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return bookings, exceptions, and holds for availability calendar views."""
+    return await db.run_sync(
+        _get_availability_calendar,
+        start_date,
+        end_date,
+        staff_id,
+        location_id,
+        current_user,
+    )
+
+
+def _get_availability_calendar(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+    current_user: dict,
+):
     if not is_admin(current_user):
         if staff_id and staff_id != current_user.get("id"):
             raise HTTPException(status_code=403, detail="Forbidden")
@@ -1906,7 +2277,7 @@ async def get_availability_calendar(
             LEFT JOIN services s ON b.service_id = s.id
             LEFT JOIN users u ON b.staff_id = u.id
             LEFT JOIN customers c ON b.customer_id = c.id
-            WHERE b.start_time_utc < :end_utc AND b.end_time_utc > :start_utc
+            WHERE b.period && tstzrange(:start_utc, :end_utc)
         """
         booking_params: Dict[str, object] = {"start_utc": start_utc, "end_utc": end_utc}
         if staff_id:
@@ -1936,7 +2307,7 @@ async def get_availability_calendar(
     hold_query = """
         SELECT id, start_utc, end_utc, staff_id
         FROM booking_holds
-        WHERE start_utc < :end_utc AND end_utc > :start_utc
+        WHERE period && tstzrange(:start_utc, :end_utc)
           AND expires_at_utc > NOW()
     """
     hold_params: Dict[str, object] = {"start_utc": start_utc, "end_utc": end_utc}
@@ -2014,8 +2385,7 @@ async def get_availability_calendar(
                     FROM bookings
                     WHERE staff_id = :staff_id
                       AND status NOT IN ('cancelled', 'no-show')
-                      AND start_time_utc < :day_end
-                      AND end_time_utc > :day_start
+                      AND period && tstzrange(:day_start, :day_end)
                     """,
                     {
                         "staff_id": staff_row_id,
@@ -2055,7 +2425,7 @@ async def get_availability_calendar(
             JOIN users u ON u.id = b.staff_id
             WHERE e.type IN ('time_off', 'blocked_time')
               AND b.status NOT IN ('cancelled', 'no-show')
-              AND b.start_time_utc < :end_utc AND b.end_time_utc > :start_utc
+              AND b.period && tstzrange(:start_utc, :end_utc)
               AND e.start_utc < :end_utc AND e.end_utc > :start_utc
               AND b.start_time_utc < e.end_utc AND b.end_time_utc > e.start_utc
         """
@@ -2427,6 +2797,7 @@ async def approve_schedule_change_request(
         payload.model_dump(),
     )
     db.commit()
+    bump_staff_schedule_generation(db, request_map["staff_id"])
 
     return _normalize_uuid_values(dict(result._mapping))
 
@@ -1,183 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Tuple, Dict
-from datetime import datetime, timedelta, time, date, timezone as dt_timezone
+from typing import List, Optional, Dict, Tuple
+from datetime import datetime, timedelta, date, timezone as dt_timezone
 import calendar
 import json
+import re
 from zoneinfo import ZoneInfo
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.auth import get_current_user, is_admin
 from app.core.config import settings
-from app.core.notify import send_email_notification, get_booking_email_context, build_booking_email
-from app.api.availability import _compute_slots_for_date
+from app.core.idempotency import run_idempotent
+from app.core.outbox import enqueue_event
+from app.core.pagination import keyset_page, paginate, reject_offset
+from app.core.slot_cache import bump_staff_generation
+from app.api.availability import (
+    _RANGE_CHUNK_DAYS,
+    check_slot_starts,
+    compute_slots_for_range,
+    is_slot_bookable,
+)
 from app.models.schemas import (
     BookingCreate, BookingUpdate, BookingResponse, BookingWithDetails,
-    BookingLogResponse, BookingChangeResponse
+    BookingLogResponse, BookingChangeResponse, BookingSeriesCreate,
+    BookingSeriesReschedule, BookingSeriesResponse
 )
 import uuid
 
 router = APIRouter()
 
 ALLOWED_BOOKING_SOURCES = {"web", "social", "admin", "api"}
-
-def _send_booking_emails(db: Session, booking_id: str, notification_type: str) -> None:
-    context = get_booking_email_context(db, booking_id)
-    if not context:
-        return
-
-    for role, key in (("customer", "customer_email"), ("staff", "staff_email")):
-        recipient = context.get(key)
-        if not recipient:
-            continue
-        email_payload = build_booking_email(context, notification_type, role)
-        send_email_notification(
-            db=db,
-            booking_id=booking_id,
-            notification_type=notification_type,
-            recipient=recipient,
-            subject=email_payload["subject"],
-            body=email_payload["body"],
-        )
-
-def _get_staff_schedule(db: Session, staff_id: str, target_date: date):
-    row = db.execute(
-        """
-        SELECT id, timezone, max_slots_per_day, max_bookings_per_day, max_bookings_per_customer
-        FROM staff_weekly_schedules
-        WHERE staff_id = :staff_id
-          AND (effective_from IS NULL OR effective_from <= :date)
-          AND (effective_to IS NULL OR effective_to >= :date)
-        ORDER BY is_default DESC, effective_from DESC NULLS LAST
-        LIMIT 1
-        """,
-        {
-            "staff_id": staff_id,
-            "date": target_date,
-        },
-    ).fetchone()
-    return dict(row._mapping) if row else None
-
-def _enforce_daily_booking_limit(
-    db: Session,
-    staff_id: str,
-    schedule: dict,
-    local_date: date,
-    schedule_tz: ZoneInfo,
-    exclude_booking_id: Optional[str] = None,
-) -> None:
-    limit = schedule.get("max_bookings_per_day")
-    if limit is None:
-        return
-    limit = int(limit)
-    if limit <= 0:
-        raise HTTPException(status_code=400, detail="Staff daily booking limit reached")
-
-    day_start_local = datetime.combine(local_date, time(0, 0), tzinfo=schedule_tz)
-    day_end_local = day_start_local + timedelta(days=1)
-    day_start_utc = day_start_local.astimezone(dt_timezone.utc)
-    day_end_utc = day_end_local.astimezone(dt_timezone.utc)
-
-    query = """
-        SELECT COUNT(*)
-        FROM bookings
-        WHERE staff_id = :staff_id
-          AND start_time_utc < :day_end
-          AND end_time_utc > :day_start
-          AND status NOT IN ('cancelled', 'no-show')
-    """
-    params: Dict[str, object] = {
-        "staff_id": staff_id,
-        "day_start": day_start_utc,
-        "day_end": day_end_utc,
-    }
-    if exclude_booking_id:
-        query += " AND id <> :exclude_booking_id"
-        params["exclude_booking_id"] = exclude_booking_id
-
-    count = db.execute(query, params).scalar()
-    if count is not None and int(count) >= limit:
-        raise HTTPException(status_code=400, detail="Staff daily booking limit reached")
-
-def _enforce_per_customer_limit(
-    db: Session,
-    staff_id: str,
-    customer_id: str,
-    schedule: dict,
-    exclude_booking_id: Optional[str] = None,
-) -> None:
-    limit = schedule.get("max_bookings_per_customer")
-    if limit is None:
-        return
-    limit = int(limit)
-    if limit <= 0:
-        raise HTTPException(
-            status_code=400,
-            detail="Customer booking limit reached for this staff member",
-        )
-
-    query = """
-        SELECT COUNT(*)
-        FROM bookings
-        WHERE staff_id = :staff_id
-          AND customer_id = :customer_id
-          AND status NOT IN ('cancelled', 'no-show', 'completed')
-          AND end_time_utc > NOW()
-    """
-    params: Dict[str, object] = {
-        "staff_id": staff_id,
-        "customer_id": customer_id,
-    }
-    if exclude_booking_id:
-        query += " AND id <> :exclude_booking_id"
-        params["exclude_booking_id"] = exclude_booking_id
-
-    count = db.execute(query, params).scalar()
-    if count is not None and int(count) >= limit:
-        raise HTTPException(
-            status_code=400,
-            detail="Customer booking limit reached for this staff member",
-        )
-
-def _enforce_daily_slot_limit(
-    db: Session,
-    booking: BookingCreate,
-    schedule: dict,
-    local_date: date,
-    ignore_booking_limits: bool = False,
-):
-    max_slots = schedule.get("max_slots_per_day")
-    if max_slots is None:
-        return
-    max_slots = int(max_slots)
-    if max_slots <= 0:
-        raise HTTPException(status_code=400, detail="Selected time is not available")
-
-    slots = _compute_slots_for_date(
-        db=db,
-        service_id=booking.service_id,
-        target_date=local_date,
-        timezone=booking.customer_timezone or "UTC",
-        staff_id=booking.staff_id,
-        location_id=None,
-        granularity_minutes=settings.SLOT_GRANULARITY_MINUTES,
-        window_start=None,
-        window_end=None,
-        min_notice_minutes=settings.MIN_NOTICE_MINUTES,
-        max_booking_days=settings.MAX_BOOKING_DAYS,
-        ignore_booking_limits=ignore_booking_limits,
+SERIES_FREQUENCIES = {"weekly", "biweekly", "monthly"}
+MAX_SERIES_OCCURRENCES = 52
+EXCLUSION_VIOLATION = "23P01"
+SLOT_CONFLICT_ERRORS = {
+    "Time slot is not available",
+    "Time slot is full",
+    "Selected time is not available",
+    "Staff daily booking limit reached",
+    "Customer booking limit reached for this staff member",
+}
+
+def _queue_booking_emails(db: Session, booking_id: str, notification_type: str) -> None:
+    enqueue_event(
+        db,
+        "booking.notification",
+        {"booking_id": booking_id, "notification_type": notification_type},
     )
-    requested_start = booking.start_time_utc.replace(second=0, microsecond=0)
-    for slot in slots:
-        if slot.get("staff_id") != booking.staff_id:
-            continue
-        slot_start = slot["start_time"].astimezone(dt_timezone.utc).replace(
-            second=0, microsecond=0
-        )
-        if slot_start == requested_start:
-            return
-
-    raise HTTPException(status_code=400, detail="Selected time is not available")
 
 def _normalize_json_field(value: Optional[object]) -> Optional[dict]:
     if value is None:
@@ -260,73 +131,6 @@ def _validate_booking_source(booking_source: str, current_user: dict) -> None:
         if booking_source not in {"web", "social"}:
             raise HTTPException(status_code=403, detail="Forbidden booking source")
 
-def _check_slot_capacity(
-    db: Session,
-    staff_id: str,
-    service_id: str,
-    start_time_utc: datetime,
-    end_time_utc: datetime,
-    capacity: int,
-    exclude_booking_id: Optional[str] = None,
-    exclude_hold_by: Optional[str] = None,
-) -> Tuple[bool, Optional[str]]:
-    booking_query = (
-        "SELECT id, service_id FROM bookings "
-        "WHERE staff_id = :staff_id "
-        "AND status NOT IN ('cancelled', 'no-show') "
-        "AND start_time_utc < :end_time AND end_time_utc > :start_time"
-    )
-    booking_params: Dict[str, object] = {
-        "staff_id": staff_id,
-        "start_time": start_time_utc,
-        "end_time": end_time_utc,
-    }
-    if exclude_booking_id:
-        booking_query += " AND id <> :exclude_id"
-        booking_params["exclude_id"] = exclude_booking_id
-
-    booking_rows = db.execute(booking_query, booking_params).fetchall()
-    same_count = 0
-    other_conflict = False
-    for row in booking_rows:
-        if row[1] != service_id:
-            other_conflict = True
-            break
-        same_count += 1
-
-    hold_query = (
-        "SELECT service_id, created_by FROM booking_holds "
-        "WHERE staff_id = :staff_id "
-        "AND expires_at_utc > NOW() "
-        "AND start_utc < :end_time AND end_utc > :start_time"
-    )
-    hold_params: Dict[str, object] = {
-        "staff_id": staff_id,
-        "start_time": start_time_utc,
-        "end_time": end_time_utc,
-    }
-    if exclude_hold_by:
-        hold_query += " AND (created_by IS NULL OR created_by <> :exclude_by)"
-        hold_params["exclude_by"] = exclude_hold_by
-
-    hold_rows = db.execute(hold_query, hold_params).fetchall()
-    for row in hold_rows:
-        if row[0] != service_id:
-            other_conflict = True
-            break
-        same_count += 1
-
-    if other_conflict:
-        return False, "Time slot is not available"
-
-    if capacity <= 1 and same_count > 0:
-        return False, "Time slot is not available"
-
-    if capacity > 1 and same_count >= capacity:
-        return False, "Time slot is full"
-
-    return True, None
-
 def _iter_next_available_slots(
     db: Session,
     service_id: str,
@@ -334,13 +138,15 @@ def _iter_next_available_slots(
     timezone: str,
     start_date: date,
 ) -> List[dict]:
-    slots: List[dict] = []
-    for offset in range(settings.MAX_BOOKING_DAYS + 1):
-        target_date = start_date + timedelta(days=offset)
-        daily = _compute_slots_for_date(
+    final_date = start_date + timedelta(days=settings.MAX_BOOKING_DAYS)
+    chunk_start = start_date
+    while chunk_start <= final_date:
+        chunk_end = min(chunk_start + timedelta(days=_RANGE_CHUNK_DAYS - 1), final_date)
+        range_slots = compute_slots_for_range(
             db=db,
             service_id=service_id,
-            target_date=target_date,
+            start_date=chunk_start,
+            end_date=chunk_end,
             timezone=timezone,
             staff_id=staff_id,
             location_id=None,
@@ -350,136 +156,11 @@ def _iter_next_available_slots(
             min_notice_minutes=settings.MIN_NOTICE_MINUTES,
             max_booking_days=settings.MAX_BOOKING_DAYS,
         )
-        if daily:
-            daily_sorted = sorted(daily, key=lambda s: s["start_time"])
-            slots.extend(daily_sorted)
-            break
-    return slots
-
-def _is_nth_weekday_in_month(target_date: date, weekday: int, nth: int) -> bool:
-    if target_date.weekday() != weekday:
-        return False
-    first_day = target_date.replace(day=1)
-    offset = (weekday - first_day.weekday()) % 7
-    first_occurrence = 1 + offset
-    occurrence = ((target_date.day - first_occurrence) // 7) + 1
-    if nth == -1:
-        last_day = calendar.monthrange(target_date.year, target_date.month)[1]
-        last_date = target_date.replace(day=last_day)
-        last_offset = (last_date.weekday() - weekday) % 7
-        last_occurrence_day = last_day - last_offset
-        return target_date.day == last_occurrence_day
-    return occurrence == nth
-
-def _service_allows_booking(
-    db: Session,
-    service_id: str,
-    local_start: datetime,
-    local_end: datetime,
-    schedule_tz: ZoneInfo,
-) -> bool:
-    schedule = db.execute(
-        """
-        SELECT * FROM service_operating_schedules
-        WHERE service_id = :service_id
-          AND is_active = TRUE
-          AND (effective_from IS NULL OR effective_from <= :date)
-          AND (effective_to IS NULL OR effective_to >= :date)
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        {"service_id": service_id, "date": local_start.date()},
-    ).fetchone()
-
-    if not schedule:
-        return True
-
-    schedule_map = schedule._mapping
-    service_tz = ZoneInfo(schedule_map.get("timezone") or "UTC")
-
-    exceptions = db.execute(
-        """
-        SELECT is_open, start_time, end_time
-        FROM service_operating_exceptions
-        WHERE service_id = :service_id AND date = :date
-        """,
-        {"service_id": service_id, "date": local_start.date()},
-    ).fetchall()
-
-    start_utc = local_start.astimezone(dt_timezone.utc)
-    end_utc = local_end.astimezone(dt_timezone.utc)
-
-    if exceptions:
-        override_exceptions = [ex for ex in exceptions if ex[0] and ex[1] and ex[2]]
-        closed_exceptions = [ex for ex in exceptions if not ex[0]]
-        extra_open_exceptions = [ex for ex in exceptions if ex[0] and not (ex[1] and ex[2])]
-
-        if override_exceptions:
-            for ex in override_exceptions:
-                start_dt = datetime.combine(local_start.date(), ex[1], tzinfo=service_tz)
-                end_dt = datetime.combine(local_start.date(), ex[2], tzinfo=service_tz)
-                if start_utc >= start_dt.astimezone(dt_timezone.utc) and end_utc <= end_dt.astimezone(dt_timezone.utc):
-                    return True
-            return False
-        if closed_exceptions:
-            return False
-        if extra_open_exceptions:
-            day_start = datetime.combine(local_start.date(), time(0, 0), tzinfo=service_tz)
-            day_end = day_start + timedelta(days=1)
-            return start_utc >= day_start.astimezone(dt_timezone.utc) and end_utc <= day_end.astimezone(dt_timezone.utc)
-
-    rule_type = schedule_map.get("rule_type")
-    open_time = schedule_map.get("open_time")
-    close_time = schedule_map.get("close_time")
-    weekday = (local_start.weekday() + 1) % 7
-
-    if rule_type == "daily":
-        if open_time and close_time:
-            start_dt = datetime.combine(local_start.date(), open_time, tzinfo=service_tz)
-            end_dt = datetime.combine(local_start.date(), close_time, tzinfo=service_tz)
-            return start_utc >= start_dt.astimezone(dt_timezone.utc) and end_utc <= end_dt.astimezone(dt_timezone.utc)
-        return True
-
-    rules = db.execute(
-        """
-        SELECT rule_type, weekday, month_day, nth, start_time, end_time
-        FROM service_operating_rules
-        WHERE schedule_id = :schedule_id
-        """,
-        {"schedule_id": schedule_map.get("id")},
-    ).fetchall()
-
-    for rule in rules:
-        rule_type_value = rule[0]
-        rule_weekday = rule[1]
-        month_day = rule[2]
-        nth = rule[3]
-        start_time = rule[4]
-        end_time = rule[5]
-
-        is_match = False
-        if rule_type == "weekly" and rule_type_value == "weekly":
-            is_match = rule_weekday == weekday
-        elif rule_type == "monthly" and rule_type_value == "monthly_day":
-            is_match = month_day == local_start.date().day
-        elif rule_type == "monthly" and rule_type_value == "monthly_nth_weekday":
-            if rule_weekday is not None and nth is not None:
-                is_match = _is_nth_weekday_in_month(local_start.date(), rule_weekday, nth)
-
-        if not is_match:
-            continue
-
-        if start_time and end_time:
-            start_dt = datetime.combine(local_start.date(), start_time, tzinfo=service_tz)
-            end_dt = datetime.combine(local_start.date(), end_time, tzinfo=service_tz)
-            return start_utc >= start_dt.astimezone(dt_timezone.utc) and end_utc <= end_dt.astimezone(dt_timezone.utc)
-        if open_time and close_time:
-            start_dt = datetime.combine(local_start.date(), open_time, tzinfo=service_tz)
-            end_dt = datetime.combine(local_start.date(), close_time, tzinfo=service_tz)
-            return start_utc >= start_dt.astimezone(dt_timezone.utc) and end_utc <= end_dt.astimezone(dt_timezone.utc)
-        return True
-
-    return False
+        for target_date in sorted(range_slots):
+            if range_slots[target_date]:
+                return sorted(range_slots[target_date], key=lambda s: s["start_time"])
+        chunk_start = chunk_end + timedelta(days=1)
+    return []
 
 def _get_customer_id(db: Session, user_id: str) -> str | None:
     record = db.execute(
@@ -516,15 +197,7 @@ def _ensure_booking_access(db: Session, booking_id: str, current_user: dict) ->
 
     raise HTTPException(status_code=403, detail="Forbidden")
 
-@router.post("/", response_model=BookingResponse)
-async def create_booking(
-    booking: BookingCreate,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Create a new booking"""
-    booking_id = str(uuid.uuid4())
-
+def _apply_booking_actor(db: Session, booking, current_user: dict) -> None:
     role = current_user.get("role")
     if role == "customer":
         customer_id = _get_customer_id(db, current_user.get("id"))
@@ -535,6 +208,45 @@ async def create_booking(
         if booking.staff_id != current_user.get("id"):
             raise HTTPException(status_code=403, detail="Forbidden")
 
+def _lock_staff_bookings(db: Session, staff_id: object) -> None:
+    """Serialize booking writes for one staff member until the transaction ends."""
+    db.execute(
+        "SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))",
+        {"key": f"bookings:staff:{staff_id}"},
+    )
+
+def _raise_slot_error(db: Session, error_message: Optional[str]) -> None:
+    db.rollback()
+    status_code = 409 if error_message in SLOT_CONFLICT_ERRORS else 400
+    raise HTTPException(status_code=status_code, detail=error_message)
+
+def _raise_overlap_violation(db: Session, exc: IntegrityError) -> None:
+    # bookings_exclusive_no_overlap backs up the Python checks for capacity-1 services.
+    if getattr(exc.orig, "pgcode", None) != EXCLUSION_VIOLATION:
+        raise exc
+    _raise_slot_error(db, "Time slot is not available")
+
+@router.post("/", response_model=BookingResponse)
+async def create_booking(
+    booking: BookingCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """Create a new booking"""
+    return await run_idempotent(
+        db,
+        idempotency_key,
+        current_user.get("id"),
+        "bookings.create",
+        booking,
+        lambda: db.run_sync(lambda session: _create_booking(booking, current_user, session)),
+    )
+
+def _create_booking(booking: BookingCreate, current_user: dict, db: Session) -> dict:
+    booking_id = str(uuid.uuid4())
+
+    _apply_booking_actor(db, booking, current_user)
     _validate_booking_source(booking.booking_source, current_user)
 
     service_config = _get_service_staff_config(
@@ -545,155 +257,54 @@ async def create_booking(
     )
     duration_minutes = service_config["duration"]
     buffer_minutes = service_config["buffer"]
-    capacity = service_config["capacity"]
 
     end_time_utc = booking.start_time_utc + timedelta(minutes=duration_minutes + buffer_minutes)
 
-    schedule = _get_staff_schedule(db, booking.staff_id, booking.start_time_utc.date())
-    if not schedule:
-        raise HTTPException(status_code=400, detail="Staff schedule is not configured")
-
-    schedule_tz = ZoneInfo(schedule["timezone"])
-    local_start = booking.start_time_utc.astimezone(schedule_tz)
-    local_end = end_time_utc.astimezone(schedule_tz)
-    local_date = local_start.date()
-
-    schedule = _get_staff_schedule(db, booking.staff_id, local_date)
-    if not schedule:
-        raise HTTPException(status_code=400, detail="Staff schedule is not configured")
-
-    schedule_tz = ZoneInfo(schedule["timezone"])
-    local_start = booking.start_time_utc.astimezone(schedule_tz)
-    local_end = end_time_utc.astimezone(schedule_tz)
-    local_date = local_start.date()
-
-    _enforce_daily_booking_limit(
-        db=db,
-        staff_id=booking.staff_id,
-        schedule=schedule,
-        local_date=local_date,
-        schedule_tz=schedule_tz,
-    )
-    _enforce_per_customer_limit(
+    # Everything from the availability check to the log row runs in one
+    # transaction under the staff lock, so concurrent requests for the same
+    # staff member are checked one after another against committed rows.
+    _lock_staff_bookings(db, booking.staff_id)
+    slot_ok, error_message = is_slot_bookable(
         db=db,
+        service_id=booking.service_id,
         staff_id=booking.staff_id,
+        start_utc=booking.start_time_utc,
         customer_id=booking.customer_id,
-        schedule=schedule,
-    )
-    _enforce_daily_slot_limit(
-        db=db,
-        booking=booking,
-        schedule=schedule,
-        local_date=local_date,
-    )
-
-    if not _service_allows_booking(db, booking.service_id, local_start, local_end, schedule_tz):
-        raise HTTPException(status_code=400, detail="Service is not available at this time")
-    weekday = (local_start.weekday() + 1) % 7
-
-    now_local = datetime.now(schedule_tz)
-    min_notice_cutoff = now_local + timedelta(minutes=settings.MIN_NOTICE_MINUTES)
-    if local_start < min_notice_cutoff:
-        raise HTTPException(status_code=400, detail="Booking does not meet minimum notice")
-
-    max_booking_cutoff = now_local + timedelta(days=settings.MAX_BOOKING_DAYS)
-    if local_start > max_booking_cutoff:
-        raise HTTPException(status_code=400, detail="Booking exceeds maximum window")
-
-    work_blocks = db.execute(
-        """
-        SELECT start_time_local, end_time_local
-        FROM staff_work_blocks
-        WHERE schedule_id = :schedule_id AND weekday = :weekday
-        """,
-        {"schedule_id": schedule["id"], "weekday": weekday},
-    ).fetchall()
-
-    if not work_blocks:
-        raise HTTPException(status_code=400, detail="Staff is not available on this day")
-
-    fits_work_block = False
-    for block in work_blocks:
-        block_start = datetime.combine(local_start.date(), block[0], tzinfo=schedule_tz)
-        block_end = datetime.combine(local_start.date(), block[1], tzinfo=schedule_tz)
-        if local_start >= block_start and local_end <= block_end:
-            fits_work_block = True
-            break
-
-    if not fits_work_block:
-        raise HTTPException(status_code=400, detail="Time is outside staff working hours")
-
-    break_blocks = db.execute(
-        """
-        SELECT start_time_local, end_time_local
-        FROM staff_break_blocks
-        WHERE schedule_id = :schedule_id AND weekday = :weekday
-        """,
-        {"schedule_id": schedule["id"], "weekday": weekday},
-    ).fetchall()
-
-    for block in break_blocks:
-        block_start = datetime.combine(local_start.date(), block[0], tzinfo=schedule_tz)
-        block_end = datetime.combine(local_start.date(), block[1], tzinfo=schedule_tz)
-        if local_start < block_end and local_end > block_start:
-            raise HTTPException(status_code=400, detail="Time overlaps a staff break")
-
-    exception_result = db.execute(
-        """
-        SELECT id FROM staff_exceptions
-        WHERE staff_id = :staff_id
-          AND type IN ('time_off', 'blocked_time')
-          AND start_utc < :end_time AND end_utc > :start_time
-        """,
-        {
-            "staff_id": booking.staff_id,
-            "start_time": booking.start_time_utc,
-            "end_time": end_time_utc,
-        },
-    )
-
-    if exception_result.fetchone():
-        raise HTTPException(status_code=400, detail="Staff is unavailable for this time")
-
-    slot_ok, error_message = _check_slot_capacity(
-        db=db,
-        staff_id=booking.staff_id,
-        service_id=booking.service_id,
-        start_time_utc=booking.start_time_utc,
-        end_time_utc=end_time_utc,
-        capacity=capacity,
         exclude_hold_by=current_user.get("id"),
     )
     if not slot_ok:
-        raise HTTPException(status_code=400, detail=error_message)
-    
-    # Create booking
-    db.execute(
-        """
-        INSERT INTO bookings (id, service_id, staff_id, customer_id, start_time_utc,
-                            end_time_utc, booking_source, customer_timezone, status, payment_status)
-        VALUES (:id, :service_id, :staff_id, :customer_id, :start_time_utc,
-                :end_time_utc, :booking_source, :customer_timezone, 'pending', 'pending')
-        """,
-        {
-            "id": booking_id,
-            "service_id": booking.service_id,
-            "staff_id": booking.staff_id,
-            "customer_id": booking.customer_id,
-            "start_time_utc": booking.start_time_utc,
-            "end_time_utc": end_time_utc,
-            "booking_source": booking.booking_source,
-            "customer_timezone": booking.customer_timezone,
-        }
-    )
-    db.commit()
+        _raise_slot_error(db, error_message)
+
+    try:
+        db.execute(
+            """
+            INSERT INTO bookings (id, service_id, staff_id, customer_id, start_time_utc,
+                                end_time_utc, booking_source, customer_timezone, is_exclusive,
+                                status, payment_status)
+            VALUES (:id, :service_id, :staff_id, :customer_id, :start_time_utc,
+                    :end_time_utc, :booking_source, :customer_timezone, :is_exclusive,
+                    'pending', 'pending')
+            """,
+            {
+                "id": booking_id,
+                "service_id": booking.service_id,
+                "staff_id": booking.staff_id,
+                "customer_id": booking.customer_id,
+                "start_time_utc": booking.start_time_utc,
+                "end_time_utc": end_time_utc,
+                "booking_source": booking.booking_source,
+                "customer_timezone": booking.customer_timezone,
+                "is_exclusive": service_config["capacity"] <= 1,
+            }
+        )
+    except IntegrityError as exc:
+        _raise_overlap_violation(db, exc)
 
     db.execute(
         """
         DELETE FROM booking_holds
         WHERE staff_id = :staff_id
-          AND start_utc < :end_time
-          AND end_utc > :start_time
+          AND period && tstzrange(:start_time, :end_time)
           AND (created_by IS NULL OR created_by = :created_by)
         """,
         {
@@ -703,9 +314,7 @@ async def create_booking(
             "created_by": current_user.get("id"),
         },
     )
-    db.commit()
-    
-    # Log the booking creation
+
     db.execute(
         """
         INSERT INTO booking_logs (id, booking_id, action, performed_by, details)
@@ -729,9 +338,9 @@ async def create_booking(
             ),
         }
     )
+    _queue_booking_emails(db, booking_id, "confirmation")
     db.commit()
-
-    _send_booking_emails(db, booking_id, "confirmation")
+    bump_staff_generation(db, booking.staff_id)
     
     result = db.execute(
         "SELECT * FROM bookings WHERE id = :id",
@@ -739,13 +348,468 @@ async def create_booking(
     )
     return jsonable_encoder(dict(result.fetchone()._mapping))
 
+def _add_months(value: date, months: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+def _series_start_times(
+    start_time_utc: datetime,
+    tz: ZoneInfo,
+    frequency: str,
+    count: Optional[int],
+    until: Optional[date],
+) -> List[datetime]:
+    # Occurrences keep the first one's local wall time across DST changes.
+    first_local = start_time_utc.astimezone(tz)
+    starts: List[datetime] = []
+    index = 0
+    while len(starts) < (count or MAX_SERIES_OCCURRENCES):
+        if frequency == "monthly":
+            local_date = _add_months(first_local.date(), index)
+        else:
+            step_weeks = 2 if frequency == "biweekly" else 1
+            local_date = first_local.date() + timedelta(weeks=index * step_weeks)
+        if until is not None and local_date > until:
+            break
+        local_start = datetime.combine(local_date, first_local.time(), tzinfo=tz)
+        starts.append(local_start.astimezone(dt_timezone.utc))
+        index += 1
+    return starts
+
+def _multi_row_values(template: str, rows: List[Dict[str, object]]) -> Tuple[str, Dict[str, object]]:
+    """Repeat a VALUES tuple once per row, suffixing each :name with the row index."""
+    clauses = []
+    params: Dict[str, object] = {}
+    for index, row in enumerate(rows):
+        clauses.append(
+            re.sub(
+                r":(\w+)",
+                lambda match: f":{match.group(1)}_{index}" if match.group(1) in row else match.group(0),
+                template,
+            )
+        )
+        params.update({f"{name}_{index}": value for name, value in row.items()})
+    return ",\n".join(clauses), params
+
+def _insert_booking_logs(db: Session, action: str, performed_by: Optional[str], details: Dict[str, dict]) -> None:
+    values, params = _multi_row_values(
+        "(:id, :booking_id, :action, :performed_by, CAST(:details AS jsonb))",
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "booking_id": booking_id,
+                "action": action,
+                "performed_by": performed_by,
+                "details": json.dumps(jsonable_encoder(booking_details)),
+            }
+            for booking_id, booking_details in details.items()
+        ],
+    )
+    db.execute(
+        f"INSERT INTO booking_logs (id, booking_id, action, performed_by, details) VALUES {values}",
+        params,
+    )
+
+def _load_series(db: Session, series_id: str, current_user: dict) -> List[dict]:
+    rows = db.execute(
+        """
+        SELECT id, service_id, staff_id, customer_id, start_time_utc, end_time_utc,
+               status, customer_timezone
+        FROM bookings
+        WHERE series_id = :series_id
+        ORDER BY start_time_utc
+        """,
+        {"series_id": series_id},
+    ).fetchall()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    _ensure_booking_access(db, rows[0][0], current_user)
+    return [dict(row._mapping) for row in rows]
+
+def _upcoming_occurrences(series: List[dict]) -> List[dict]:
+    now = datetime.now(dt_timezone.utc)
+    return [
+        occurrence
+        for occurrence in series
+        if occurrence["status"] not in {"cancelled", "completed", "no-show"}
+        and occurrence["start_time_utc"] > now
+    ]
+
+@router.post("/series", response_model=BookingSeriesResponse)
+async def create_booking_series(
+    series: BookingSeriesCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """Book a recurring series; each occurrence is booked or reported as a conflict"""
+    return await run_idempotent(
+        db,
+        idempotency_key,
+        current_user.get("id"),
+        "bookings.create_series",
+        series,
+        lambda: db.run_sync(lambda session: _create_booking_series(series, current_user, session)),
+    )
+
+def _create_booking_series(series: BookingSeriesCreate, current_user: dict, db: Session) -> dict:
+    _apply_booking_actor(db, series, current_user)
+    _validate_booking_source(series.booking_source, current_user)
+
+    if series.frequency not in SERIES_FREQUENCIES:
+        raise HTTPException(status_code=400, detail="Invalid series frequency")
+    if series.count is None and series.until is None:
+        raise HTTPException(status_code=400, detail="Series needs a count or an until date")
+    if series.count is not None and not 1 <= series.count <= MAX_SERIES_OCCURRENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Series count must be between 1 and {MAX_SERIES_OCCURRENCES}",
+        )
+    try:
+        customer_tz = ZoneInfo(series.customer_timezone)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid timezone")
+
+    service_config = _get_service_staff_config(
+        db,
+        staff_id=series.staff_id,
+        service_id=series.service_id,
+        current_user=current_user,
+    )
+    span = timedelta(minutes=service_config["duration"] + service_config["buffer"])
+    starts = _series_start_times(
+        series.start_time_utc, customer_tz, series.frequency, series.count, series.until
+    )
+    if not starts:
+        raise HTTPException(status_code=400, detail="Series has no occurrences")
+
+    series_id = str(uuid.uuid4())
+    _lock_staff_bookings(db, series.staff_id)
+    errors = check_slot_starts(
+        db,
+        service_id=series.service_id,
+        staff_id=series.staff_id,
+        starts_utc=starts,
+        customer_id=series.customer_id,
+    )
+
+    occurrences = []
+    new_rows: List[Dict[str, object]] = []
+    for start_time_utc, error in zip(starts, errors):
+        occurrence = {
+            "start_time_utc": start_time_utc,
+            "end_time_utc": start_time_utc + span,
+            "status": "conflict" if error else "booked",
+            "booking_id": None if error else str(uuid.uuid4()),
+            "error": error,
+        }
+        occurrences.append(occurrence)
+        if not error:
+            new_rows.append(
+                {
+                    "id": occurrence["booking_id"],
+                    "start_time_utc": occurrence["start_time_utc"],
+                    "end_time_utc": occurrence["end_time_utc"],
+                }
+            )
+    if not new_rows:
+        _raise_slot_error(db, errors[0])
+
+    values, params = _multi_row_values(
+        """
+        (:id, :service_id, :staff_id, :customer_id, :start_time_utc, :end_time_utc,
+         :booking_source, :customer_timezone, :is_exclusive, :series_id, 'pending', 'pending')
+        """,
+        new_rows,
+    )
+    params.update(
+        {
+            "service_id": series.service_id,
+            "staff_id": series.staff_id,
+            "customer_id": series.customer_id,
+            "booking_source": series.booking_source,
+            "customer_timezone": series.customer_timezone,
+            "is_exclusive": service_config["capacity"] <= 1,
+            "series_id": series_id,
+        }
+    )
+    try:
+        db.execute(
+            f"""
+            INSERT INTO bookings (id, service_id, staff_id, customer_id, start_time_utc,
+                                end_time_utc, booking_source, customer_timezone, is_exclusive,
+                                series_id, status, payment_status)
+            VALUES {values}
+            """,
+            params,
+        )
+    except IntegrityError as exc:
+        _raise_overlap_violation(db, exc)
+
+    _insert_booking_logs(
+        db,
+        "created",
+        current_user.get("id"),
+        {
+            row["id"]: {
+                "service_id": series.service_id,
+                "staff_id": series.staff_id,
+                "customer_id": series.customer_id,
+                "start_time_utc": row["start_time_utc"].isoformat(),
+                "end_time_utc": row["end_time_utc"].isoformat(),
+                "booking_source": series.booking_source,
+                "series_id": series_id,
+            }
+            for row in new_rows
+        },
+    )
+    for row in new_rows:
+        _queue_booking_emails(db, row["id"], "confirmation")
+    db.commit()
+    bump_staff_generation(db, series.staff_id)
+
+    return {"series_id": series_id, "occurrences": occurrences}
+
+@router.put("/series/{series_id}", response_model=BookingSeriesResponse)
+async def reschedule_booking_series(
+    series_id: str,
+    payload: BookingSeriesReschedule,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Move every upcoming occurrence of a series by the same local-time shift"""
+    return await db.run_sync(_reschedule_booking_series, series_id, payload, current_user)
+
+
+def _reschedule_booking_series(
+    db: Session,
+    series_id: str,
+    payload: BookingSeriesReschedule,
+    current_user: dict,
+):
+    if current_user.get("role") == "staff" and not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    series = _load_series(db, series_id, current_user)
+    upcoming = _upcoming_occurrences(series)
+    if not upcoming:
+        raise HTTPException(status_code=400, detail="Series has no upcoming bookings")
+
+    first = upcoming[0]
+    try:
+        customer_tz = ZoneInfo(first["customer_timezone"] or "UTC")
+    except Exception:
+        customer_tz = ZoneInfo("UTC")
+    new_first_local = payload.start_time_utc.astimezone(customer_tz)
+    day_shift = new_first_local.date() - first["start_time_utc"].astimezone(customer_tz).date()
+    starts = [
+        datetime.combine(
+            occurrence["start_time_utc"].astimezone(customer_tz).date() + day_shift,
+            new_first_local.time(),
+            tzinfo=customer_tz,
+        ).astimezone(dt_timezone.utc)
+        for occurrence in upcoming
+    ]
+
+    staff_id = first["staff_id"]
+    service_id = first["service_id"]
+    service_config = _get_service_staff_config(
+        db,
+        staff_id=staff_id,
+        service_id=service_id,
+        current_user=current_user,
+    )
+    span = timedelta(minutes=service_config["duration"] + service_config["buffer"])
+
+    _lock_staff_bookings(db, staff_id)
+    # Only occurrences that actually move free their old slot, so re-check
+    # until no further occurrence has to stay behind.
+    errors: List[Optional[str]] = [None] * len(upcoming)
+    moving = list(range(len(upcoming)))
+    while moving:
+        moving_errors = check_slot_starts(
+            db,
+            service_id=str(service_id),
+            staff_id=str(staff_id),
+            starts_utc=[starts[index] for index in moving],
+            exclude_booking_ids=[str(upcoming[index]["id"]) for index in moving],
+        )
+        if not any(moving_errors):
+            break
+        for index, error in zip(moving, moving_errors):
+            errors[index] = error
+        moving = [index for index, error in zip(moving, moving_errors) if not error]
+
+    occurrences = []
+    moved: List[Dict[str, object]] = []
+    for occurrence, start_time_utc, error in zip(upcoming, starts, errors):
+        if error:
+            occurrences.append(
+                {
+                    "start_time_utc": occurrence["start_time_utc"],
+                    "end_time_utc": occurrence["end_time_utc"],
+                    "status": "conflict",
+                    "booking_id": str(occurrence["id"]),
+                    "error": error,
+                }
+            )
+            continue
+        moved.append(
+            {
+                "id": str(occurrence["id"]),
+                "old_start_time": occurrence["start_time_utc"],
+                "start_time_utc": start_time_utc,
+                "end_time_utc": start_time_utc + span,
+            }
+        )
+        occurrences.append(
+            {
+                "start_time_utc": start_time_utc,
+                "end_time_utc": start_time_utc + span,
+                "status": "rescheduled",
+                "booking_id": str(occurrence["id"]),
+                "error": None,
+            }
+        )
+    if not moved:
+        _raise_slot_error(db, errors[0])
+
+    values, params = _multi_row_values(
+        "(CAST(:id AS uuid), CAST(:start_time_utc AS timestamptz), CAST(:end_time_utc AS timestamptz))",
+        [
+            {key: row[key] for key in ("id", "start_time_utc", "end_time_utc")}
+            for row in moved
+        ],
+    )
+    try:
+        db.execute(
+            f"""
+            UPDATE bookings AS b
+            SET start_time_utc = v.start_time_utc, end_time_utc = v.end_time_utc
+            FROM (VALUES {values}) AS v (id, start_time_utc, end_time_utc)
+            WHERE b.id = v.id
+            """,
+            params,
+        )
+    except IntegrityError as exc:
+        _raise_overlap_violation(db, exc)
+
+    values, params = _multi_row_values(
+        "(:id, :booking_id, :old_start_time, :new_start_time, 'reschedule', :changed_by)",
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "booking_id": row["id"],
+                "old_start_time": row["old_start_time"],
+                "new_start_time": row["start_time_utc"],
+                "changed_by": current_user.get("id"),
+            }
+            for row in moved
+        ],
+    )
+    db.execute(
+        f"""
+        INSERT INTO booking_changes (id, booking_id, old_start_time, new_start_time,
+                                    change_type, changed_by)
+        VALUES {values}
+        """,
+        params,
+    )
+    _insert_booking_logs(
+        db,
+        "rescheduled",
+        current_user.get("id"),
+        {
+            row["id"]: {
+                "old_start_time_utc": row["old_start_time"].isoformat(),
+                "new_start_time_utc": row["start_time_utc"].isoformat(),
+                "series_id": series_id,
+            }
+            for row in moved
+        },
+    )
+    for row in moved:
+        _queue_booking_emails(db, row["id"], "confirmation")
+    db.commit()
+    bump_staff_generation(db, staff_id)
+
+    return {"series_id": series_id, "occurrences": occurrences}
+
+@router.delete("/series/{series_id}")
+async def cancel_booking_series(
+    series_id: str,
+    reason: str = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Cancel every upcoming occurrence of a series"""
+    return await db.run_sync(_cancel_booking_series, series_id, reason, current_user)
+
+
+def _cancel_booking_series(db: Session, series_id: str, reason: str, current_user: dict):
+    series = _load_series(db, series_id, current_user)
+    upcoming = _upcoming_occurrences(series)
+    if not upcoming:
+        return {"message": "Booking series cancelled", "cancelled": 0}
+
+    booking_ids = [str(occurrence["id"]) for occurrence in upcoming]
+    db.execute(
+        "UPDATE bookings SET status = 'cancelled' WHERE id = ANY(CAST(:ids AS uuid[]))",
+        {"ids": booking_ids},
+    )
+    values, params = _multi_row_values(
+        "(:id, :booking_id, 'cancel', :changed_by, :reason)",
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "booking_id": booking_id,
+                "changed_by": current_user.get("id"),
+                "reason": reason,
+            }
+            for booking_id in booking_ids
+        ],
+    )
+    db.execute(
+        f"""
+        INSERT INTO booking_changes (id, booking_id, change_type, changed_by, reason)
+        VALUES {values}
+        """,
+        params,
+    )
+    _insert_booking_logs(
+        db,
+        "cancelled",
+        current_user.get("id"),
+        {
+            str(occurrence["id"]): {
+                "old_status": occurrence["status"],
+                "new_status": "cancelled",
+                "reason": reason,
+                "series_id": series_id,
+            }
+            for occurrence in upcoming
+        },
+    )
+    for booking_id in booking_ids:
+        _queue_booking_emails(db, booking_id, "cancellation")
+    db.commit()
+    bump_staff_generation(db, upcoming[0]["staff_id"])
+
+    return {"message": "Booking series cancelled", "cancelled": len(booking_ids)}
+
 @router.get("/{booking_id}", response_model=BookingWithDetails)
 async def get_booking(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get booking by ID with details"""
+    return await db.run_sync(_get_booking, booking_id, current_user)
+
+
+def _get_booking(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     result = db.execute(
         """
@@ -770,9 +834,13 @@ async def get_booking(
 async def rebook_booking(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Rebook the same service/staff at the next available slot."""
+    return await db.run_sync(_rebook_booking, booking_id, current_user)
+
+
+def _rebook_booking(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
 
     record = db.execute(
@@ -821,7 +889,7 @@ async def rebook_booking(
         )
 
         try:
-            return await create_booking(booking_payload, current_user, db)
+            return _create_booking(booking_payload, current_user, db)
         except HTTPException as exc:
             if exc.status_code in (400, 409):
                 last_error = str(exc.detail)
@@ -837,9 +905,13 @@ async def rebook_booking(
 async def get_booking_logs(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get audit logs for a booking."""
+    return await db.run_sync(_get_booking_logs, booking_id, current_user)
+
+
+def _get_booking_logs(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     rows = db.execute(
         "SELECT * FROM booking_logs WHERE booking_id = :id ORDER BY created_at DESC",
@@ -856,9 +928,13 @@ async def get_booking_logs(
 async def get_booking_changes(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get reschedule/cancel history for a booking."""
+    return await db.run_sync(_get_booking_changes, booking_id, current_user)
+
+
+def _get_booking_changes(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     rows = db.execute(
         "SELECT * FROM booking_changes WHERE booking_id = :id ORDER BY created_at DESC",
@@ -870,9 +946,13 @@ async def get_booking_changes(
 async def get_booking_for_payment(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return booking details needed for payment screen."""
+    return await db.run_sync(_get_booking_for_payment, booking_id, current_user)
+
+
+def _get_booking_for_payment(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     result = db.execute(
         """
@@ -908,9 +988,13 @@ async def get_booking_for_payment(
 async def get_booking_confirmed(
     booking_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return booking confirmation details."""
+    return await db.run_sync(_get_booking_confirmed, booking_id, current_user)
+
+
+def _get_booking_confirmed(db: Session, booking_id: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     result = db.execute(
         """
@@ -941,18 +1025,49 @@ async def get_booking_confirmed(
 
 @router.get("/", response_model=List[BookingWithDetails])
 async def get_bookings(
+    response: Response,
     customer_id: str = None,
     staff_id: str = None,
     service_id: str = None,
     status: str = None,
     start_date: datetime = None,
     end_date: datetime = None,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
+    skip: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get bookings with filters, newest first; the next page's cursor is in X-Next-Cursor"""
+    reject_offset(skip)
+    return await db.run_sync(
+        _get_bookings,
+        response,
+        customer_id,
+        staff_id,
+        service_id,
+        status,
+        start_date,
+        end_date,
+        cursor,
+        limit,
+        current_user,
+    )
+
+
+def _get_bookings(
+    db: Session,
+    response: Response,
+    customer_id: str,
+    staff_id: str,
+    service_id: str,
+    status: str,
+    start_date: datetime,
+    end_date: datetime,
+    cursor: Optional[str],
+    limit: int,
+    current_user: dict,
 ):
-    """Get bookings with filters"""
     query = """
         SELECT b.*, s.name as service_name, s.price as service_price,
                u.full_name as staff_name, c.full_name as customer_name
@@ -995,10 +1110,11 @@ async def get_bookings(
         query += " AND b.start_time_utc <= :end_date"
         params["end_date"] = end_date
     
-    query += f" ORDER BY b.start_time_utc DESC LIMIT {limit} OFFSET {skip}"
+    after_cursor, order = keyset_page("b.start_time_utc", "b.id", cursor, limit, params)
+    query += f" AND {after_cursor}{order}"
     
     result = db.execute(query, params)
-    bookings = result.fetchall()
+    bookings = paginate(response, result.fetchall(), limit, "start_time_utc")
     return [dict(row._mapping) for row in bookings]
 
 @router.put("/{booking_id}", response_model=BookingResponse)
@@ -1006,10 +1122,13 @@ async def update_booking(
     booking_id: str,
     booking: BookingUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a booking"""
-    # Get current booking
+    return await db.run_sync(_update_booking, booking_id, booking, current_user)
+
+
+def _update_booking(db: Session, booking_id: str, booking: BookingUpdate, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     result = db.execute("SELECT * FROM bookings WHERE id = :id", {"id": booking_id})
     current_booking = result.fetchone()
@@ -1041,137 +1160,20 @@ async def update_booking(
         )
         duration_minutes = service_config["duration"]
         buffer_minutes = service_config["buffer"]
-        capacity = service_config["capacity"]
         end_time_utc = booking.start_time_utc + timedelta(minutes=duration_minutes + buffer_minutes)
 
-        schedule = _get_staff_schedule(db, staff_id, booking.start_time_utc.date())
-        if not schedule:
-            raise HTTPException(status_code=400, detail="Staff schedule is not configured")
-
-        schedule_tz = ZoneInfo(schedule["timezone"])
-        local_start = booking.start_time_utc.astimezone(schedule_tz)
-        local_end = end_time_utc.astimezone(schedule_tz)
-        local_date = local_start.date()
-
-        schedule = _get_staff_schedule(db, staff_id, local_date)
-        if not schedule:
-            raise HTTPException(status_code=400, detail="Staff schedule is not configured")
-
-        schedule_tz = ZoneInfo(schedule["timezone"])
-        local_start = booking.start_time_utc.astimezone(schedule_tz)
-        local_end = end_time_utc.astimezone(schedule_tz)
-        local_date = local_start.date()
-
-        _enforce_daily_booking_limit(
-            db=db,
-            staff_id=staff_id,
-            schedule=schedule,
-            local_date=local_date,
-            schedule_tz=schedule_tz,
-            exclude_booking_id=booking_id,
-        )
-        _enforce_per_customer_limit(
+        _lock_staff_bookings(db, staff_id)
+        slot_ok, error_message = is_slot_bookable(
             db=db,
+            service_id=service_id,
             staff_id=staff_id,
+            start_utc=booking.start_time_utc,
             customer_id=booking_map["customer_id"],
-            schedule=schedule,
-            exclude_booking_id=booking_id,
-        )
-        _enforce_daily_slot_limit(
-            db=db,
-            booking=BookingCreate(
-                service_id=service_id,
-                staff_id=staff_id,
-                customer_id=booking_map["customer_id"],
-                start_time_utc=booking.start_time_utc,
-                booking_source=booking_map["booking_source"],
-                customer_timezone=booking_map.get("customer_timezone") or "UTC",
-            ),
-            schedule=schedule,
-            local_date=local_date,
-            ignore_booking_limits=True,
-        )
-
-        if not _service_allows_booking(db, service_id, local_start, local_end, schedule_tz):
-            raise HTTPException(status_code=400, detail="Service is not available at this time")
-
-        now_local = datetime.now(schedule_tz)
-        min_notice_cutoff = now_local + timedelta(minutes=settings.MIN_NOTICE_MINUTES)
-        if local_start < min_notice_cutoff:
-            raise HTTPException(status_code=400, detail="Booking does not meet minimum notice")
-
-        max_booking_cutoff = now_local + timedelta(days=settings.MAX_BOOKING_DAYS)
-        if local_start > max_booking_cutoff:
-            raise HTTPException(status_code=400, detail="Booking exceeds maximum window")
-
-        weekday = (local_start.weekday() + 1) % 7
-        work_blocks = db.execute(
-            """
-            SELECT start_time_local, end_time_local
-            FROM staff_work_blocks
-            WHERE schedule_id = :schedule_id AND weekday = :weekday
-            """,
-            {"schedule_id": schedule["id"], "weekday": weekday},
-        ).fetchall()
-
-        if not work_blocks:
-            raise HTTPException(status_code=400, detail="Staff is not available on this day")
-
-        fits_work_block = False
-        for block in work_blocks:
-            block_start = datetime.combine(local_start.date(), block[0], tzinfo=schedule_tz)
-            block_end = datetime.combine(local_start.date(), block[1], tzinfo=schedule_tz)
-            if local_start >= block_start and local_end <= block_end:
-                fits_work_block = True
-                break
-
-        if not fits_work_block:
-            raise HTTPException(status_code=400, detail="Time is outside staff working hours")
-
-        break_blocks = db.execute(
-            """
-            SELECT start_time_local, end_time_local
-            FROM staff_break_blocks
-            WHERE schedule_id = :schedule_id AND weekday = :weekday
-            """,
-            {"schedule_id": schedule["id"], "weekday": weekday},
-        ).fetchall()
-
-        for block in break_blocks:
-            block_start = datetime.combine(local_start.date(), block[0], tzinfo=schedule_tz)
-            block_end = datetime.combine(local_start.date(), block[1], tzinfo=schedule_tz)
-            if local_start < block_end and local_end > block_start:
-                raise HTTPException(status_code=400, detail="Time overlaps a staff break")
-
-        exception_result = db.execute(
-            """
-            SELECT id FROM staff_exceptions
-            WHERE staff_id = :staff_id
-              AND type IN ('time_off', 'blocked_time')
-              AND start_utc < :end_time AND end_utc > :start_time
-            """,
-            {
-                "staff_id": staff_id,
-                "start_time": booking.start_time_utc,
-                "end_time": end_time_utc,
-            },
-        )
-
-        if exception_result.fetchone():
-            raise HTTPException(status_code=400, detail="Staff is unavailable for this time")
-
-        slot_ok, error_message = _check_slot_capacity(
-            db=db,
-            staff_id=staff_id,
-            service_id=service_id,
-            start_time_utc=booking.start_time_utc,
-            end_time_utc=end_time_utc,
-            capacity=capacity,
             exclude_booking_id=booking_id,
             exclude_hold_by=current_user.get("id"),
         )
         if not slot_ok:
-            raise HTTPException(status_code=400, detail=error_message)
+            _raise_slot_error(db, error_message)
 
         updates.append("start_time_utc = :start_time_utc")
         updates.append("end_time_utc = :end_time_utc")
@@ -1197,8 +1199,10 @@ async def update_booking(
         raise HTTPException(status_code=400, detail="No fields to update")
 
     query = f"UPDATE bookings SET {', '.join(updates)} WHERE id = :id"
-    db.execute(query, params)
-    db.commit()
+    try:
+        db.execute(query, params)
+    except IntegrityError as exc:
+        _raise_overlap_violation(db, exc)
     
     # Log the change
     if change_type:
@@ -1217,7 +1221,6 @@ async def update_booking(
                 "changed_by": current_user.get("id"),
             },
         )
-        db.commit()
 
     log_details: Dict[str, object] = {}
     if booking.start_time_utc is not None:
@@ -1253,12 +1256,12 @@ async def update_booking(
             "details": json.dumps(jsonable_encoder(log_details)) if log_details else None,
         },
     )
-    db.commit()
-
     if change_type == "reschedule":
-        _send_booking_emails(db, booking_id, "confirmation")
+        _queue_booking_emails(db, booking_id, "confirmation")
     if booking.status is not None and booking.status == "cancelled":
-        _send_booking_emails(db, booking_id, "cancellation")
+        _queue_booking_emails(db, booking_id, "cancellation")
+    db.commit()
+    bump_staff_generation(db, staff_id)
     
     result = db.execute(
         "SELECT * FROM bookings WHERE id = :id",
@@ -1271,19 +1274,22 @@ async def cancel_booking(
     booking_id: str,
     reason: str = None,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Cancel a booking"""
+    return await db.run_sync(_cancel_booking, booking_id, reason, current_user)
+
+
+def _cancel_booking(db: Session, booking_id: str, reason: str, current_user: dict):
     _ensure_booking_access(db, booking_id, current_user)
     current_status = db.execute(
         "SELECT status FROM bookings WHERE id = :id",
         {"id": booking_id},
     ).fetchone()
-    db.execute(
-        "UPDATE bookings SET status = 'cancelled' WHERE id = :id",
+    cancelled = db.execute(
+        "UPDATE bookings SET status = 'cancelled' WHERE id = :id RETURNING staff_id",
         {"id": booking_id}
-    )
-    db.commit()
+    ).fetchone()
     
     # Log the cancellation
     db.execute(
@@ -1298,7 +1304,6 @@ async def cancel_booking(
             "reason": reason,
         }
     )
-    db.commit()
 
     db.execute(
         """
@@ -1320,8 +1325,9 @@ async def cancel_booking(
             ),
         },
     )
+    _queue_booking_emails(db, booking_id, "cancellation")
     db.commit()
-
-    _send_booking_emails(db, booking_id, "cancellation")
+    if cancelled:
+        bump_staff_generation(db, cancelled[0])
     
     return {"message": "Booking cancelled"}
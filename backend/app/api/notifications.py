@@ -3,10 +3,15 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth import get_current_user, is_admin
 from app.core.config import settings
-from app.core.notify import send_email_notification, get_booking_email_context, build_booking_email
+from app.core.notify import (
+    send_email_notification,
+    get_booking_email_context,
+    build_booking_email,
+    queue_due_reminders,
+)
 from app.models.schemas import NotificationCreate, NotificationResponse
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -129,7 +134,7 @@ async def run_booking_reminders(
     auth_token: str | None = Cookie(None),
     db: Session = Depends(get_db),
 ):
-    """Send reminder emails for bookings starting soon."""
+    """Queue reminder emails for every configured lead time; the notification worker sends them."""
     if settings.REMINDER_CRON_TOKEN:
         if cron_token != settings.REMINDER_CRON_TOKEN:
             raise HTTPException(status_code=401, detail="Invalid reminder token")
@@ -142,71 +147,6 @@ async def run_booking_reminders(
         if not is_admin(current_user):
             raise HTTPException(status_code=403, detail="Forbidden")
 
-    lead = settings.REMINDER_LEAD_MINUTES
-    window = settings.REMINDER_WINDOW_MINUTES
-    now = datetime.now(timezone.utc)
-    window_start = now + timedelta(minutes=lead)
-    window_end = window_start + timedelta(minutes=window)
-
-    rows = db.execute(
-        """
-        SELECT b.id,
-               b.start_time_utc,
-               b.end_time_utc,
-               b.customer_timezone,
-               s.name AS service_name,
-               u.full_name AS staff_name,
-               u.email AS staff_email,
-               u.timezone AS staff_timezone,
-               c.full_name AS customer_name,
-               c.email AS customer_email
-        FROM bookings b
-        LEFT JOIN services s ON b.service_id = s.id
-        LEFT JOIN users u ON b.staff_id = u.id
-        LEFT JOIN customers c ON b.customer_id = c.id
-        WHERE b.status IN ('pending', 'confirmed')
-          AND b.start_time_utc >= :start
-          AND b.start_time_utc < :end
-        """,
-        {"start": window_start, "end": window_end},
-    ).fetchall()
-
-    sent = 0
-    skipped = 0
-
-    for row in rows:
-        context = dict(row._mapping)
-        booking_id = str(context["id"])
-
-        for role, email_key in (("customer", "customer_email"), ("staff", "staff_email")):
-            recipient = context.get(email_key)
-            if not recipient:
-                skipped += 1
-                continue
-
-            exists = db.execute(
-                """
-                SELECT 1 FROM notifications
-                WHERE booking_id = :booking_id
-                  AND type = 'reminder'
-                  AND recipient = :recipient
-                """,
-                {"booking_id": booking_id, "recipient": recipient},
-            ).fetchone()
-            if exists:
-                skipped += 1
-                continue
-
-            email_payload = build_booking_email(context, "reminder", role)
-            status = send_email_notification(
-                db=db,
-                booking_id=booking_id,
-                notification_type="reminder",
-                recipient=recipient,
-                subject=email_payload["subject"],
-                body=email_payload["body"],
-            )
-            if status == "sent":
-                sent += 1
-
-    return {"sent": sent, "skipped": skipped}
+    result = queue_due_reminders(db)
+    db.commit()
+    return result
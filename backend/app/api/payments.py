@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from typing import List, Optional
+from app.core.database import get_async_db, get_db
 from app.core.auth import get_current_user, is_admin
+from app.core.idempotency import run_idempotent
+from app.core.slot_cache import bump_staff_generation
 from app.models.schemas import PaymentCreate, PaymentResponse, PaymentIntent
 import uuid
 import hashlib
@@ -52,9 +55,20 @@ def generate_mock_payment_url(payment_id: str, amount: float) -> str:
 async def create_payment_intent(
     payment: PaymentCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """Create a payment intent with ABA Payway (Mock)"""
+    return await run_idempotent(
+        db,
+        idempotency_key,
+        current_user.get("id"),
+        "payments.create_intent",
+        payment,
+        lambda: db.run_sync(_create_payment_intent, payment, current_user),
+    )
+
+def _create_payment_intent(db: Session, payment: PaymentCreate, current_user: dict) -> dict:
     _ensure_booking_access(db, payment.booking_id, current_user)
     payment_id = str(uuid.uuid4())
     transaction_id = hashlib.md5(f"{payment_id}{time.time()}".encode()).hexdigest()
@@ -192,15 +206,18 @@ async def refund_payment(
     )
     
     # Update booking
-    db.execute(
+    refunded = db.execute(
         """
         UPDATE bookings SET payment_status = 'refunded', status = 'cancelled'
         WHERE id = (SELECT booking_id FROM payments WHERE id = :payment_id)
+        RETURNING staff_id
         """,
         {"payment_id": payment_id}
-    )
+    ).fetchone()
     
     db.commit()
+    if refunded:
+        bump_staff_generation(db, refunded[0])
     
     return {
         "message": "Refund processed",
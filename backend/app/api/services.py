@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from pathlib import Path
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.auth import require_permissions
 from app.core.config import settings
 from app.core.image_moderation import moderate_image
+from app.core.pagination import keyset_page, paginate, reject_offset
+from app.core.slot_cache import bump_service_calendar_generation, bump_service_generation
 from app.models.schemas import (
     ServiceCreate,
     ServiceUpdate,
@@ -39,6 +42,7 @@ def _normalize_uuid_fields(row: dict, fields: list[str]) -> dict:
 
 @router.get("/", response_model=List[ServiceResponse])
 async def get_services(
+    response: Response,
     active_only: bool = True,
     search: str | None = None,
     category: str | None = None,
@@ -48,13 +52,47 @@ async def get_services(
     min_duration: int | None = None,
     max_duration: int | None = None,
     require_staff: bool = False,
-    skip: int = 0,
+    cursor: str | None = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int | None = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all services, newest first; the next page's cursor is in X-Next-Cursor"""
+    reject_offset(skip)
+    return await db.run_sync(
+        _get_services,
+        response,
+        active_only,
+        search,
+        category,
+        tag,
+        min_price,
+        max_price,
+        min_duration,
+        max_duration,
+        require_staff,
+        cursor,
+        limit,
+    )
+
+
+def _get_services(
+    db: Session,
+    response: Response,
+    active_only: bool,
+    search: str | None,
+    category: str | None,
+    tag: str | None,
+    min_price: float | None,
+    max_price: float | None,
+    min_duration: int | None,
+    max_duration: int | None,
+    require_staff: bool,
+    cursor: str | None,
+    limit: int,
 ):
-    """Get all services"""
     conditions = ["is_archived = FALSE"]
-    params: dict[str, object] = {"limit": limit, "skip": skip}
+    params: dict[str, object] = {}
     if active_only:
         conditions.append(
             "is_active = TRUE"
@@ -99,16 +137,21 @@ async def get_services(
             "AND ss.admin_only = FALSE)"
         )
 
-    query = "SELECT * FROM services WHERE " + " AND ".join(conditions)
-    query += " ORDER BY created_at DESC LIMIT :limit OFFSET :skip"
+    after_cursor, order = keyset_page("created_at", "id", cursor, limit, params)
+    conditions.append(after_cursor)
+    query = "SELECT * FROM services WHERE " + " AND ".join(conditions) + order
 
     result = db.execute(text(query), params)
-    services = result.fetchall()
+    services = paginate(response, result.fetchall(), limit, "created_at")
     return [_normalize_service_row(dict(row._mapping)) for row in services]
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-async def get_service(service_id: str, db: Session = Depends(get_db)):
+async def get_service(service_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get service by ID"""
+    return await db.run_sync(_get_service, service_id)
+
+
+def _get_service(db: Session, service_id: str):
     result = db.execute(
         text("SELECT * FROM services WHERE id = :id AND is_archived = FALSE"),
         {"id": service_id},
@@ -172,7 +215,7 @@ async def create_service(
     )
     db.commit()
     
-    return await get_service(service_id, db)
+    return _get_service(db, service_id)
 
 @router.post("/upload-image")
 async def upload_service_image(
@@ -281,8 +324,9 @@ async def update_service(
     query = f"UPDATE services SET {', '.join(updates)} WHERE id = :id"
     db.execute(text(query), params)
     db.commit()
+    bump_service_generation(service_id)
     
-    return await get_service(service_id, db)
+    return _get_service(db, service_id)
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_service(
@@ -324,6 +368,7 @@ async def delete_service(
         {"id": service_id},
     )
     db.commit()
+    bump_service_generation(service_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Service not found")
@@ -426,6 +471,7 @@ async def create_service_operating_schedule(
         },
     )
     db.commit()
+    bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
@@ -480,6 +526,7 @@ async def update_service_operating_schedule(
         query = f"UPDATE service_operating_schedules SET {', '.join(updates)} WHERE id = :id"
         db.execute(text(query), params)
         db.commit()
+        bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
@@ -527,6 +574,7 @@ async def add_service_operating_rule(
         },
     )
     db.commit()
+    bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
@@ -542,6 +590,7 @@ async def delete_service_operating_rule(
         {"id": rule_id},
     )
     db.commit()
+    bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
@@ -573,6 +622,7 @@ async def add_service_operating_exception(
         },
     )
     db.commit()
+    bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
@@ -588,12 +638,17 @@ async def delete_service_operating_exception(
         {"id": exception_id},
     )
     db.commit()
+    bump_service_calendar_generation(service_id)
 
     return await get_service_operating_schedule(service_id, current_user, db)
 
 @router.get("/{service_id}/staff")
-async def get_service_staff(service_id: str, db: Session = Depends(get_db)):
+async def get_service_staff(service_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get staff assigned to a service"""
+    return await db.run_sync(_get_service_staff, service_id)
+
+
+def _get_service_staff(db: Session, service_id: str):
     result = db.execute(
         text(
             """
@@ -14,6 +14,7 @@ from app.models.schemas import (
     StaffServiceOverrideResponse,
 )
 from app.core.config import settings
+from app.core.slot_cache import bump_service_generation, bump_staff_generation
 import uuid
 
 router = APIRouter()
@@ -192,6 +193,7 @@ async def assign_staff_to_service(
     except Exception:
         db.rollback()
         raise HTTPException(status_code=400, detail="Unable to assign staff to service")
+    bump_staff_generation(db, assignment.staff_id)
 
     return _normalize_uuid_fields(
         dict(result._mapping),
@@ -238,13 +240,14 @@ async def update_staff_service_assignment(
         raise HTTPException(status_code=400, detail="No fields to update")
 
     result = db.execute(
-        text(f"UPDATE staff_services SET {', '.join(updates)} WHERE id = :id"),
+        text(f"UPDATE staff_services SET {', '.join(updates)} WHERE id = :id RETURNING staff_id"),
         params,
-    )
+    ).fetchone()
     db.commit()
 
-    if result.rowcount == 0:
+    if not result:
         raise HTTPException(status_code=404, detail="Assignment not found")
+    bump_staff_generation(db, result[0])
 
     updated = db.execute(
         text("SELECT * FROM staff_services WHERE id = :id"),
@@ -297,13 +300,15 @@ async def remove_staff_from_service(
 ):
     """Remove a staff member from a service (Admin only)"""
     result = db.execute(
-        text("DELETE FROM staff_services WHERE id = :id"),
+        text("DELETE FROM staff_services WHERE id = :id RETURNING staff_id, service_id"),
         {"id": assignment_id}
-    )
+    ).fetchone()
     db.commit()
     
-    if result.rowcount == 0:
+    if not result:
         raise HTTPException(status_code=404, detail="Assignment not found")
+    bump_service_generation(result[1])
+    bump_staff_generation(db, result[0])
     
     return {"message": "Staff removed from service"}
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel, EmailStr
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
@@ -10,6 +10,9 @@ import uuid
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, require_roles, get_permissions_for_role
+from app.core.pagination import keyset_page, paginate, reject_offset
+from app.core.session_cache import invalidate_user_sessions
+from app.core.slot_cache import bump_staff_generation
 
 router = APIRouter()
 
@@ -140,21 +143,24 @@ def _ensure_permission(db: Session, current_user: dict, permission: str) -> None
 
 @router.get("/users", response_model=List[UserResponse])
 def list_users(
+    response: Response,
     search: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
+    skip: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    reject_offset(skip)
     _ensure_permission(db, current_user, "staff:manage")
     query = """
         SELECT id, email, full_name, role, phone, avatar_url, timezone, is_active, created_at
         FROM users
         WHERE 1=1
     """
-    params = {"skip": skip, "limit": limit}
+    params = {}
 
     if role:
         query += " AND role = :role"
@@ -166,10 +172,11 @@ def list_users(
         query += " AND (LOWER(full_name) LIKE :search OR LOWER(email) LIKE :search OR LOWER(phone) LIKE :search)"
         params["search"] = f"%{search.lower()}%"
 
-    query += " ORDER BY created_at DESC LIMIT :limit OFFSET :skip"
+    after_cursor, order = keyset_page("created_at", "id", cursor, limit, params)
+    query += f" AND {after_cursor}{order}"
 
     result = db.execute(text(query), params)
-    return [_serialize_user(row) for row in result.fetchall()]
+    return [_serialize_user(row) for row in paginate(response, result.fetchall(), limit, "created_at")]
 
 
 @router.post("/users", response_model=UserResponse)
@@ -332,6 +339,9 @@ def update_user(
     """
     updated = db.execute(text(query), params).fetchone()
     db.commit()
+    invalidate_user_sessions(user_id)
+    if payload.full_name is not None:
+        bump_staff_generation(db, user_id)
 
     return _serialize_user(updated)
 
@@ -356,6 +366,7 @@ def update_user_status(
         {"id": user_id, "is_active": payload.is_active},
     ).fetchone()
     db.commit()
+    invalidate_user_sessions(user_id)
 
     if not updated:
         raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+
+_INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+_STAFF_ID = str(uuid.uuid4())
+_NOW = datetime.now(timezone.utc)
+_PARAMS = {
+    "staff_id": _STAFF_ID,
+    "staff_ids": [_STAFF_ID],
+    "customer_id": str(uuid.uuid4()),
+    "user_id": str(uuid.uuid4()),
+    "schedule_id": str(uuid.uuid4()),
+    "weekday": 1,
+    "range_start": _NOW,
+    "range_end": _NOW + timedelta(days=7),
+    "created_by": str(uuid.uuid4()),
+}
+
+# The GiST (staff_id, period) indexes and the exclusion constraint serve the
+# && range predicates as well as the composite btrees do.
+_BOOKING_RANGE_INDEXES = (
+    "idx_bookings_staff_active_time",
+    "idx_bookings_staff_period",
+    "bookings_exclusive_no_overlap",
+)
+_HOLD_RANGE_INDEXES = ("idx_booking_holds_staff_expires", "idx_booking_holds_staff_period")
+
+# (name, table, indexes allowed to serve it, statement), mirroring the hot
+# queries in app/api/availability.py and app/api/bookings.py.
+_CHECKS: Tuple[Tuple[str, str, Tuple[str, ...], str], ...] = (
+    (
+        "availability: staff exceptions in range",
+        "staff_exceptions",
+        ("idx_staff_exceptions_staff_time",),
+        """
+        SELECT staff_id, type, start_utc, end_utc, is_all_day
+        FROM staff_exceptions
+        WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+          AND start_utc < :range_end
+          AND end_utc > :range_start
+        """,
+    ),
+    (
+        "availability: active bookings in range",
+        "bookings",
+        _BOOKING_RANGE_INDEXES,
+        """
+        SELECT staff_id, service_id, start_time_utc, end_time_utc
+        FROM bookings
+        WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+          AND period && tstzrange(:range_start, :range_end)
+          AND status NOT IN ('cancelled', 'no-show')
+        """,
+    ),
+    (
+        "availability: live holds in range",
+        "booking_holds",
+        _HOLD_RANGE_INDEXES,
+        """
+        SELECT staff_id, service_id, start_utc, end_utc
+        FROM booking_holds
+        WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+          AND expires_at_utc > NOW()
+          AND period && tstzrange(:range_start, :range_end)
+        """,
+    ),
+    (
+        "availability: live holds of a staff member",
+        "booking_holds",
+        ("idx_booking_holds_staff_expires",),
+        "SELECT * FROM booking_holds WHERE expires_at_utc > NOW() AND staff_id = :staff_id",
+    ),
+    (
+        "availability: customer booking limit",
+        "bookings",
+        ("idx_bookings_staff_active_time",),
+        """
+        SELECT COUNT(*)
+        FROM bookings
+        WHERE staff_id = :staff_id
+          AND customer_id = :customer_id
+          AND status NOT IN ('cancelled', 'no-show', 'completed')
+          AND end_time_utc > NOW()
+        """,
+    ),
+    (
+        "availability: work blocks of a weekday",
+        "staff_work_blocks",
+        ("idx_staff_work_blocks_schedule_weekday",),
+        """
+        SELECT start_time_local, end_time_local
+        FROM staff_work_blocks
+        WHERE schedule_id = :schedule_id AND weekday = :weekday
+        """,
+    ),
+    (
+        "availability: calendar bookings of a day",
+        "bookings",
+        _BOOKING_RANGE_INDEXES,
+        """
+        SELECT start_time_utc, end_time_utc
+        FROM bookings
+        WHERE staff_id = :staff_id
+          AND status NOT IN ('cancelled', 'no-show')
+          AND period && tstzrange(:range_start, :range_end)
+        """,
+    ),
+    (
+        "bookings: customer of a user",
+        "customers",
+        ("idx_customers_user",),
+        "SELECT id FROM customers WHERE user_id = :user_id",
+    ),
+    (
+        "bookings: holds released by a new booking",
+        "booking_holds",
+        _HOLD_RANGE_INDEXES,
+        """
+        DELETE FROM booking_holds
+        WHERE staff_id = :staff_id
+          AND period && tstzrange(:range_start, :range_end)
+          AND (created_by IS NULL OR created_by = :created_by)
+        """,
+    ),
+    (
+        "bookings: staff booking list",
+        "bookings",
+        ("idx_bookings_staff", "idx_bookings_staff_period"),
+        """
+        SELECT b.* FROM bookings b
+        WHERE b.staff_id = :staff_id
+        ORDER BY b.start_time_utc DESC LIMIT 50
+        """,
+    ),
+    (
+        "bookings: keyset page",
+        "bookings",
+        ("idx_bookings_start_time_id",),
+        """
+        SELECT b.id FROM bookings b
+        WHERE (b.start_time_utc, b.id) < (:range_start, :created_by)
+        ORDER BY b.start_time_utc DESC, b.id DESC LIMIT 101
+        """,
+    ),
+)
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _index_used(plan: dict, table: str) -> Optional[str]:
+    """Name of the index the plan reads table through, or None for a sequential scan."""
+    for node in _plan_nodes(plan):
+        if node["Node Type"] in _INDEX_NODES and node.get("Relation Name", table) == table and node.get("Index Name"):
+            return node["Index Name"]
+    return None
+
+
+def _drop_other_indexes(conn, table: str, expected: Tuple[str, ...]) -> None:
+    """Drop, inside the caller's transaction, every droppable index on table not in expected."""
+    others = conn.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass(:table)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = i.indexrelid)
+              AND c.relname <> ALL(:expected)
+            """
+        ),
+        {"table": table, "expected": list(expected)},
+    ).scalars().all()
+    for index_name in others:
+        conn.execute(text(f'DROP INDEX "{index_name}"'))
+
+
+def check_query_plans(conn) -> List[Tuple[str, Tuple[str, ...], Optional[str]]]:
+    """EXPLAIN every hot query and return (name, expected indexes, index used or None).
+
+    Each query is planned with only its expected indexes left on the table
+    and seq scans disabled, so the result depends neither on the size of the
+    database nor on the planner preferring an older single-column index: it
+    fails exactly when none of the expected indexes can serve the predicate.
+    The other indexes are dropped inside a transaction that is rolled back,
+    which holds an exclusive lock on the table while the query is planned, so
+    run this against a development or staging database.
+    """
+    results = []
+    for name, table, expected, statement in _CHECKS:
+        try:
+            if conn.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar() is None:
+                continue
+            _drop_other_indexes(conn, table, expected)
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"), _PARAMS).scalar()
+        finally:
+            conn.rollback()
+        results.append((name, expected, _index_used(plan[0]["Plan"], table)))
+    return results
+
+
+def main() -> None:
+    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+    with engine.connect() as conn:
+        results = check_query_plans(conn)
+
+    failures = 0
+    for name, expected, index_name in results:
+        if index_name in expected:
+            print(f"ok   {name}: {index_name}")
+        else:
+            failures += 1
+            print(f"FAIL {name}: {index_name or 'sequential scan'}, expected one of {', '.join(expected)}")
+    if failures:
+        raise SystemExit(f"{failures} hot query(s) not served by their index")
+
+
+if __name__ == "__main__":
+    main()
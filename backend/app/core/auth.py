@@ -1,10 +1,15 @@
-from typing import Optional, Iterable, Dict, Any, Set
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Optional, Iterable, Dict, Any, Set, FrozenSet, Mapping, Tuple
 
 from fastapi import Depends, Header, Cookie, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.session_cache import cache_session_user, get_cached_session_user
 
 ADMIN_ROLES: Set[str] = {"admin", "superadmin"}
 STAFF_ROLES: Set[str] = {"staff", "admin", "superadmin"}
@@ -21,7 +26,8 @@ def get_user_by_token(db: Session, token: str):
         text(
             """
             SELECT u.id, u.email, u.full_name, u.role, u.phone, u.avatar_url,
-                   u.timezone, u.is_active, u.email_verified, u.created_at
+                   u.timezone, u.is_active, u.email_verified, u.created_at,
+                   s.expires_at AS session_expires_at
             FROM users u
             JOIN sessions s ON s.user_id = u.id
             WHERE s.token = :token AND s.expires_at > NOW()
@@ -40,11 +46,16 @@ def get_current_user(
     if not token:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    user = get_user_by_token(db, token)
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid session")
+    user_dict = get_cached_session_user(token)
+    if user_dict is None:
+        user = get_user_by_token(db, token)
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid session")
+
+        user_dict = dict(user._mapping)
+        session_expires_at = user_dict.pop("session_expires_at")
+        cache_session_user(token, user_dict, session_expires_at)
 
-    user_dict = dict(user._mapping)
     if not user_dict.get("is_active", True):
         raise HTTPException(status_code=403, detail="Account is disabled")
     if not user_dict.get("email_verified", True):
@@ -72,19 +83,49 @@ def is_staff(user: Dict[str, Any]) -> bool:
     return user.get("role") in STAFF_ROLES
 
 
-def get_permissions_for_role(db: Session, role: str) -> Set[str]:
+_PERMISSION_MATRIX: Optional[Tuple[float, Mapping[str, FrozenSet[str]]]] = None
+_PERMISSION_MATRIX_LOCK = Lock()
+
+
+def _load_permission_matrix(db: Session) -> Mapping[str, FrozenSet[str]]:
     result = db.execute(
         text(
             """
-            SELECT p.code
+            SELECT rp.role_name, p.code
             FROM role_permissions rp
             JOIN permissions p ON p.code = rp.permission_code
-            WHERE rp.role_name = :role
             """
-        ),
-        {"role": role},
+        )
     )
-    return {row[0] for row in result.fetchall()}
+    matrix: Dict[str, Set[str]] = {}
+    for role, code in result.fetchall():
+        matrix.setdefault(role, set()).add(code)
+    return MappingProxyType({role: frozenset(codes) for role, codes in matrix.items()})
+
+
+def get_permission_matrix(db: Session) -> Mapping[str, FrozenSet[str]]:
+    """Read-only role -> permissions map, reloaded at most every PERMISSION_CACHE_TTL_SECONDS."""
+    global _PERMISSION_MATRIX
+    cached = _PERMISSION_MATRIX
+    if cached is not None and cached[0] > monotonic():
+        return cached[1]
+    with _PERMISSION_MATRIX_LOCK:
+        cached = _PERMISSION_MATRIX
+        if cached is None or cached[0] <= monotonic():
+            matrix = _load_permission_matrix(db)
+            cached = (monotonic() + settings.PERMISSION_CACHE_TTL_SECONDS, matrix)
+            _PERMISSION_MATRIX = cached
+    return cached[1]
+
+
+def invalidate_permission_matrix() -> None:
+    """Force the next permission check to reload; call after editing roles or permissions."""
+    global _PERMISSION_MATRIX
+    _PERMISSION_MATRIX = None
+
+
+def get_permissions_for_role(db: Session, role: str) -> FrozenSet[str]:
+    return get_permission_matrix(db).get(role, frozenset())
 
 
 def require_permissions(*permissions: Iterable[str]):
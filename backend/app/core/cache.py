@@ -0,0 +1,398 @@
+from collections import OrderedDict
+from itertools import count
+from datetime import date, datetime
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+
+logger = logging.getLogger(__name__)
+
+# Real generations count up from 0, so negative ones never match a stored key.
+_UNMATCHED_GENERATIONS = count(-1, -1)
+
+
+def estimate_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+class LRUCache:
+    """In-process cache bounded by entry count and approximate size in bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= monotonic():
+                self._remove(key, size)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self._bytes -= existing[1]
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest_key, (_, oldest_size, _) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_size)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._remove(key, entry[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _json_object_hook(value: Dict[str, Any]) -> Any:
+    if len(value) == 1:
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+    return value
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default, separators=(",", ":"))
+
+
+def loads(raw: Any) -> Any:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    return json.loads(raw, object_hook=_json_object_hook)
+
+
+class CacheBackend:
+    """Key/value store plus named counters; shared backends swallow I/O errors as misses."""
+
+    name = "base"
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._bypass_until = 0.0
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store value for ttl_seconds, or for the backend's TTL when None."""
+        raise NotImplementedError
+
+    def incr(self, counter: str) -> int:
+        raise NotImplementedError
+
+    def counters(self, names: List[str]) -> List[int]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "hits": self._hits,
+            "misses": self._misses,
+            "errors": self._errors,
+            "bypassing": self.bypassing(),
+        }
+
+    def bypassing(self) -> bool:
+        """True while entries may predate an invalidation this process failed to record."""
+        return self._bypass_until > monotonic()
+
+    def _bump_failed(self, counter: str) -> int:
+        # Entries keyed on the old generation stay readable until they expire,
+        # so this process stops reading and writing them for one TTL.
+        self._errors += 1
+        self._bypass_until = monotonic() + self.ttl_seconds
+        logger.exception(
+            "Could not bump cache generation %s; bypassing the %s cache for %ss",
+            counter,
+            self.name,
+            self.ttl_seconds,
+        )
+        return 0
+
+    def _counters_failed(self, names: List[str]) -> List[int]:
+        # Reading 0 would build keys that still match entries written before
+        # every invalidation since, so bypass like a failed bump and hand out
+        # generations no stored key can carry.
+        self._errors += 1
+        self._bypass_until = monotonic() + self.ttl_seconds
+        logger.exception(
+            "Could not read cache generations; bypassing the %s cache for %ss",
+            self.name,
+            self.ttl_seconds,
+        )
+        return [next(_UNMATCHED_GENERATIONS) for _ in names]
+
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+
+class MemoryCacheBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        self._cache = LRUCache(max_entries, max_bytes, ttl_seconds)
+        self._counters: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl_seconds)
+
+    def incr(self, counter: str) -> int:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + 1
+            return self._counters[counter]
+
+    def counters(self, names: List[str]) -> List[int]:
+        return [self._counters.get(name, 0) for name in names]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self._cache.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        url: Optional[str] = None,
+        client: Any = None,
+        prefix: str = "booking:",
+        async_client: Any = None,
+    ):
+        super().__init__(ttl_seconds)
+        if client is None:
+            import redis  # type: ignore
+            import redis.asyncio  # type: ignore
+
+            client = redis.Redis.from_url(url)
+            async_client = redis.asyncio.Redis.from_url(url)
+        self._client = client
+        self._async_client = async_client
+        self._prefix = prefix
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        # Inside AsyncSession.run_sync the caller is on the event loop; the
+        # asyncio client awaits there instead of blocking it, as the Postgres
+        # backend does through its async engine.
+        if self._async_client is not None and in_greenlet():
+            return await_only(getattr(self._async_client, method)(*args, **kwargs))
+        return getattr(self._client, method)(*args, **kwargs)
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.bypassing():
+            return self._record(None)
+        try:
+            raw = self._call("get", self._prefix + key)
+        except Exception:
+            self._errors += 1
+            return None
+        return self._record(None if raw is None else loads(raw))
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if self.bypassing():
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            self._call("set", self._prefix + key, dumps(value), ex=max(int(ttl), 1))
+        except Exception:
+            self._errors += 1
+
+    def incr(self, counter: str) -> int:
+        try:
+            return int(self._call("incr", f"{self._prefix}counter:{counter}"))
+        except Exception:
+            return self._bump_failed(counter)
+
+    def counters(self, names: List[str]) -> List[int]:
+        if not names:
+            return []
+        try:
+            values = self._call("mget", [f"{self._prefix}counter:{name}" for name in names])
+        except Exception:
+            return self._counters_failed(names)
+        return [int(value or 0) for value in values]
+
+
+class PostgresCacheBackend(CacheBackend):
+    """Stores entries in UNLOGGED tables: shared by workers, skipped by WAL and replicas."""
+
+    name = "postgres"
+    _PURGE_EVERY = 500
+
+    def __init__(self, engine: Any, ttl_seconds: float, async_engine: Any = None):
+        super().__init__(ttl_seconds)
+        self._sync_engine = engine
+        self._async_engine = async_engine
+        self._writes = 0
+
+    @property
+    def _engine(self) -> Any:
+        # Inside AsyncSession.run_sync the caller is on the event loop; the
+        # async engine's sync facade awaits its I/O there instead of blocking.
+        if self._async_engine is not None and in_greenlet():
+            return self._async_engine.sync_engine
+        return self._sync_engine
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.bypassing():
+            return self._record(None)
+        try:
+            with self._engine.connect() as conn:
+                row = conn.execute(
+                    text(
+                        """
+                        SELECT value FROM slot_cache_entries
+                        WHERE key = :key AND expires_at > NOW()
+                        """
+                    ),
+                    {"key": key},
+                ).fetchone()
+        except Exception:
+            self._errors += 1
+            return None
+        return self._record(None if row is None else loads(row[0]))
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if self.bypassing():
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._writes += 1
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO slot_cache_entries (key, value, expires_at)
+                        VALUES (:key, :value, NOW() + make_interval(secs => :ttl))
+                        ON CONFLICT (key) DO UPDATE
+                        SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at
+                        """
+                    ),
+                    {"key": key, "value": dumps(value), "ttl": float(ttl)},
+                )
+                if self._writes % self._PURGE_EVERY == 0:
+                    conn.execute(text("DELETE FROM slot_cache_entries WHERE expires_at <= NOW()"))
+        except Exception:
+            self._errors += 1
+
+    def incr(self, counter: str) -> int:
+        try:
+            with self._engine.begin() as conn:
+                return int(
+                    conn.execute(
+                        text(
+                            """
+                            INSERT INTO slot_cache_counters (name, value)
+                            VALUES (:name, 1)
+                            ON CONFLICT (name) DO UPDATE
+                            SET value = slot_cache_counters.value + 1
+                            RETURNING value
+                            """
+                        ),
+                        {"name": counter},
+                    ).scalar()
+                )
+        except Exception:
+            return self._bump_failed(counter)
+
+    def counters(self, names: List[str]) -> List[int]:
+        if not names:
+            return []
+        try:
+            with self._engine.connect() as conn:
+                rows = conn.execute(
+                    text("SELECT name, value FROM slot_cache_counters WHERE name = ANY(:names)"),
+                    {"names": names},
+                ).fetchall()
+        except Exception:
+            return self._counters_failed(names)
+        values = {row[0]: int(row[1]) for row in rows}
+        return [values.get(name, 0) for name in names]
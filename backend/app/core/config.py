@@ -18,6 +18,24 @@ class Settings(BaseSettings):
     # Database (REQUIRED)
     # =========================
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL on the psycopg (v3) driver
+
+    # =========================
+    # Database pool (per engine, per process)
+    # =========================
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    # Behind PgBouncer in transaction mode: never use server-side prepared statements.
+    DB_PGBOUNCER_MODE: bool = False
+
+    # =========================
+    # Query instrumentation
+    # =========================
+    QUERY_STATS_ENABLED: bool = True  # Server-Timing header and a log line per request
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 10  # dev only: warn when one statement runs more often; 0 disables
 
     # =========================
     # CORS (comma-separated)
@@ -31,6 +49,13 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     MAGIC_LINK_TOKEN_MINUTES: int = 15
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_TTL_SECONDS: int = 60
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+    SESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    SESSION_CACHE_INVALIDATION: str = "local"  # local | redis
+    SESSION_CACHE_REDIS_URL: Optional[str] = None  # defaults to SLOT_CACHE_REDIS_URL
+    PERMISSION_CACHE_TTL_SECONDS: int = 60
 
     # =========================
     # Supabase (disabled / optional)
@@ -51,12 +76,53 @@ class Settings(BaseSettings):
     ABA_PAYWAY_API_KEY: str = "mock_api_key"
     ABA_PAYWAY_API_URL: str = "https://checkout-sandbox.payway.com.kh/api"
 
+    # =========================
+    # Pagination
+    # =========================
+    PAGINATION_MAX_PAGE_SIZE: int = 500
+
     # =========================
     # Booking Policies
     # =========================
     SLOT_GRANULARITY_MINUTES: int = 15
     MIN_NOTICE_MINUTES: int = 120
     MAX_BOOKING_DAYS: int = 90
+    SLOT_ENGINE: str = "python"  # python | numpy
+    SLOT_CACHE_TTL_SECONDS: int = 900
+    SLOT_CACHE_MAX_ENTRIES: int = 5000
+    SLOT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SLOT_CACHE_BACKEND: str = "memory"  # memory | redis | postgres
+    SLOT_CACHE_REDIS_URL: Optional[str] = None
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
+    # =========================
+    # Outbox
+    # =========================
+    OUTBOX_DISPATCH_IN_PROCESS: bool = True
+    OUTBOX_POLL_SECONDS: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETENTION_DAYS: int = 7
+
+    # =========================
+    # Notification worker
+    # =========================
+    NOTIFICATION_DISPATCH_IN_PROCESS: bool = True
+    NOTIFICATION_POLL_SECONDS: float = 2.0
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_CONCURRENCY: int = 4
+    NOTIFICATION_MAX_ATTEMPTS: int = 6
+    NOTIFICATION_RETRY_BASE_SECONDS: int = 30
+    NOTIFICATION_RETRY_MAX_SECONDS: int = 3600
+
+    # =========================
+    # Scheduler
+    # =========================
+    SCHEDULER_IN_PROCESS: bool = True
+    SCHEDULER_TICK_SECONDS: float = 5.0
+    SCHEDULER_PURGE_INTERVAL_SECONDS: int = 300
+    SCHEDULER_PURGE_BATCH_SIZE: int = 1000
+    SCHEDULER_RUN_REMINDERS: bool = True
 
     # =========================
     # Email (SMTP)
@@ -91,8 +157,9 @@ class Settings(BaseSettings):
     # =========================
     # Reminder Jobs
     # =========================
-    REMINDER_LEAD_MINUTES: int = 60
+    REMINDER_LEAD_MINUTES: str = "1440,60"  # comma-separated, one reminder per lead time
     REMINDER_WINDOW_MINUTES: int = 5
+    REMINDER_CATCHUP_MINUTES: int = 60  # how late a missed reminder may still be sent
     REMINDER_CRON_TOKEN: Optional[str] = None
 
     @property
@@ -108,4 +175,9 @@ class Settings(BaseSettings):
                 origins.append(cleaned)
         return origins
 
+    @property
+    def reminder_lead_minutes_list(self) -> List[int]:
+        leads = {int(part) for part in self.REMINDER_LEAD_MINUTES.split(",") if part.strip()}
+        return sorted(lead for lead in leads if lead > 0)
+
 settings = Settings()
@@ -1,10 +1,83 @@
-from sqlalchemy import create_engine, text
+from collections import Counter
+from contextvars import ContextVar, Token
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import re
+import time
+
+from psycopg.types.string import TextLoader
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from app.core.config import settings
 
+
+logger = logging.getLogger(__name__)
+
+_CHECKOUT_LOCK = Lock()
+_CHECKOUTS: Dict[str, Dict[str, float]] = {}
+
+
+def _record_checkout(pool_name: str, wait_seconds: float, timed_out: bool) -> None:
+    with _CHECKOUT_LOCK:
+        stats = _CHECKOUTS.setdefault(
+            pool_name,
+            {"checkouts": 0, "timeouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0},
+        )
+        stats["timeouts" if timed_out else "checkouts"] += 1
+        stats["wait_seconds_total"] += wait_seconds
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait_seconds)
+
+
+class _TimedPoolMixin:
+    """Time every checkout, including waits for a free slot and opening new connections."""
+
+    pool_name = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            _record_checkout(self.pool_name, time.perf_counter() - started, timed_out=True)
+            raise
+        _record_checkout(self.pool_name, time.perf_counter() - started, timed_out=False)
+        return connection
+
+
+class _TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pool_name = "sync"
+
+
+class _TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pool_name = "async"
+
+
+class _TimedCacheQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pool_name = "cache"
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# psycopg2 never prepares statements server-side, so it needs nothing extra
+# to run behind PgBouncer in transaction mode.
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
+    poolclass=_TimedQueuePool,
+    **_pool_options(),
 )
 
 class SafeSession(Session):
@@ -26,3 +99,188 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+psycopg").render_as_string(
+        hide_password=False
+    )
+
+
+def _load_like_psycopg2(dbapi_connection, connection_record):
+    # Handlers were written against psycopg2, which returns uuids and ranges as
+    # strings; psycopg 3 would return UUID and Range objects that the response
+    # models and jsonable_encoder reject.
+    adapters = dbapi_connection.driver_connection.adapters
+    for type_name in ("uuid", "tstzrange", "tsrange"):
+        adapters.register_loader(type_name, TextLoader)
+
+
+def _create_async_engine(poolclass: type):
+    async_engine = create_async_engine(
+        _async_database_url(),
+        poolclass=poolclass,
+        # psycopg 3 prepares a statement after a few executions; a prepared
+        # statement outlives the transaction and PgBouncer may hand the next one
+        # to a different server connection.
+        connect_args={"prepare_threshold": None} if settings.DB_PGBOUNCER_MODE else {},
+        **_pool_options(),
+    )
+    event.listen(async_engine.sync_engine, "connect", _load_like_psycopg2)
+    return async_engine
+
+
+# Async handlers use this engine so database I/O no longer blocks the event
+# loop. Existing sync code runs unchanged on it through AsyncSession.run_sync,
+# which hands it a SafeSession whose I/O is awaited under the hood.
+async_engine = _create_async_engine(_TimedAsyncQueuePool)
+
+# Shared caches are read while a request session already holds a connection;
+# giving them their own pool means a saturated request pool cannot deadlock
+# on its own cache lookups.
+cache_async_engine = _create_async_engine(_TimedCacheQueuePool)
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=SafeSession,
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_gauges(pool: Pool, pool_name: str) -> Dict[str, Any]:
+    with _CHECKOUT_LOCK:
+        checkouts = dict(_CHECKOUTS.get(pool_name, {}))
+    attempts = checkouts.get("checkouts", 0) + checkouts.get("timeouts", 0)
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size until the pool is full.
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts.get("checkouts", 0),
+        "timeouts": checkouts.get("timeouts", 0),
+        "wait_seconds_avg": checkouts["wait_seconds_total"] / attempts if attempts else 0.0,
+        "wait_seconds_max": checkouts.get("wait_seconds_max", 0.0),
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Live gauges for every engine of this process."""
+    return {
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+        "sync": _pool_gauges(engine.pool, "sync"),
+        "async": _pool_gauges(async_engine.pool, "async"),
+        "cache": _pool_gauges(cache_async_engine.pool, "cache"),
+    }
+
+
+_STATEMENT_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and inlined literals so the same query always looks the same."""
+    return _WHITESPACE.sub(" ", _STATEMENT_LITERALS.sub("?", statement)).strip()
+
+
+class RequestQueries:
+    """Statements run on either engine while serving one request."""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Normalized statements that ran more than threshold times, most frequent first."""
+        counts: Counter = Counter()
+        for statement, count in self.statements.items():
+            counts[normalize_statement(statement)] += count
+        return [(statement, count) for statement, count in counts.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_REQUEST_QUERIES: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def begin_request_queries() -> Token:
+    return _REQUEST_QUERIES.set(RequestQueries())
+
+
+def end_request_queries(token: Token) -> RequestQueries:
+    queries = _REQUEST_QUERIES.get()
+    _REQUEST_QUERIES.reset(token)
+    return queries
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _REQUEST_QUERIES.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _REQUEST_QUERIES.get()
+    started = conn.info.get("query_started")
+    if queries is not None and started:
+        queries.record(statement, time.perf_counter() - started.pop())
+
+
+def _discard_query_start(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+for _engine in (engine, async_engine.sync_engine, cache_async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _discard_query_start)
+
+
+def log_request_queries(method: str, path: str, status_code: int, queries: RequestQueries) -> None:
+    logger.info(
+        json.dumps(
+            {
+                "event": "request_queries",
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "queries": queries.count,
+                "db_ms": round(queries.seconds * 1000, 1),
+            }
+        )
+    )
+    threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD
+    if threshold <= 0 or not (settings.DEBUG or settings.ENV == "development"):
+        return
+    for statement, count in queries.repeated(threshold):
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "n_plus_one",
+                    "method": method,
+                    "path": path,
+                    "count": count,
+                    "statement": statement[:500],
+                }
+            )
+        )
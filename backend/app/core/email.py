@@ -17,15 +17,19 @@ def _smtp_configured() -> bool:
     return bool(settings.SMTP_HOST and settings.SMTP_FROM_EMAIL)
 
 
-def send_email(to_email: str, subject: str, body: str) -> None:
-    if not _smtp_configured():
-        raise RuntimeError("SMTP is not configured")
-
+def build_email_message(to_email: str, subject: str, body: str) -> EmailMessage:
     message = EmailMessage()
     message["From"] = _build_from_header()
     message["To"] = to_email
     message["Subject"] = subject
     message.set_content(body)
+    return message
+
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """Connect and authenticate once; callers send any number of messages, then quit()."""
+    if not _smtp_configured():
+        raise RuntimeError("SMTP is not configured")
 
     smtp_host = settings.SMTP_HOST or ""
     smtp_port = settings.SMTP_PORT
@@ -45,7 +49,15 @@ def send_email(to_email: str, subject: str, body: str) -> None:
 
         if username and password:
             server.login(username, password)
+    except Exception:
+        server.close()
+        raise
+    return server
+
 
-        server.send_message(message)
+def send_email(to_email: str, subject: str, body: str) -> None:
+    server = open_smtp_connection()
+    try:
+        server.send_message(build_email_message(to_email, subject, body))
     finally:
         server.quit()
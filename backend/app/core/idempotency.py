@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+import hashlib
+import json
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def _request_hash(scope: str, payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{scope}:{body}".encode()).hexdigest()
+
+
+async def run_idempotent(
+    db: AsyncSession,
+    idempotency_key: Optional[str],
+    user_id: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Run handler once per (user, Idempotency-Key) and replay its stored response afterwards.
+
+    The key row is claimed in the handler's own transaction on db, so the
+    request holds a single connection and the key commits together with the
+    booking, hold or payment the handler writes; a failed request rolls both
+    back. The response is stored right after. A duplicate sent while the
+    first is still running, or after it crashed between those two commits,
+    gets a 409 instead of running the handler again.
+    """
+    if not idempotency_key or not user_id:
+        return await handler()
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    request_hash = _request_hash(scope, payload)
+    params = {"user_id": user_id, "key": idempotency_key}
+    result = await db.execute(
+        text(
+            """
+            INSERT INTO idempotency_keys (user_id, key, scope, request_hash, expires_at)
+            VALUES (:user_id, :key, :scope, :request_hash, :expires_at)
+            ON CONFLICT (user_id, key) DO UPDATE
+            SET scope = EXCLUDED.scope,
+                request_hash = EXCLUDED.request_hash,
+                response = NULL,
+                created_at = NOW(),
+                expires_at = EXCLUDED.expires_at
+            WHERE idempotency_keys.expires_at <= NOW()
+            RETURNING key
+            """
+        ),
+        {
+            **params,
+            "scope": scope,
+            "request_hash": request_hash,
+            "expires_at": datetime.now(timezone.utc)
+            + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        },
+    )
+    claimed = result.fetchone()
+
+    if not claimed:
+        result = await db.execute(
+            text(
+                """
+                SELECT request_hash, response FROM idempotency_keys
+                WHERE user_id = :user_id AND key = :key
+                """
+            ),
+            params,
+        )
+        stored = result.fetchone()
+        await db.rollback()
+        if stored[0] != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        if stored[1] is None:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is in progress or did not complete",
+            )
+        return stored[1]
+
+    try:
+        response = jsonable_encoder(await handler())
+    except Exception:
+        await db.rollback()
+        raise
+    await db.execute(
+        text(
+            """
+            UPDATE idempotency_keys SET response = CAST(:response AS jsonb)
+            WHERE user_id = :user_id AND key = :key
+            """
+        ),
+        {**params, "response": json.dumps(response)},
+    )
+    await db.commit()
+    return response
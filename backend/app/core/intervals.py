@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+def merge_intervals(intervals: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    if not intervals:
+        return []
+    intervals = sorted(intervals, key=lambda x: x[0])
+    merged = [intervals[0]]
+    for start, end in intervals[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(
+    source: List[Tuple[datetime, datetime]],
+    remove: List[Tuple[datetime, datetime]]
+) -> List[Tuple[datetime, datetime]]:
+    if not source:
+        return []
+    if not remove:
+        return source
+    remove = merge_intervals(remove)
+    result: List[Tuple[datetime, datetime]] = []
+    for start, end in source:
+        cursor = start
+        for r_start, r_end in remove:
+            if r_end <= cursor or r_start >= end:
+                continue
+            if r_start > cursor:
+                result.append((cursor, r_start))
+            cursor = max(cursor, r_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def clip_interval(
+    start: datetime,
+    end: datetime,
+    day_start: datetime,
+    day_end: datetime
+) -> Optional[Tuple[datetime, datetime]]:
+    clipped_start = max(start, day_start)
+    clipped_end = min(end, day_end)
+    if clipped_start >= clipped_end:
+        return None
+    return (clipped_start, clipped_end)
+
+
+def intersect_intervals(
+    left: List[Tuple[datetime, datetime]],
+    right: List[Tuple[datetime, datetime]],
+) -> List[Tuple[datetime, datetime]]:
+    if not left or not right:
+        return []
+    left = merge_intervals(left)
+    right = merge_intervals(right)
+    result: List[Tuple[datetime, datetime]] = []
+    for l_start, l_end in left:
+        for r_start, r_end in right:
+            start = max(l_start, r_start)
+            end = min(l_end, r_end)
+            if start < end:
+                result.append((start, end))
+    return merge_intervals(result)
@@ -1,12 +1,28 @@
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from zoneinfo import ZoneInfo
+import json
+import logging
+import smtplib
+import threading
 import uuid
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.core.email import send_email
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.email import build_email_message, open_smtp_connection, send_email
+
+
+logger = logging.getLogger(__name__)
+
+_DELIVERY_LEASE_SECONDS = 300
+_MESSAGE_REJECTIONS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
 
 
 def _ensure_aware(value: datetime) -> datetime:
@@ -26,6 +42,16 @@ def _format_time(value: datetime, tz_name: Optional[str]) -> str:
     return value.astimezone(tz).strftime("%Y-%m-%d %H:%M %Z")
 
 
+def _format_lead(minutes: int) -> str:
+    if minutes % 1440 == 0:
+        value, unit = minutes // 1440, "day"
+    elif minutes % 60 == 0:
+        value, unit = minutes // 60, "hour"
+    else:
+        value, unit = minutes, "minute"
+    return f"{value} {unit}" if value == 1 else f"{value} {unit}s"
+
+
 def _insert_notification(
     db: Session,
     booking_id: Optional[str],
@@ -107,6 +133,158 @@ def send_email_notification(
     return "sent"
 
 
+def queue_email_notification(
+    db: Session,
+    booking_id: Optional[str],
+    notification_type: str,
+    recipient: str,
+    subject: str,
+    body: str,
+) -> str:
+    """Store an email for the notification worker; it is picked up once the caller commits."""
+    notification_id = str(uuid.uuid4())
+    db.execute(
+        text(
+            """
+            INSERT INTO notifications
+                (id, booking_id, channel, type, recipient, status, subject, body, next_attempt_at)
+            VALUES
+                (:id, :booking_id, 'email', :type, :recipient, 'pending', :subject, :body, NOW())
+            """
+        ),
+        {
+            "id": notification_id,
+            "booking_id": booking_id,
+            "type": notification_type,
+            "recipient": recipient,
+            "subject": subject,
+            "body": body,
+        },
+    )
+    return notification_id
+
+
+def queue_booking_emails(db: Session, booking_id: str, notification_type: str) -> None:
+    context = get_booking_email_context(db, booking_id)
+    if not context:
+        return
+
+    for role, key in (("customer", "customer_email"), ("staff", "staff_email")):
+        recipient = context.get(key)
+        if not recipient:
+            continue
+        email_payload = build_booking_email(context, notification_type, role)
+        queue_email_notification(
+            db=db,
+            booking_id=booking_id,
+            notification_type=notification_type,
+            recipient=recipient,
+            subject=email_payload["subject"],
+            body=email_payload["body"],
+        )
+
+
+def queue_due_reminders(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Queue one reminder per booking, recipient and lead time that has come due.
+
+    A reminder is due lead minutes before the booking starts, and is queued up
+    to REMINDER_WINDOW_MINUTES early or REMINDER_CATCHUP_MINUTES late, so the
+    gaps between runs and a scheduler outage shorter than the catch-up delay
+    skip nothing. Bookings created after their reminder came due get none, as
+    before. Candidates come from a single anti-join against reminders already
+    queued, and the insert itself is the claim: the partial unique index on
+    (booking_id, type, recipient, lead_minutes) makes overlapping runs skip
+    rows another run got to first. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    leads = settings.reminder_lead_minutes_list
+    if not leads:
+        return {"queued": 0, "skipped": 0}
+
+    rows = db.execute(
+        text(
+            """
+            SELECT b.id,
+                   l.lead_minutes AS reminder_lead_minutes,
+                   r.role,
+                   r.recipient,
+                   b.start_time_utc,
+                   b.end_time_utc,
+                   b.customer_timezone,
+                   s.name AS service_name,
+                   u.full_name AS staff_name,
+                   u.email AS staff_email,
+                   u.timezone AS staff_timezone,
+                   c.full_name AS customer_name,
+                   c.email AS customer_email
+            FROM unnest(CAST(:leads AS integer[])) AS l(lead_minutes)
+            JOIN bookings b
+              ON b.start_time_utc >= CAST(:now AS timestamptz) + make_interval(mins => l.lead_minutes - :catchup)
+             AND b.start_time_utc < CAST(:now AS timestamptz) + make_interval(mins => l.lead_minutes + :window)
+             AND b.start_time_utc > CAST(:now AS timestamptz)
+             AND b.created_at <= b.start_time_utc - make_interval(mins => l.lead_minutes)
+            LEFT JOIN services s ON b.service_id = s.id
+            LEFT JOIN users u ON b.staff_id = u.id
+            LEFT JOIN customers c ON b.customer_id = c.id
+            CROSS JOIN LATERAL (
+                VALUES ('customer', c.email), ('staff', u.email)
+            ) AS r(role, recipient)
+            WHERE b.status IN ('pending', 'confirmed')
+              AND r.recipient IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM notifications n
+                  WHERE n.booking_id = b.id
+                    AND n.type = 'reminder'
+                    AND n.recipient = r.recipient
+                    AND n.lead_minutes = l.lead_minutes
+              )
+            """
+        ),
+        {
+            "leads": leads,
+            "now": now,
+            "window": settings.REMINDER_WINDOW_MINUTES,
+            "catchup": settings.REMINDER_CATCHUP_MINUTES,
+        },
+    ).fetchall()
+    if not rows:
+        return {"queued": 0, "skipped": 0}
+
+    reminders = []
+    for row in rows:
+        context = dict(row._mapping)
+        email_payload = build_booking_email(context, "reminder", context["role"])
+        reminders.append(
+            {
+                "id": str(uuid.uuid4()),
+                "booking_id": str(context["id"]),
+                "recipient": context["recipient"],
+                "lead_minutes": context["reminder_lead_minutes"],
+                "subject": email_payload["subject"],
+                "body": email_payload["body"],
+            }
+        )
+
+    queued = db.execute(
+        text(
+            """
+            INSERT INTO notifications
+                (id, booking_id, channel, type, recipient, status, subject, body,
+                 lead_minutes, next_attempt_at)
+            SELECT r.id, r.booking_id, 'email', 'reminder', r.recipient, 'pending',
+                   r.subject, r.body, r.lead_minutes, NOW()
+            FROM jsonb_to_recordset(CAST(:reminders AS jsonb)) AS r(
+                id uuid, booking_id uuid, recipient text, subject text, body text, lead_minutes integer
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING id
+            """
+        ),
+        {"reminders": json.dumps(reminders)},
+    ).fetchall()
+    return {"queued": len(queued), "skipped": len(reminders) - len(queued)}
+
+
 def get_booking_email_context(db: Session, booking_id: str) -> Optional[Dict[str, Any]]:
     row = db.execute(
         text(
@@ -164,7 +342,7 @@ def build_booking_email(
         header = "Your booking has been cancelled."
     elif notification_type == "reminder":
         subject = "Booking reminder"
-        header = "Reminder: your booking starts in 1 hour."
+        header = f"Reminder: your booking starts in {_format_lead(context.get('reminder_lead_minutes') or 60)}."
     else:
         subject = "Booking update"
         header = "There is an update to your booking."
@@ -179,3 +357,154 @@ def build_booking_email(
     )
 
     return {"subject": subject, "body": body}
+
+
+def _claim_notifications(db: Session, batch_size: int) -> list:
+    claimed = db.execute(
+        text(
+            """
+            UPDATE notifications
+            SET attempts = attempts + 1,
+                next_attempt_at = NOW() + make_interval(secs => :lease_seconds)
+            WHERE id IN (
+                SELECT id FROM notifications
+                WHERE channel = 'email'
+                  AND status IN ('pending', 'failed')
+                  AND subject IS NOT NULL
+                  AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, recipient, subject, body, attempts
+            """
+        ),
+        {"lease_seconds": _DELIVERY_LEASE_SECONDS, "batch_size": batch_size},
+    ).fetchall()
+    db.commit()
+    return claimed
+
+
+def _retry_delay_seconds(attempts: int) -> int:
+    delay = settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.NOTIFICATION_RETRY_MAX_SECONDS)
+
+
+def dispatch_notifications(db: Session, batch_size: Optional[int] = None) -> int:
+    """Claim one batch of due emails and send them over a single SMTP connection.
+
+    Returns how many were claimed. Claims are committed leases, so a worker
+    that dies mid-batch only delays its rows until the lease runs out.
+    """
+    claimed = _claim_notifications(db, batch_size or settings.NOTIFICATION_BATCH_SIZE)
+    if not claimed:
+        return 0
+
+    sent_ids = []
+    failures = []
+    server = None
+    connect_error = None
+    try:
+        for notification_id, recipient, subject, body, attempts in claimed:
+            try:
+                if connect_error is not None:
+                    raise connect_error
+                if server is None:
+                    try:
+                        server = open_smtp_connection()
+                    except Exception as exc:
+                        # Don't wait out a connect timeout for every row in the batch.
+                        connect_error = exc
+                        raise
+                server.send_message(build_email_message(recipient, subject, body or ""))
+            except Exception as exc:
+                failures.append(
+                    {
+                        "id": notification_id,
+                        "status": "dead" if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS else "failed",
+                        "last_error": str(exc)[:1000],
+                        "retry_seconds": _retry_delay_seconds(attempts),
+                    }
+                )
+                # Rejections of a single message leave the session usable;
+                # anything else may have broken it, so reconnect for the next one.
+                if server is not None and not isinstance(exc, _MESSAGE_REJECTIONS):
+                    try:
+                        server.close()
+                    finally:
+                        server = None
+            else:
+                sent_ids.append(str(notification_id))
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+
+    if sent_ids:
+        db.execute(
+            text(
+                """
+                UPDATE notifications
+                SET status = 'sent', sent_at = NOW(), last_error = NULL
+                WHERE id = ANY(CAST(:ids AS uuid[]))
+                """
+            ),
+            {"ids": sent_ids},
+        )
+    if failures:
+        db.execute(
+            text(
+                """
+                UPDATE notifications
+                SET status = :status,
+                    last_error = :last_error,
+                    next_attempt_at = NOW() + make_interval(secs => :retry_seconds)
+                WHERE id = :id
+                """
+            ),
+            failures,
+        )
+    db.commit()
+    return len(claimed)
+
+
+def run_notification_dispatcher(stop_event: threading.Event) -> None:
+    """Send queued emails until stop_event is set, sleeping while nothing is due."""
+    while not stop_event.is_set():
+        db = SessionLocal()
+        try:
+            claimed = dispatch_notifications(db)
+        except Exception:
+            logger.exception("Notification dispatch failed")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+        if claimed < settings.NOTIFICATION_BATCH_SIZE:
+            stop_event.wait(settings.NOTIFICATION_POLL_SECONDS)
+
+
+_DISPATCHER_STOP = threading.Event()
+_DISPATCHER_THREAD: Optional[threading.Thread] = None
+
+
+def start_notification_dispatcher() -> None:
+    global _DISPATCHER_THREAD
+    if _DISPATCHER_THREAD is not None and _DISPATCHER_THREAD.is_alive():
+        return
+    _DISPATCHER_STOP.clear()
+    _DISPATCHER_THREAD = threading.Thread(
+        target=run_notification_dispatcher,
+        args=(_DISPATCHER_STOP,),
+        name="notification-dispatcher",
+        daemon=True,
+    )
+    _DISPATCHER_THREAD.start()
+
+
+def stop_notification_dispatcher() -> None:
+    _DISPATCHER_STOP.set()
+    if _DISPATCHER_THREAD is not None:
+        _DISPATCHER_THREAD.join(timeout=settings.NOTIFICATION_POLL_SECONDS + 15)
@@ -0,0 +1,78 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.core.intervals import merge_intervals
+
+
+class DayOccupancy:
+    """Sorted-endpoint index over a staff day's bookings and holds for one service.
+
+    Built once per staff day; each slot query is a couple of bisections plus an
+    O(1) range-maximum lookup instead of a scan over every booking and hold.
+    """
+
+    def __init__(self, items: List[tuple], service_id: object):
+        service_key = str(service_id)
+        same: List[Tuple[datetime, datetime]] = []
+        other: List[Tuple[datetime, datetime]] = []
+        for item_service_id, start, end in items:
+            if end <= start:
+                continue
+            if str(item_service_id) == service_key:
+                same.append((start, end))
+            else:
+                other.append((start, end))
+
+        merged_other = merge_intervals(other)
+        self._other_starts = [start for start, _ in merged_other]
+        self._other_ends = [end for _, end in merged_other]
+
+        # Concurrency is a step function: _levels[k] holds on [_times[k], _times[k + 1]).
+        deltas = {}
+        for start, end in same:
+            deltas[start] = deltas.get(start, 0) + 1
+            deltas[end] = deltas.get(end, 0) - 1
+        self._times = sorted(deltas)
+        self._levels: List[int] = []
+        level = 0
+        for point in self._times:
+            level += deltas[point]
+            self._levels.append(level)
+        self._sparse = [self._levels]
+        width = 1
+        while width * 2 <= len(self._levels):
+            previous = self._sparse[-1]
+            self._sparse.append(
+                [max(previous[i], previous[i + width]) for i in range(len(previous) - width)]
+            )
+            width *= 2
+
+    def has_other_overlap(self, start: datetime, end: datetime) -> bool:
+        index = bisect_right(self._other_ends, start)
+        return index < len(self._other_starts) and self._other_starts[index] < end
+
+    def max_same(self, start: datetime, end: datetime) -> int:
+        """Peak number of same-service bookings and holds running at once within [start, end)."""
+        low = max(bisect_right(self._times, start) - 1, 0)
+        high = bisect_left(self._times, end) - 1
+        if high < low:
+            return 0
+        level = (high - low + 1).bit_length() - 1
+        table = self._sparse[level]
+        return max(table[low], table[high - (1 << level) + 1])
+
+    def remaining(self, start: datetime, end: datetime, capacity: int) -> int:
+        if self.has_other_overlap(start, end):
+            return 0
+        return max(capacity - self.max_same(start, end), 0)
+
+    def conflict(self, start: datetime, end: datetime, capacity: int) -> Optional[str]:
+        if self.has_other_overlap(start, end):
+            return "Time slot is not available"
+        same = self.max_same(start, end)
+        if capacity <= 1 and same > 0:
+            return "Time slot is not available"
+        if capacity > 1 and same >= capacity:
+            return "Time slot is full"
+        return None
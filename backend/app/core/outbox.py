@@ -0,0 +1,156 @@
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import threading
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.notify import queue_booking_emails
+
+
+logger = logging.getLogger(__name__)
+
+_LEASE_SECONDS = 300
+_MAX_BACKOFF_SECONDS = 3600
+
+
+def enqueue_event(db: Session, event_type: str, payload: Dict[str, Any]) -> str:
+    """Add an event to the outbox; it is only dispatched once the caller commits."""
+    event_id = str(uuid.uuid4())
+    db.execute(
+        text(
+            """
+            INSERT INTO outbox_events (id, event_type, payload)
+            VALUES (:id, :event_type, CAST(:payload AS jsonb))
+            """
+        ),
+        {
+            "id": event_id,
+            "event_type": event_type,
+            "payload": json.dumps(jsonable_encoder(payload)),
+        },
+    )
+    return event_id
+
+
+def _handle_booking_notification(db: Session, payload: Dict[str, Any]) -> None:
+    queue_booking_emails(db, payload["booking_id"], payload["notification_type"])
+
+
+_HANDLERS: Dict[str, Callable[[Session, Dict[str, Any]], None]] = {
+    "booking.notification": _handle_booking_notification,
+}
+
+
+def dispatch_outbox(db: Session, batch_size: Optional[int] = None) -> int:
+    """Claim and run one batch of due outbox events; returns how many were claimed."""
+    # Claims are leases committed up front: handlers commit on their own, and a
+    # dispatcher that dies mid-batch only delays its events by the lease.
+    claimed = db.execute(
+        text(
+            """
+            UPDATE outbox_events
+            SET attempts = attempts + 1,
+                available_at = NOW() + make_interval(secs => :lease_seconds)
+            WHERE id IN (
+                SELECT id FROM outbox_events
+                WHERE status = 'pending' AND available_at <= NOW()
+                ORDER BY available_at
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, event_type, payload, attempts
+            """
+        ),
+        {
+            "lease_seconds": _LEASE_SECONDS,
+            "batch_size": batch_size or settings.OUTBOX_BATCH_SIZE,
+        },
+    ).fetchall()
+    db.commit()
+
+    for event_id, event_type, payload, attempts in claimed:
+        handler = _HANDLERS.get(event_type)
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for {event_type}")
+            handler(db, payload if isinstance(payload, dict) else json.loads(payload))
+        except Exception as exc:
+            db.rollback()
+            dead = attempts >= settings.OUTBOX_MAX_ATTEMPTS
+            db.execute(
+                text(
+                    """
+                    UPDATE outbox_events
+                    SET status = :status,
+                        last_error = :last_error,
+                        available_at = NOW() + make_interval(secs => :backoff_seconds)
+                    WHERE id = :id
+                    """
+                ),
+                {
+                    "id": event_id,
+                    "status": "dead" if dead else "pending",
+                    "last_error": str(exc)[:1000],
+                    "backoff_seconds": min(2 ** attempts, _MAX_BACKOFF_SECONDS),
+                },
+            )
+        else:
+            db.execute(
+                text(
+                    """
+                    UPDATE outbox_events
+                    SET status = 'done', processed_at = NOW(), last_error = NULL
+                    WHERE id = :id
+                    """
+                ),
+                {"id": event_id},
+            )
+        db.commit()
+
+    return len(claimed)
+
+
+def run_outbox_dispatcher(stop_event: threading.Event) -> None:
+    """Drain the outbox until stop_event is set, sleeping while it is empty."""
+    while not stop_event.is_set():
+        db = SessionLocal()
+        try:
+            claimed = dispatch_outbox(db)
+        except Exception:
+            logger.exception("Outbox dispatch failed")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            stop_event.wait(settings.OUTBOX_POLL_SECONDS)
+
+
+_DISPATCHER_STOP = threading.Event()
+_DISPATCHER_THREAD: Optional[threading.Thread] = None
+
+
+def start_outbox_dispatcher() -> None:
+    global _DISPATCHER_THREAD
+    if _DISPATCHER_THREAD is not None and _DISPATCHER_THREAD.is_alive():
+        return
+    _DISPATCHER_STOP.clear()
+    _DISPATCHER_THREAD = threading.Thread(
+        target=run_outbox_dispatcher,
+        args=(_DISPATCHER_STOP,),
+        name="outbox-dispatcher",
+        daemon=True,
+    )
+    _DISPATCHER_THREAD.start()
+
+
+def stop_outbox_dispatcher() -> None:
+    _DISPATCHER_STOP.set()
+    if _DISPATCHER_THREAD is not None:
+        _DISPATCHER_THREAD.join(timeout=settings.OUTBOX_POLL_SECONDS + 5)
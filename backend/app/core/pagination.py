@@ -0,0 +1,79 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import uuid
+
+from fastapi import HTTPException, Response
+
+from app.core.config import settings
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, settings.PAGINATION_MAX_PAGE_SIZE))
+
+
+def reject_offset(skip: Optional[int]) -> None:
+    """Refuse the old offset paging instead of silently returning the first page again."""
+    if skip is not None:
+        raise HTTPException(status_code=400, detail="skip is no longer supported; pass the X-Next-Cursor header back as cursor")
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: Any) -> str:
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, str(row_id)])
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        sort_value, row_id = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (
+            datetime.fromisoformat(sort_value) if sort_value is not None else None,
+            str(uuid.UUID(row_id)),
+        )
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    sort_column: str,
+    id_column: str,
+    cursor: Optional[str],
+    limit: int,
+    params: Dict[str, Any],
+) -> Tuple[str, str]:
+    """Return (condition, ORDER BY/LIMIT clause) for the page after cursor, newest first.
+
+    The order is sort_column DESC, id_column DESC, so it is stable across
+    equal sort values; NULLs sort first, as Postgres does for DESC. One row
+    more than the page is fetched to tell whether another page follows.
+    """
+    params["page_limit"] = page_size(limit) + 1
+    order = f" ORDER BY {sort_column} DESC, {id_column} DESC LIMIT :page_limit"
+    if not cursor:
+        return "TRUE", order
+    sort_value, row_id = decode_cursor(cursor)
+    params["cursor_id"] = row_id
+    if sort_value is None:
+        return f"(({sort_column} IS NULL AND {id_column} < :cursor_id) OR {sort_column} IS NOT NULL)", order
+    params["cursor_sort"] = sort_value
+    return f"({sort_column}, {id_column}) < (:cursor_sort, :cursor_id)", order
+
+
+def paginate(
+    response: Response,
+    rows: Sequence[Any],
+    limit: int,
+    sort_field: str,
+    id_field: str = "id",
+) -> List[Any]:
+    """Trim the rows of a keyset_page query to one page and put the next page's cursor in a header."""
+    limit = page_size(limit)
+    if len(rows) <= limit:
+        return list(rows)
+    last = rows[limit - 1]._mapping
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[sort_field], last[id_field])
+    return list(rows[:limit])
@@ -0,0 +1,166 @@
+from datetime import time
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.intervals import merge_intervals, subtract_intervals
+from app.core.slot_cache import staff_schedule_generations
+
+
+_TEMPLATE_CACHE_MAX_ENTRIES = 5000
+_TEMPLATE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _schedule_priority(schedule: dict) -> tuple:
+    # Mirrors ORDER BY (location_id IS NULL) ASC, is_default DESC,
+    # effective_from DESC NULLS LAST; Postgres sorts NULL first under DESC.
+    is_default = schedule.get("is_default")
+    effective_from = schedule.get("effective_from")
+    return (
+        schedule.get("location_id") is None,
+        0 if is_default is None else (1 if is_default else 2),
+        effective_from is None,
+        -effective_from.toordinal() if effective_from else 0,
+    )
+
+
+def compile_schedule_template(
+    schedule: dict,
+    work_blocks: Dict[int, List[Tuple[time, time]]],
+    break_blocks: Dict[int, List[Tuple[time, time]]],
+) -> dict:
+    """Return the schedule row with its blocks as per-weekday second offsets from local midnight.
+
+    A weekday is present in ``days`` whenever it has work blocks, even if breaks
+    cover all of them; ``open`` already has the breaks subtracted.
+    """
+    days: Dict[int, Dict[str, List[Tuple[int, int]]]] = {}
+    for weekday, blocks in work_blocks.items():
+        work = [
+            (start, end)
+            for start, end in ((_seconds(block[0]), _seconds(block[1])) for block in blocks)
+            if end > start
+        ]
+        breaks = [
+            (start, end)
+            for start, end in (
+                (_seconds(block[0]), _seconds(block[1])) for block in break_blocks.get(weekday, [])
+            )
+            if end > start
+        ]
+        days[weekday] = {
+            "open": subtract_intervals(merge_intervals(work), breaks),
+            "breaks": breaks,
+        }
+    return {**schedule, "tz": ZoneInfo(schedule["timezone"]), "days": days}
+
+
+def _build_templates(db: Session, staff_ids: List[str]) -> Dict[str, List[dict]]:
+    schedules = [
+        dict(row._mapping)
+        for row in db.execute(
+            text(
+                """
+                SELECT *
+                FROM staff_weekly_schedules
+                WHERE staff_id = ANY(CAST(:staff_ids AS uuid[]))
+                """
+            ),
+            {"staff_ids": staff_ids},
+        ).fetchall()
+    ]
+    if not schedules:
+        return {}
+
+    blocks: Dict[str, Dict[str, Dict[int, List[Tuple[time, time]]]]] = {
+        "work": {},
+        "break": {},
+    }
+    block_rows = db.execute(
+        text(
+            """
+            SELECT 'work' AS kind, schedule_id, weekday, start_time_local, end_time_local
+            FROM staff_work_blocks
+            WHERE schedule_id = ANY(CAST(:schedule_ids AS uuid[]))
+            UNION ALL
+            SELECT 'break' AS kind, schedule_id, weekday, start_time_local, end_time_local
+            FROM staff_break_blocks
+            WHERE schedule_id = ANY(CAST(:schedule_ids AS uuid[]))
+            """
+        ),
+        {"schedule_ids": [schedule["id"] for schedule in schedules]},
+    ).fetchall()
+    for row in block_rows:
+        blocks[row[0]].setdefault(str(row[1]), {}).setdefault(int(row[2]), []).append(
+            (row[3], row[4])
+        )
+
+    templates: Dict[str, List[dict]] = {}
+    for schedule in schedules:
+        schedule_key = str(schedule["id"])
+        templates.setdefault(str(schedule["staff_id"]), []).append(
+            compile_schedule_template(
+                schedule,
+                blocks["work"].get(schedule_key, {}),
+                blocks["break"].get(schedule_key, {}),
+            )
+        )
+    for candidates in templates.values():
+        candidates.sort(key=_schedule_priority)
+    return templates
+
+
+_TEMPLATES = LRUCache(
+    max_entries=_TEMPLATE_CACHE_MAX_ENTRIES,
+    max_bytes=_TEMPLATE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SLOT_CACHE_TTL_SECONDS,
+)
+
+
+def load_staff_schedule_templates(
+    db: Session,
+    staff_ids: List[object],
+    location_id: Optional[str] = None,
+) -> Dict[str, List[dict]]:
+    """Return compiled schedule templates per staff member, in selection priority order."""
+    staff_keys = list(dict.fromkeys(str(staff_id) for staff_id in staff_ids))
+    generations = staff_schedule_generations(staff_keys)
+    cache_keys = {
+        staff_key: f"{staff_key}@{generation}"
+        for staff_key, generation in zip(staff_keys, generations)
+    }
+
+    templates: Dict[str, List[dict]] = {}
+    missing: List[str] = []
+    for staff_key in staff_keys:
+        cached = _TEMPLATES.get(cache_keys[staff_key])
+        if cached is None:
+            missing.append(staff_key)
+        else:
+            templates[staff_key] = cached
+
+    if missing:
+        compiled = _build_templates(db, missing)
+        for staff_key in missing:
+            templates[staff_key] = compiled.get(staff_key, [])
+            _TEMPLATES.set(cache_keys[staff_key], templates[staff_key])
+
+    if location_id:
+        return {
+            staff_key: [
+                template
+                for template in candidates
+                if template.get("location_id") is None
+                or str(template["location_id"]) == str(location_id)
+            ]
+            for staff_key, candidates in templates.items()
+        }
+    return templates
@@ -0,0 +1,181 @@
+from typing import Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.notify import queue_due_reminders
+
+
+logger = logging.getLogger(__name__)
+
+_LEADER_LOCK_KEY = "scheduler:leader"
+
+_JOBS: List[Dict[str, object]] = []
+
+
+def register_job(name: str, interval_seconds: float, func: Callable[[Session], None]) -> None:
+    """Run func(db) every interval_seconds on whichever process holds scheduler leadership."""
+    _JOBS.append({"name": name, "interval_seconds": interval_seconds, "func": func})
+
+
+def purge_in_batches(db: Session, table: str, condition: str, batch_size: Optional[int] = None) -> int:
+    """Delete rows matching condition a batch per transaction, so no purge holds long locks."""
+    batch_size = batch_size or settings.SCHEDULER_PURGE_BATCH_SIZE
+    total = 0
+    while True:
+        deleted = db.execute(
+            text(
+                f"""
+                DELETE FROM {table}
+                WHERE ctid = ANY(ARRAY(
+                    SELECT ctid FROM {table} WHERE {condition} LIMIT :batch_size
+                ))
+                """
+            ),
+            {"batch_size": batch_size},
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+_EXPIRED_ROWS = (
+    ("booking_holds", "expires_at_utc <= NOW()"),
+    ("sessions", "expires_at <= NOW()"),
+    ("password_reset_tokens", "expires_at <= NOW()"),
+    ("email_verification_tokens", "expires_at <= NOW()"),
+    ("magic_link_tokens", "expires_at <= NOW()"),
+    ("idempotency_keys", "expires_at <= NOW()"),
+    ("slot_cache_entries", "expires_at <= NOW()"),
+)
+
+
+def _purge_expired_rows(db: Session) -> None:
+    for table, condition in _EXPIRED_ROWS:
+        purge_in_batches(db, table, condition)
+    if settings.FEATURE_SET == "full":
+        purge_in_batches(
+            db,
+            "outbox_events",
+            f"status = 'done' AND processed_at < NOW() - INTERVAL '{int(settings.OUTBOX_RETENTION_DAYS)} days'",
+        )
+
+
+def _queue_reminders(db: Session) -> None:
+    queue_due_reminders(db)
+    db.commit()
+
+
+def _acquire_leadership(connection: Optional[Connection]) -> Optional[Connection]:
+    """Return the connection holding the leader lock, or None while another process leads.
+
+    The lock is session-level, so it lives exactly as long as this connection:
+    if the leader dies or loses its connection, a follower takes over.
+    """
+    try:
+        if connection is None:
+            connection = engine.connect()
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(hashtextextended(:key, 0))"),
+                {"key": _LEADER_LOCK_KEY},
+            ).scalar()
+            connection.commit()
+            if not acquired:
+                connection.close()
+                return None
+        else:
+            connection.execute(text("SELECT 1"))
+            connection.commit()
+        return connection
+    except Exception:
+        logger.exception("Scheduler leadership check failed")
+        if connection is not None:
+            connection.invalidate()
+            connection.close()
+        return None
+
+
+def _release_leadership(connection: Optional[Connection]) -> None:
+    if connection is None:
+        return
+    try:
+        connection.execute(
+            text("SELECT pg_advisory_unlock(hashtextextended(:key, 0))"),
+            {"key": _LEADER_LOCK_KEY},
+        )
+        connection.commit()
+    except Exception:
+        # Closing the connection drops the lock on the server anyway.
+        connection.invalidate()
+    finally:
+        connection.close()
+
+
+def _run_job(job: Dict[str, object]) -> None:
+    db = SessionLocal()
+    try:
+        job["func"](db)
+    except Exception:
+        logger.exception("Scheduled job %s failed", job["name"])
+        db.rollback()
+    finally:
+        db.close()
+
+
+def run_scheduler(stop_event: threading.Event) -> None:
+    """Run registered jobs on their intervals while this process is the leader."""
+    leader: Optional[Connection] = None
+    next_runs: Dict[str, float] = {}
+    try:
+        while not stop_event.is_set():
+            was_leader = leader is not None
+            leader = _acquire_leadership(leader)
+            if leader is None or not was_leader:
+                # A new leader cannot know when the previous one last ran a job.
+                next_runs.clear()
+            if leader is not None:
+                for job in _JOBS:
+                    if stop_event.is_set():
+                        break
+                    if next_runs.get(job["name"], 0.0) <= time.monotonic():
+                        _run_job(job)
+                        next_runs[job["name"]] = time.monotonic() + job["interval_seconds"]
+            stop_event.wait(settings.SCHEDULER_TICK_SECONDS)
+    finally:
+        _release_leadership(leader)
+
+
+register_job("purge_expired_rows", settings.SCHEDULER_PURGE_INTERVAL_SECONDS, _purge_expired_rows)
+if settings.FEATURE_SET == "full" and settings.SCHEDULER_RUN_REMINDERS:
+    register_job("queue_reminders", settings.REMINDER_WINDOW_MINUTES * 60, _queue_reminders)
+
+
+_SCHEDULER_STOP = threading.Event()
+_SCHEDULER_THREAD: Optional[threading.Thread] = None
+
+
+def start_scheduler() -> None:
+    global _SCHEDULER_THREAD
+    if _SCHEDULER_THREAD is not None and _SCHEDULER_THREAD.is_alive():
+        return
+    _SCHEDULER_STOP.clear()
+    _SCHEDULER_THREAD = threading.Thread(
+        target=run_scheduler,
+        args=(_SCHEDULER_STOP,),
+        name="scheduler",
+        daemon=True,
+    )
+    _SCHEDULER_THREAD.start()
+
+
+def stop_scheduler() -> None:
+    _SCHEDULER_STOP.set()
+    if _SCHEDULER_THREAD is not None:
+        _SCHEDULER_THREAD.join(timeout=settings.SCHEDULER_TICK_SECONDS + 30)
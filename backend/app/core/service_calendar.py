@@ -0,0 +1,224 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import calendar
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.intervals import merge_intervals
+from app.core.slot_cache import service_calendar_generation
+
+
+_CALENDAR_CACHE_MAX_ENTRIES = 1000
+_CALENDAR_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_MAX_MEMOIZED_DAYS = 1024
+
+Window = Optional[Tuple[time, time]]
+
+
+def _is_nth_weekday_in_month(target_date: date, weekday: int, nth: int) -> bool:
+    if target_date.weekday() != weekday:
+        return False
+    first_day = target_date.replace(day=1)
+    offset = (weekday - first_day.weekday()) % 7
+    first_occurrence = 1 + offset
+    occurrence = ((target_date.day - first_occurrence) // 7) + 1
+    if nth == -1:
+        last_day = calendar.monthrange(target_date.year, target_date.month)[1]
+        last_date = target_date.replace(day=last_day)
+        last_offset = (last_date.weekday() - weekday) % 7
+        last_occurrence_day = last_day - last_offset
+        return target_date.day == last_occurrence_day
+    return occurrence == nth
+
+
+class ServiceOperatingCalendar:
+    """A service's operating schedules, rules and exceptions compiled for in-memory lookups."""
+
+    def __init__(
+        self,
+        schedules: List[dict],
+        rules: Dict[str, List[tuple]],
+        exceptions: Dict[date, List[tuple]],
+    ):
+        self._schedules = [
+            self._compile_schedule(schedule, rules.get(str(schedule["id"]), []))
+            for schedule in schedules
+        ]
+        self._exceptions = exceptions
+        self._days: Dict[date, List[Tuple[datetime, datetime]]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _compile_schedule(schedule: dict, rules: List[tuple]) -> dict:
+        open_time = schedule.get("open_time")
+        close_time = schedule.get("close_time")
+        default_window: Window = (open_time, close_time) if open_time and close_time else None
+        rule_type = schedule.get("rule_type")
+
+        weekly: Dict[int, List[Window]] = {}
+        month_days: Dict[int, List[Window]] = {}
+        nth_weekdays: List[Tuple[int, int, Window]] = []
+        for rule_type_value, weekday, month_day, nth, start_time, end_time in rules:
+            window = (start_time, end_time) if start_time and end_time else default_window
+            if rule_type == "weekly" and rule_type_value == "weekly":
+                weekly.setdefault(weekday, []).append(window)
+            elif rule_type == "monthly" and rule_type_value == "monthly_day":
+                month_days.setdefault(month_day, []).append(window)
+            elif rule_type == "monthly" and rule_type_value == "monthly_nth_weekday":
+                if weekday is not None and nth is not None:
+                    nth_weekdays.append((weekday, nth, window))
+
+        return {
+            "tz": ZoneInfo(schedule.get("timezone") or "UTC"),
+            "effective_from": schedule.get("effective_from"),
+            "effective_to": schedule.get("effective_to"),
+            "is_daily": rule_type == "daily",
+            "default_window": default_window,
+            "weekly": weekly,
+            "month_days": month_days,
+            "nth_weekdays": nth_weekdays,
+        }
+
+    def _schedule_for(self, target_date: date) -> Optional[dict]:
+        for schedule in self._schedules:
+            effective_from = schedule["effective_from"]
+            effective_to = schedule["effective_to"]
+            if effective_from is not None and effective_from > target_date:
+                continue
+            if effective_to is not None and effective_to < target_date:
+                continue
+            return schedule
+        return None
+
+    def intervals_for(self, target_date: date) -> List[Tuple[datetime, datetime]]:
+        """Return the UTC intervals the service is open on the given date."""
+        intervals = self._days.get(target_date)
+        if intervals is None:
+            intervals = self._compute(target_date)
+            with self._lock:
+                if len(self._days) >= _MAX_MEMOIZED_DAYS:
+                    self._days.clear()
+                self._days[target_date] = intervals
+        return intervals
+
+    def _compute(self, target_date: date) -> List[Tuple[datetime, datetime]]:
+        utc = dt_timezone.utc
+        schedule = self._schedule_for(target_date)
+        service_tz = schedule["tz"] if schedule else ZoneInfo("UTC")
+        service_day_start = datetime.combine(target_date, time(0, 0), tzinfo=service_tz)
+        service_day_end = service_day_start + timedelta(days=1)
+
+        if not schedule:
+            return [(service_day_start.astimezone(utc), service_day_end.astimezone(utc))]
+
+        exceptions = self._exceptions.get(target_date, [])
+        override_exceptions = [ex for ex in exceptions if ex[0] and ex[1] and ex[2]]
+        closed_exceptions = [ex for ex in exceptions if not ex[0]]
+        extra_open_exceptions = [ex for ex in exceptions if ex[0] and not (ex[1] and ex[2])]
+
+        windows: List[Window] = []
+        if override_exceptions:
+            windows = [(ex[1], ex[2]) for ex in override_exceptions]
+        elif closed_exceptions:
+            return []
+        elif extra_open_exceptions:
+            windows = [None]
+        elif schedule["is_daily"]:
+            windows = [schedule["default_window"]]
+        else:
+            service_weekday = (target_date.weekday() + 1) % 7
+            windows.extend(schedule["weekly"].get(service_weekday, []))
+            windows.extend(schedule["month_days"].get(target_date.day, []))
+            for weekday, nth, window in schedule["nth_weekdays"]:
+                if _is_nth_weekday_in_month(target_date, weekday, nth):
+                    windows.append(window)
+            if not windows:
+                return []
+
+        intervals: List[Tuple[datetime, datetime]] = []
+        for window in windows:
+            if window is None:
+                intervals.append((service_day_start.astimezone(utc), service_day_end.astimezone(utc)))
+                continue
+            start_dt = datetime.combine(target_date, window[0], tzinfo=service_tz)
+            end_dt = datetime.combine(target_date, window[1], tzinfo=service_tz)
+            intervals.append((start_dt.astimezone(utc), end_dt.astimezone(utc)))
+        return merge_intervals(intervals)
+
+
+def _build_service_calendar(db: Session, service_id: str) -> ServiceOperatingCalendar:
+    schedules = [
+        dict(row._mapping)
+        for row in db.execute(
+            text(
+                """
+                SELECT * FROM service_operating_schedules
+                WHERE service_id = :service_id
+                  AND is_active = TRUE
+                ORDER BY created_at DESC
+                """
+            ),
+            {"service_id": service_id},
+        ).fetchall()
+    ]
+
+    exceptions: Dict[date, List[tuple]] = {}
+    rules: Dict[str, List[tuple]] = {}
+    if not schedules:
+        return ServiceOperatingCalendar(schedules, rules, exceptions)
+
+    exception_rows = db.execute(
+        text(
+            """
+            SELECT date, is_open, start_time, end_time
+            FROM service_operating_exceptions
+            WHERE service_id = :service_id
+            """
+        ),
+        {"service_id": service_id},
+    ).fetchall()
+    for row in exception_rows:
+        exceptions.setdefault(row[0], []).append(tuple(row[1:]))
+
+    rule_schedule_ids = [
+        schedule["id"] for schedule in schedules if schedule.get("rule_type") != "daily"
+    ]
+    if rule_schedule_ids:
+        rule_rows = db.execute(
+            text(
+                """
+                SELECT schedule_id, rule_type, weekday, month_day, nth, start_time, end_time
+                FROM service_operating_rules
+                WHERE schedule_id = ANY(CAST(:schedule_ids AS uuid[]))
+                """
+            ),
+            {"schedule_ids": rule_schedule_ids},
+        ).fetchall()
+        for row in rule_rows:
+            rules.setdefault(str(row[0]), []).append(tuple(row[1:]))
+
+    return ServiceOperatingCalendar(schedules, rules, exceptions)
+
+
+_CALENDARS = LRUCache(
+    max_entries=_CALENDAR_CACHE_MAX_ENTRIES,
+    max_bytes=_CALENDAR_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SLOT_CACHE_TTL_SECONDS,
+)
+
+
+def load_service_calendar(db: Session, service_id: object) -> ServiceOperatingCalendar:
+    """Return the compiled calendar for the service's current operating schedule version."""
+    # The generation is read before the rows, so a write that lands while the
+    # calendar is being built leaves it under a version nobody asks for again.
+    cache_key = f"{service_id}@{service_calendar_generation(service_id)}"
+    service_calendar = _CALENDARS.get(cache_key)
+    if service_calendar is None:
+        service_calendar = _build_service_calendar(db, str(service_id))
+        _CALENDARS.set(cache_key, service_calendar)
+    return service_calendar
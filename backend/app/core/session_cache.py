@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Optional
+import hashlib
+
+from app.core.cache import CacheBackend, LRUCache, MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+
+
+def _build_generations() -> CacheBackend:
+    """Per-user generation counters; a bump makes every cached session of that user stale."""
+    mode = (settings.SESSION_CACHE_INVALIDATION or "local").strip().lower()
+    redis_url = settings.SESSION_CACHE_REDIS_URL or settings.SLOT_CACHE_REDIS_URL
+    if mode == "redis":
+        if not redis_url:
+            raise RuntimeError("SESSION_CACHE_INVALIDATION=redis requires SESSION_CACHE_REDIS_URL")
+        try:
+            return RedisCacheBackend(
+                ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+                url=redis_url,
+                prefix="booking:session:",
+            )
+        except Exception as exc:
+            raise RuntimeError(f"Could not create the redis session invalidation backend: {exc}") from exc
+    if mode != "local":
+        raise RuntimeError(f"Unknown SESSION_CACHE_INVALIDATION {mode!r}")
+    return MemoryCacheBackend(max_entries=1, max_bytes=1, ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS)
+
+
+_SESSIONS = LRUCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+)
+_GENERATIONS: CacheBackend = _build_generations()
+_COUNTS_LOCK = Lock()
+_COUNTS = {"invalidations": 0, "stale": 0}
+
+
+def set_session_generation_backend(backend: CacheBackend) -> None:
+    global _GENERATIONS
+    _GENERATIONS = backend
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _count(name: str) -> None:
+    with _COUNTS_LOCK:
+        _COUNTS[name] += 1
+
+
+def get_cached_session_user(token: str) -> Optional[Dict[str, Any]]:
+    if not settings.SESSION_CACHE_ENABLED or _GENERATIONS.bypassing():
+        return None
+    key = _token_key(token)
+    entry = _SESSIONS.get(key)
+    if entry is None:
+        return None
+    generation, user = entry
+    if _GENERATIONS.counters([f"user:{user['id']}"])[0] != generation:
+        _SESSIONS.delete(key)
+        _count("stale")
+        return None
+    return dict(user)
+
+
+def cache_session_user(token: str, user: Dict[str, Any], session_expires_at: datetime) -> None:
+    """Cache a session lookup for at most SESSION_CACHE_TTL_SECONDS and never past the session's expiry.
+
+    A lookup that races an invalidation can still store the old row, so the
+    TTL is also the upper bound on how long a change can go unnoticed.
+    """
+    if not settings.SESSION_CACHE_ENABLED or _GENERATIONS.bypassing():
+        return
+    if session_expires_at.tzinfo is None:
+        session_expires_at = session_expires_at.replace(tzinfo=timezone.utc)
+    ttl_seconds = min(
+        settings.SESSION_CACHE_TTL_SECONDS,
+        (session_expires_at - datetime.now(timezone.utc)).total_seconds(),
+    )
+    if ttl_seconds <= 0:
+        return
+    generation = _GENERATIONS.counters([f"user:{user['id']}"])[0]
+    _SESSIONS.set(_token_key(token), (generation, dict(user)), ttl_seconds=ttl_seconds)
+
+
+def invalidate_user_sessions(user_id: Optional[object]) -> None:
+    """Drop every cached session of a user, in all workers when invalidation is shared."""
+    if not user_id:
+        return
+    _GENERATIONS.incr(f"user:{user_id}")
+    _count("invalidations")
+
+
+def invalidate_session_token(token: Optional[str]) -> None:
+    if token:
+        _SESSIONS.delete(_token_key(token))
+
+
+def session_cache_stats() -> Dict[str, Any]:
+    with _COUNTS_LOCK:
+        counts = dict(_COUNTS)
+    return {
+        "enabled": settings.SESSION_CACHE_ENABLED,
+        "invalidation": "local" if _GENERATIONS.name == "memory" else _GENERATIONS.name,
+        **_SESSIONS.stats(),
+        **counts,
+    }
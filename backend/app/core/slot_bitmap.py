@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+
+_MINUTE = timedelta(minutes=1)
+
+
+def _floor_minutes(value: timedelta) -> int:
+    return value // _MINUTE
+
+
+def _ceil_minutes(value: timedelta) -> int:
+    return -((-value) // _MINUTE)
+
+
+def _overlap_counts(np, items: List[tuple], day_start_utc: datetime, size: int, starts, total_minutes: int):
+    # Items occupy whole-minute cells [floor(start), ceil(end)), which keeps the
+    # strict overlap test exact for slots that start on a minute boundary.
+    if not items:
+        return np.zeros(len(starts), dtype=np.int64)
+    first_cells = np.clip(
+        [_floor_minutes(item[1] - day_start_utc) for item in items], 0, size - 1
+    )
+    last_cells = np.clip(
+        [_ceil_minutes(item[2] - day_start_utc) for item in items], 0, size - 1
+    )
+    started = np.cumsum(np.bincount(first_cells, minlength=size))
+    ended = np.cumsum(np.bincount(last_cells, minlength=size))
+    return started[starts + total_minutes - 1] - ended[starts]
+
+
+def _same_service_peaks(np, items: List[tuple], day_start_utc: datetime, size: int, starts, total_minutes: int):
+    # Per-minute concurrency, then the peak over each slot's window; exact
+    # only when every item sits on minute boundaries, which the caller checks.
+    if not items:
+        return np.zeros(len(starts), dtype=np.int64)
+    deltas = np.zeros(size + 1, dtype=np.int64)
+    np.add.at(
+        deltas,
+        np.clip([_floor_minutes(item[1] - day_start_utc) for item in items], 0, size),
+        1,
+    )
+    np.add.at(
+        deltas,
+        np.clip([_floor_minutes(item[2] - day_start_utc) for item in items], 0, size),
+        -1,
+    )
+    concurrency = np.cumsum(deltas)[:size]
+    windows = np.lib.stride_tricks.sliding_window_view(concurrency, total_minutes)
+    return windows[starts].max(axis=1)
+
+
+def bitmap_slot_starts(
+    intervals: List[Tuple[datetime, datetime]],
+    day_start: datetime,
+    day_end: datetime,
+    day_start_utc: datetime,
+    bookings: List[tuple],
+    holds: List[tuple],
+    service_id: str,
+    total_minutes: int,
+    granularity_minutes: int,
+    min_notice_cutoff: datetime,
+    max_booking_cutoff: datetime,
+    capacity: int,
+    slot_limit: Optional[int],
+) -> Optional[List[Tuple[int, int]]]:
+    """Return (minutes after local midnight, remaining seats) per slot, or None to fall back."""
+    try:
+        import numpy as np  # type: ignore
+    except Exception:
+        return None
+
+    # Wall-clock minutes only map linearly onto UTC when the offset is fixed
+    # for the whole day; DST transition days use the datetime cursor instead.
+    if total_minutes <= 0 or day_start.utcoffset() != day_end.utcoffset():
+        return None
+
+    day_start_wall = day_start.replace(tzinfo=None)
+    day_minutes = _floor_minutes(day_end.replace(tzinfo=None) - day_start_wall)
+    if total_minutes > day_minutes:
+        return []
+
+    available = np.zeros(day_minutes, dtype=bool)
+    for start, end in intervals:
+        first = max(_ceil_minutes(start.replace(tzinfo=None) - day_start_wall), 0)
+        last = min(_floor_minutes(end.replace(tzinfo=None) - day_start_wall), day_minutes)
+        if last > first:
+            available[first:last] = True
+    available_run = np.concatenate(([0], np.cumsum(available)))
+
+    starts = np.arange(0, day_minutes - total_minutes + 1, granularity_minutes)
+    valid = available_run[starts + total_minutes] - available_run[starts] == total_minutes
+
+    notice_minute = _ceil_minutes(min_notice_cutoff.replace(tzinfo=None) - day_start_wall)
+    max_minute = _floor_minutes(max_booking_cutoff.replace(tzinfo=None) - day_start_wall)
+    valid &= (starts >= notice_minute) & (starts <= max_minute)
+
+    service_key = str(service_id)
+    occupied = [item for item in bookings + holds if item[2] > item[1]]
+    other_service = [item for item in occupied if str(item[0]) != service_key]
+    same_service = [item for item in occupied if str(item[0]) == service_key]
+    if any(
+        (item[1] - day_start_utc) % _MINUTE or (item[2] - day_start_utc) % _MINUTE
+        for item in same_service
+    ):
+        return None
+
+    size = day_minutes + 2
+    valid &= _overlap_counts(np, other_service, day_start_utc, size, starts, total_minutes) == 0
+    remaining = capacity - _same_service_peaks(
+        np, same_service, day_start_utc, size, starts, total_minutes
+    )
+    valid &= remaining > 0
+
+    slot_starts = starts[valid]
+    slot_remaining = remaining[valid]
+    if slot_limit is not None:
+        slot_starts = slot_starts[:slot_limit]
+        slot_remaining = slot_remaining[:slot_limit]
+    return [
+        (int(minute), int(seats)) for minute, seats in zip(slot_starts, slot_remaining)
+    ]
@@ -0,0 +1,215 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    PostgresCacheBackend,
+    RedisCacheBackend,
+)
+from app.core.config import settings
+from app.core.database import cache_async_engine, engine
+
+
+def _build_backend() -> CacheBackend:
+    """Build the configured backend; a shared backend that cannot be built fails startup.
+
+    Falling back to memory would quietly bring back per-worker caches that
+    miss each other's invalidations.
+    """
+    backend = (settings.SLOT_CACHE_BACKEND or "memory").strip().lower()
+    if backend == "redis":
+        if not settings.SLOT_CACHE_REDIS_URL:
+            raise RuntimeError("SLOT_CACHE_BACKEND=redis requires SLOT_CACHE_REDIS_URL")
+        try:
+            return RedisCacheBackend(
+                ttl_seconds=settings.SLOT_CACHE_TTL_SECONDS,
+                url=settings.SLOT_CACHE_REDIS_URL,
+            )
+        except Exception as exc:
+            raise RuntimeError(f"Could not create the redis slot cache: {exc}") from exc
+    if backend == "postgres":
+        return PostgresCacheBackend(
+            engine,
+            ttl_seconds=settings.SLOT_CACHE_TTL_SECONDS,
+            async_engine=cache_async_engine,
+        )
+    if backend != "memory":
+        raise RuntimeError(f"Unknown SLOT_CACHE_BACKEND {backend!r}")
+    return MemoryCacheBackend(
+        max_entries=settings.SLOT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.SLOT_CACHE_MAX_BYTES,
+        ttl_seconds=settings.SLOT_CACHE_TTL_SECONDS,
+    )
+
+
+_SLOT_CACHE: CacheBackend = _build_backend()
+
+
+def set_slot_cache_backend(backend: CacheBackend) -> None:
+    global _SLOT_CACHE
+    _SLOT_CACHE = backend
+
+
+def bump_service_generation(service_id: Optional[object]) -> None:
+    if not service_id:
+        return
+    _SLOT_CACHE.incr(f"service:{service_id}")
+
+
+def bump_service_calendar_generation(service_id: Optional[object]) -> None:
+    if not service_id:
+        return
+    _SLOT_CACHE.incr(f"calendar:{service_id}")
+    bump_service_generation(service_id)
+
+
+def service_calendar_generation(service_id: object) -> int:
+    return _SLOT_CACHE.counters([f"calendar:{service_id}"])[0]
+
+
+def bump_staff_schedule_generation(db: Session, staff_id: Optional[object]) -> None:
+    if not staff_id:
+        return
+    _SLOT_CACHE.incr(f"schedule:{staff_id}")
+    bump_staff_generation(db, staff_id)
+
+
+def staff_schedule_generations(staff_ids: List[str]) -> List[int]:
+    return _SLOT_CACHE.counters([f"schedule:{staff_id}" for staff_id in staff_ids])
+
+
+def bump_staff_generation(db: Session, staff_id: Optional[object]) -> None:
+    if not staff_id:
+        return
+    _SLOT_CACHE.incr(f"staff:{staff_id}")
+
+    # "Any staff" keys are versioned by service only, so every service the
+    # staff member can be booked for has to move as well.
+    rows = db.execute(
+        text("SELECT service_id FROM staff_services WHERE staff_id = :staff_id"),
+        {"staff_id": str(staff_id)},
+    ).fetchall()
+    for row in rows:
+        bump_service_generation(row[0])
+
+
+def slot_cache_keys(
+    service_id: str,
+    target_dates: List[date],
+    timezone_name: str,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+    granularity_minutes: int,
+    window_start: Optional[time] = None,
+    window_end: Optional[time] = None,
+) -> Dict[date, str]:
+    # Generations are read before the slots are computed, so a write that
+    # lands mid-computation leaves the result under a key nobody reads again.
+    names = [f"service:{service_id}"]
+    if staff_id:
+        names.append(f"staff:{staff_id}")
+    generations = _SLOT_CACHE.counters(names)
+    staff_part = f"{staff_id}@{generations[1]}" if staff_id else "any"
+    return {
+        target_date: (
+            f"slots-v2:{service_id}@{generations[0]}:{target_date}:"
+            f"{timezone_name}:{staff_part}:{location_id or 'any'}:{granularity_minutes}:"
+            f"{window_start}:{window_end}"
+        )
+        for target_date in target_dates
+    }
+
+
+def slot_cache_key(
+    service_id: str,
+    target_date: date,
+    timezone_name: str,
+    staff_id: Optional[str],
+    location_id: Optional[str],
+    granularity_minutes: int,
+    window_start: Optional[time] = None,
+    window_end: Optional[time] = None,
+) -> str:
+    return slot_cache_keys(
+        service_id,
+        [target_date],
+        timezone_name,
+        staff_id,
+        location_id,
+        granularity_minutes,
+        window_start,
+        window_end,
+    )[target_date]
+
+
+def get_cached_slots(cache_key: str) -> Optional[List[dict]]:
+    slots: Optional[List[dict]] = _SLOT_CACHE.get(cache_key)
+    if slots is None:
+        return None
+
+    # Cached days outlive the minimum notice cutoff, so drop starts that have
+    # slipped inside it since the entry was written.
+    notice_cutoff = datetime.now(timezone.utc) + timedelta(minutes=settings.MIN_NOTICE_MINUTES)
+    return [slot for slot in slots if slot["start_time"] >= notice_cutoff]
+
+
+def live_hold_expiries(
+    db: Session,
+    staff_id: Optional[str],
+    target_dates: List[date],
+) -> Dict[date, Optional[datetime]]:
+    """Earliest expiry among live holds that can touch each date, or None when there are none.
+
+    A hold lapsing is not a write, so nothing bumps a generation when it
+    does; entries are kept no longer than the first hold they saw. Days are
+    padded by a day each side so this holds in every timezone.
+    """
+    if not target_dates:
+        return {}
+    query = """
+        SELECT start_utc, end_utc, expires_at_utc
+        FROM booking_holds
+        WHERE expires_at_utc > NOW()
+          AND period && tstzrange(:range_start, :range_end)
+    """
+    params: Dict[str, object] = {
+        "range_start": datetime.combine(min(target_dates) - timedelta(days=1), time.min, timezone.utc),
+        "range_end": datetime.combine(max(target_dates) + timedelta(days=2), time.min, timezone.utc),
+    }
+    if staff_id:
+        query += " AND staff_id = :staff_id"
+        params["staff_id"] = staff_id
+    holds = [
+        tuple(value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in row)
+        for row in db.execute(text(query), params).fetchall()
+    ]
+
+    expiries: Dict[date, Optional[datetime]] = {}
+    for target_date in target_dates:
+        day_start = datetime.combine(target_date - timedelta(days=1), time.min, timezone.utc)
+        day_end = datetime.combine(target_date + timedelta(days=2), time.min, timezone.utc)
+        expiries[target_date] = min(
+            (expires_at for start_utc, end_utc, expires_at in holds if start_utc < day_end and end_utc > day_start),
+            default=None,
+        )
+    return expiries
+
+
+def set_cached_slots(cache_key: str, data: List[dict], hold_expires_at: Optional[datetime] = None) -> None:
+    ttl_seconds = None
+    if hold_expires_at is not None:
+        ttl_seconds = min(
+            settings.SLOT_CACHE_TTL_SECONDS,
+            (hold_expires_at - datetime.now(timezone.utc)).total_seconds(),
+        )
+        if ttl_seconds <= 0:
+            return
+    _SLOT_CACHE.set(cache_key, data, ttl_seconds)
+
+
+def slot_cache_stats() -> Dict[str, Any]:
+    return _SLOT_CACHE.stats()
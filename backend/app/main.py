@@ -1,9 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.api import auth, users, services, staff, availability, admin
 from app.core.config import settings
+from app.core.database import begin_request_queries, end_request_queries, log_request_queries
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI(title="Appointment Booking API")
 
@@ -17,8 +19,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
+@app.middleware("http")
+async def record_request_queries(request: Request, call_next):
+    if not settings.QUERY_STATS_ENABLED:
+        return await call_next(request)
+    token = begin_request_queries()
+    try:
+        response = await call_next(request)
+    finally:
+        queries = end_request_queries(token)
+    response.headers["Server-Timing"] = queries.server_timing()
+    log_request_queries(request.method, request.url.path, response.status_code, queries)
+    return response
+
 app.include_router(auth.router)
 app.include_router(users.router, prefix="/api", tags=["users"])
 app.include_router(services.router, prefix="/api/services")
@@ -36,6 +52,24 @@ if settings.FEATURE_SET == "full":
     app.include_router(customers.router)
     app.include_router(waitlist.router, prefix="/api/waitlist")
 
+    if settings.OUTBOX_DISPATCH_IN_PROCESS:
+        from app.core.outbox import start_outbox_dispatcher, stop_outbox_dispatcher
+
+        app.add_event_handler("startup", start_outbox_dispatcher)
+        app.add_event_handler("shutdown", stop_outbox_dispatcher)
+
+    if settings.NOTIFICATION_DISPATCH_IN_PROCESS:
+        from app.core.notify import start_notification_dispatcher, stop_notification_dispatcher
+
+        app.add_event_handler("startup", start_notification_dispatcher)
+        app.add_event_handler("shutdown", stop_notification_dispatcher)
+
+if settings.SCHEDULER_IN_PROCESS:
+    from app.core.scheduler import start_scheduler, stop_scheduler
+
+    app.add_event_handler("startup", start_scheduler)
+    app.add_event_handler("shutdown", stop_scheduler)
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -394,6 +394,8 @@ class AvailableSlot(BaseModel):
     end_time: datetime
     staff_id: str
     staff_name: Optional[str] = None
+    capacity: Optional[int] = None
+    remaining_capacity: Optional[int] = None
 
 # Customer Schemas
 class CustomerCreate(BaseModel):
@@ -429,6 +431,32 @@ class BookingUpdate(BaseModel):
     status: Optional[str] = None
     payment_status: Optional[str] = None
 
+class BookingSeriesCreate(BaseModel):
+    service_id: str
+    staff_id: str
+    customer_id: str
+    start_time_utc: datetime
+    frequency: str  # weekly | biweekly | monthly
+    count: Optional[int] = None
+    until: Optional[date] = None
+    booking_source: str = "web"
+    customer_timezone: str = "UTC"
+
+class BookingSeriesReschedule(BaseModel):
+    # New start for the next upcoming occurrence; later ones move the same way.
+    start_time_utc: datetime
+
+class BookingSeriesOccurrence(BaseModel):
+    start_time_utc: datetime
+    end_time_utc: datetime
+    status: str
+    booking_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BookingSeriesResponse(BaseModel):
+    series_id: str
+    occurrences: List[BookingSeriesOccurrence]
+
 class BookingResponse(BaseModel):
     id: str
     service_id: str
@@ -441,6 +469,7 @@ class BookingResponse(BaseModel):
     booking_source: str
     customer_timezone: str
     created_at: datetime
+    series_id: Optional[str] = None
 
 class BookingWithDetails(BookingResponse):
     service_name: Optional[str] = None
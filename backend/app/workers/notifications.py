@@ -0,0 +1,64 @@
+import argparse
+import signal
+import threading
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.notify import dispatch_notifications, run_notification_dispatcher
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Send queued notification emails outside the API process.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.NOTIFICATION_CONCURRENCY,
+        help="Number of batches (and SMTP connections) in flight at once.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Send the emails that are currently due and exit.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.once:
+        db = SessionLocal()
+        try:
+            total = 0
+            while True:
+                claimed = dispatch_notifications(db)
+                total += claimed
+                if not claimed:
+                    break
+        finally:
+            db.close()
+        print(f"Processed {total} notification(s)")
+        return
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    workers = [
+        threading.Thread(
+            target=run_notification_dispatcher,
+            args=(stop_event,),
+            name=f"notification-dispatcher-{index}",
+        )
+        for index in range(max(args.concurrency, 1))
+    ]
+    for worker in workers:
+        worker.start()
+    # Join with a timeout so the main thread keeps handling signals.
+    while any(worker.is_alive() for worker in workers):
+        for worker in workers:
+            worker.join(timeout=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import signal
+import threading
+
+from app.core.database import SessionLocal
+from app.core.outbox import dispatch_outbox, run_outbox_dispatcher
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Dispatch pending outbox events (booking emails) outside the API process.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Drain the events that are currently due and exit.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.once:
+        db = SessionLocal()
+        try:
+            total = 0
+            while True:
+                claimed = dispatch_outbox(db)
+                total += claimed
+                if not claimed:
+                    break
+        finally:
+            db.close()
+        print(f"Dispatched {total} outbox event(s)")
+        return
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    run_outbox_dispatcher(stop_event)
+
+
+if __name__ == "__main__":
+    main()
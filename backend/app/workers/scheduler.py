@@ -0,0 +1,24 @@
+import argparse
+import signal
+import threading
+
+from app.core.scheduler import run_scheduler
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run periodic jobs (reminders, expired row purges) outside the API process.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    _parse_args()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    run_scheduler(stop_event)
+
+
+if __name__ == "__main__":
+    main()
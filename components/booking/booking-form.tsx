@@ -54,6 +54,8 @@ interface AvailableSlot {
   end_time: string;
   staff_id: string;
   staff_name?: string | null;
+  capacity?: number | null;
+  remaining_capacity?: number | null;
 }
 
 interface BookingFormProps {
@@ -607,6 +609,11 @@ export function BookingForm({
                     aria-pressed={isSelected}
                   >
                     {formatSlotTime(slot.start_time)}
+                    {slot.capacity && slot.capacity > 1 && slot.remaining_capacity != null ? (
+                      <span className="block text-xs font-normal opacity-80">
+                        {slot.remaining_capacity} of {slot.capacity} left
+                      </span>
+                    ) : null}
                   </button>
                 );
               })}
@@ -116,6 +116,8 @@ export default function CustomerBookingsClient({
     user.timezone || Intl.DateTimeFormat().resolvedOptions().timeZone;
 
   const [bookings, setBookings] = useState<BookingRow[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [waitlist, setWaitlist] = useState<WaitlistRow[]>([]);
   const [serviceLookup, setServiceLookup] = useState<Record<string, string>>(
     {},
@@ -141,9 +143,12 @@ export default function CustomerBookingsClient({
   const [cancelLoading, setCancelLoading] = useState(false);
   const [rebookLoadingId, setRebookLoadingId] = useState<string | null>(null);
 
-  const loadBookings = async () => {
+  // Without a cursor the list is reloaded from the first page; with one, the
+  // next page (from the X-Next-Cursor header) is appended.
+  const loadBookings = async (cursor?: string) => {
     try {
-      const res = await fetch(`${apiUrl}/api/bookings`, {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      const res = await fetch(`${apiUrl}/api/bookings${query}`, {
         method: "GET",
         credentials: "include",
         cache: "no-store",
@@ -152,12 +157,33 @@ export default function CustomerBookingsClient({
         throw new Error("Unable to load bookings");
       }
       const data = (await res.json()) as BookingRow[];
-      setBookings(data);
+      setBookings((prev) => (cursor ? [...prev, ...data] : data));
+      setNextCursor(res.headers.get("X-Next-Cursor"));
     } catch (err) {
       setError(err instanceof Error ? err.message : "Unable to load bookings");
     }
   };
 
+  const loadMoreBookings = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    await loadBookings(nextCursor);
+    setLoadingMore(false);
+  };
+
+  const renderLoadMore = () =>
+    nextCursor ? (
+      <div className="mt-6 flex justify-center">
+        <Button
+          variant="outline"
+          onClick={loadMoreBookings}
+          disabled={loadingMore}
+        >
+          {loadingMore ? "Loading..." : "Load more bookings"}
+        </Button>
+      </div>
+    ) : null;
+
   const loadWaitlist = async () => {
     try {
       const res = await fetch(`${apiUrl}/api/waitlist/`, {
@@ -467,7 +493,10 @@ export default function CustomerBookingsClient({
             {isLoading ? (
               <p className="text-sm text-muted-foreground">Loading...</p>
             ) : (
-              renderBookings(upcomingBookings, false)
+              <>
+                {renderBookings(upcomingBookings, false)}
+                {renderLoadMore()}
+              </>
             )}
           </TabsContent>
 
@@ -475,7 +504,10 @@ export default function CustomerBookingsClient({
             {isLoading ? (
               <p className="text-sm text-muted-foreground">Loading...</p>
             ) : (
-              renderBookings(pastBookings, true)
+              <>
+                {renderBookings(pastBookings, true)}
+                {renderLoadMore()}
+              </>
             )}
           </TabsContent>
 
@@ -1,5 +1,6 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 -- Roles
 CREATE TABLE IF NOT EXISTS public.roles (
@@ -300,7 +301,8 @@ CREATE TABLE IF NOT EXISTS public.booking_holds (
   end_utc TIMESTAMP WITH TIME ZONE NOT NULL,
   expires_at_utc TIMESTAMP WITH TIME ZONE NOT NULL,
   created_by UUID REFERENCES public.users(id) ON DELETE SET NULL,
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  period TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_utc, end_utc)) STORED
 );
 
 -- Staff service overrides
@@ -357,7 +359,13 @@ CREATE TABLE IF NOT EXISTS public.bookings (
   booking_source VARCHAR(30) DEFAULT 'web'
     CHECK (booking_source IN ('web', 'social', 'admin', 'api')),
   customer_timezone VARCHAR(50) DEFAULT 'UTC',
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  is_exclusive BOOLEAN NOT NULL DEFAULT FALSE,
+  series_id UUID,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  period TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_time_utc, end_time_utc)) STORED,
+  -- Capacity-1 bookings for the same staff member may never overlap.
+  CONSTRAINT bookings_exclusive_no_overlap EXCLUDE USING gist (staff_id WITH =, period WITH &&)
+    WHERE (is_exclusive AND status NOT IN ('cancelled', 'no-show'))
 );
 
 -- Booking changes
@@ -425,7 +433,13 @@ CREATE TABLE IF NOT EXISTS public.notifications (
     )
   ),
   recipient VARCHAR(150) NOT NULL,
-  status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed')),
+  status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'dead')),
+  subject TEXT,
+  body TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  last_error TEXT,
+  lead_minutes INTEGER,
   sent_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -446,6 +460,12 @@ ALTER TABLE public.notifications
     )
   );
 
+ALTER TABLE public.notifications
+  DROP CONSTRAINT IF EXISTS notifications_status_check;
+
+ALTER TABLE public.notifications
+  ADD CONSTRAINT notifications_status_check CHECK (status IN ('pending', 'sent', 'failed', 'dead'));
+
 -- Waitlist
 CREATE TABLE IF NOT EXISTS public.waitlist (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -482,8 +502,48 @@ CREATE TABLE IF NOT EXISTS public.schedule_change_requests (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Shared slot cache (UNLOGGED: contents are disposable and skip the WAL)
+CREATE UNLOGGED TABLE IF NOT EXISTS public.slot_cache_entries (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS public.slot_cache_counters (
+  name TEXT PRIMARY KEY,
+  value BIGINT NOT NULL DEFAULT 0
+);
+
+-- Idempotency keys (stored responses for retried POSTs)
+CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+  user_id UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+  key VARCHAR(255) NOT NULL,
+  scope VARCHAR(50) NOT NULL,
+  request_hash VARCHAR(64) NOT NULL,
+  response JSONB,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  PRIMARY KEY (user_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS public.outbox_events (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  event_type VARCHAR(50) NOT NULL,
+  payload JSONB NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  processed_at TIMESTAMP WITH TIME ZONE
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_users_role ON public.users(role);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON public.sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_expires ON public.password_reset_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_email_verification_tokens_expires ON public.email_verification_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_magic_link_tokens_expires ON public.magic_link_tokens(expires_at);
 CREATE INDEX IF NOT EXISTS idx_services_admin ON public.services(admin_id);
 CREATE INDEX IF NOT EXISTS idx_services_active ON public.services(is_active);
 CREATE INDEX IF NOT EXISTS idx_staff_services_staff ON public.staff_services(staff_id);
@@ -494,7 +554,9 @@ CREATE INDEX IF NOT EXISTS idx_bookings_service ON public.bookings(service_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_staff ON public.bookings(staff_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_customer ON public.bookings(customer_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_status ON public.bookings(status);
-CREATE INDEX IF NOT EXISTS idx_bookings_start_time ON public.bookings(start_time_utc);
+CREATE INDEX IF NOT EXISTS idx_bookings_series ON public.bookings(series_id) WHERE series_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_bookings_staff_period ON public.bookings USING gist (staff_id, period);
+CREATE INDEX IF NOT EXISTS idx_bookings_period ON public.bookings USING gist (period);
 CREATE INDEX IF NOT EXISTS idx_payments_booking ON public.payments(booking_id);
 CREATE INDEX IF NOT EXISTS idx_reviews_booking ON public.reviews(booking_id);
 CREATE INDEX IF NOT EXISTS idx_schedule_change_requests_staff ON public.schedule_change_requests(staff_id);
@@ -508,5 +570,24 @@ CREATE INDEX IF NOT EXISTS idx_staff_break_blocks_schedule ON public.staff_break
 CREATE INDEX IF NOT EXISTS idx_staff_exceptions_staff ON public.staff_exceptions(staff_id);
 CREATE INDEX IF NOT EXISTS idx_staff_exceptions_start ON public.staff_exceptions(start_utc);
 CREATE INDEX IF NOT EXISTS idx_booking_holds_staff ON public.booking_holds(staff_id);
+CREATE INDEX IF NOT EXISTS idx_booking_holds_staff_period ON public.booking_holds USING gist (staff_id, period);
+CREATE INDEX IF NOT EXISTS idx_booking_holds_period ON public.booking_holds USING gist (period);
 CREATE INDEX IF NOT EXISTS idx_booking_holds_expires ON public.booking_holds(expires_at_utc);
 CREATE INDEX IF NOT EXISTS idx_staff_service_overrides_staff ON public.staff_service_overrides(staff_id);
+CREATE INDEX IF NOT EXISTS idx_slot_cache_entries_expires ON public.slot_cache_entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON public.idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_events_pending ON public.outbox_events(available_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_notifications_due ON public.notifications(next_attempt_at) WHERE status IN ('pending', 'failed');
+CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_reminder_claim ON public.notifications(booking_id, type, recipient, lead_minutes) WHERE lead_minutes IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_bookings_staff_active_time ON public.bookings(staff_id, start_time_utc, end_time_utc) WHERE status NOT IN ('cancelled', 'no-show');
+CREATE INDEX IF NOT EXISTS idx_booking_holds_staff_expires ON public.booking_holds(staff_id, expires_at_utc);
+CREATE INDEX IF NOT EXISTS idx_staff_exceptions_staff_time ON public.staff_exceptions(staff_id, start_utc, end_utc);
+CREATE INDEX IF NOT EXISTS idx_staff_work_blocks_schedule_weekday ON public.staff_work_blocks(schedule_id, weekday);
+CREATE INDEX IF NOT EXISTS idx_notifications_recipient_created ON public.notifications(recipient, created_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_booking_type_recipient ON public.notifications(booking_id, type, recipient);
+CREATE INDEX IF NOT EXISTS idx_customers_user ON public.customers(user_id);
+CREATE INDEX IF NOT EXISTS idx_waitlist_service_status ON public.waitlist(service_id, status);
+CREATE INDEX IF NOT EXISTS idx_bookings_start_time_id ON public.bookings(start_time_utc, id);
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON public.users(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_services_created_id ON public.services(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_created_id ON public.reviews(created_at, id);
@@ -1,5 +1,6 @@
 -- Core schema (auth + services + staff + availability)
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 -- Roles
 CREATE TABLE IF NOT EXISTS public.roles (
@@ -266,7 +267,8 @@ CREATE TABLE IF NOT EXISTS public.booking_holds (
   end_utc TIMESTAMP WITH TIME ZONE NOT NULL,
   expires_at_utc TIMESTAMP WITH TIME ZONE NOT NULL,
   created_by UUID REFERENCES public.users(id) ON DELETE SET NULL,
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  period TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_utc, end_utc)) STORED
 );
 
 -- Staff service overrides
@@ -310,8 +312,36 @@ CREATE TABLE IF NOT EXISTS public.schedule_change_requests (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Shared slot cache (UNLOGGED: contents are disposable and skip the WAL)
+CREATE UNLOGGED TABLE IF NOT EXISTS public.slot_cache_entries (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS public.slot_cache_counters (
+  name TEXT PRIMARY KEY,
+  value BIGINT NOT NULL DEFAULT 0
+);
+
+-- Idempotency keys (stored responses for retried POSTs)
+CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+  user_id UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+  key VARCHAR(255) NOT NULL,
+  scope VARCHAR(50) NOT NULL,
+  request_hash VARCHAR(64) NOT NULL,
+  response JSONB,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  PRIMARY KEY (user_id, key)
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_users_role ON public.users(role);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON public.sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_expires ON public.password_reset_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_email_verification_tokens_expires ON public.email_verification_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_magic_link_tokens_expires ON public.magic_link_tokens(expires_at);
 CREATE INDEX IF NOT EXISTS idx_users_location ON public.users(location_id);
 CREATE INDEX IF NOT EXISTS idx_services_admin ON public.services(admin_id);
 CREATE INDEX IF NOT EXISTS idx_services_active ON public.services(is_active);
@@ -326,7 +356,16 @@ CREATE INDEX IF NOT EXISTS idx_staff_break_blocks_schedule ON public.staff_break
 CREATE INDEX IF NOT EXISTS idx_staff_exceptions_staff ON public.staff_exceptions(staff_id);
 CREATE INDEX IF NOT EXISTS idx_staff_exceptions_start ON public.staff_exceptions(start_utc);
 CREATE INDEX IF NOT EXISTS idx_booking_holds_staff ON public.booking_holds(staff_id);
+CREATE INDEX IF NOT EXISTS idx_booking_holds_staff_period ON public.booking_holds USING gist (staff_id, period);
+CREATE INDEX IF NOT EXISTS idx_booking_holds_period ON public.booking_holds USING gist (period);
 CREATE INDEX IF NOT EXISTS idx_booking_holds_expires ON public.booking_holds(expires_at_utc);
 CREATE INDEX IF NOT EXISTS idx_staff_service_overrides_staff ON public.staff_service_overrides(staff_id);
 CREATE INDEX IF NOT EXISTS idx_schedule_change_requests_staff ON public.schedule_change_requests(staff_id);
 CREATE INDEX IF NOT EXISTS idx_schedule_change_requests_status ON public.schedule_change_requests(status);
+CREATE INDEX IF NOT EXISTS idx_slot_cache_entries_expires ON public.slot_cache_entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON public.idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_booking_holds_staff_expires ON public.booking_holds(staff_id, expires_at_utc);
+CREATE INDEX IF NOT EXISTS idx_staff_exceptions_staff_time ON public.staff_exceptions(staff_id, start_utc, end_utc);
+CREATE INDEX IF NOT EXISTS idx_staff_work_blocks_schedule_weekday ON public.staff_work_blocks(schedule_id, weekday);
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON public.users(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_services_created_id ON public.services(created_at, id);